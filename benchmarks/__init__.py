@@ -0,0 +1,7 @@
+"""Let Python know that the `benchmarks/` folder is a package.
+
+This lets each benchmark be run from the project root as a module, with the
+project's own modules importable, for example:
+
+    $ python3 -m benchmarks.bench_helpers
+"""
@@ -0,0 +1,92 @@
+"""Compare the fast date parsers and formatters in `helpers` with the stdlib.
+
+Each of the conversions in `helpers` has a fast path for the fixed formats of
+NASA's data, and falls back to `strptime` or `strftime` otherwise. This
+microbenchmark times both, on every close approach date in the test data.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_helpers
+"""
+import argparse
+import datetime
+import json
+import pathlib
+import timeit
+
+import helpers
+
+
+# Paths to the root of the project and the test data file.
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+TEST_CAD_FILE = PROJECT_ROOT / 'tests' / 'test-cad-2020.json'
+
+
+def load_calendar_dates(cad_json_path):
+    """Read the `cd` field of every close approach in a JSON file.
+
+    :param cad_json_path: A path to a JSON file of close approach data.
+    :return: A list of calendar date strings.
+    """
+    with open(cad_json_path) as file:
+        cad = json.load(file)
+    index = cad['fields'].index('cd')
+    return [row[index] for row in cad['data']]
+
+
+def compare(name, baseline, fast, values, repeat):
+    """Time a baseline and a fast conversion over values, and print a report.
+
+    :param name: The name of the conversion.
+    :param baseline: The baseline 1-argument conversion function.
+    :param fast: The fast 1-argument conversion function.
+    :param values: The arguments to convert.
+    :param repeat: The number of times to repeat each measurement.
+    """
+    for value in values:
+        assert baseline(value) == fast(value), value
+
+    def best(function):
+        """Return the fastest time to convert all of the values."""
+        return min(timeit.repeat(lambda: [function(v) for v in values],
+                                 number=1, repeat=repeat))
+
+    slow_time, fast_time = best(baseline), best(fast)
+    per_value = 1e9 / len(values)
+    print(f"{name:<20} {slow_time * per_value:>8.0f} ns "
+          f"{fast_time * per_value:>8.0f} ns {slow_time / fast_time:>7.1f}x")
+
+
+def main():
+    """Run the microbenchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cadfile', default=TEST_CAD_FILE, type=pathlib.Path,
+                        help="Path to JSON file of close approach data.")
+    parser.add_argument('--repeat', default=5, type=int,
+                        help="The number of times to repeat each timing.")
+    args = parser.parse_args()
+
+    dates = load_calendar_dates(args.cadfile)
+    datetimes = [helpers.cd_to_datetime(cd) for cd in dates]
+    strings = [helpers.datetime_to_str(dt) for dt in datetimes]
+    minutes = [helpers.cd_to_minutes(cd) for cd in dates]
+
+    print(f"{len(dates)} dates from {args.cadfile.name}")
+    print(f"{'conversion':<20} {'stdlib':>11} {'fast':>11} {'speedup':>8}")
+    compare('cd_to_datetime',
+            lambda cd: datetime.datetime.strptime(cd, "%Y-%b-%d %H:%M"),
+            helpers.cd_to_datetime, dates, args.repeat)
+    compare('str_to_datetime',
+            lambda s: datetime.datetime.strptime(s, "%Y-%m-%d %H:%M"),
+            helpers.str_to_datetime, strings, args.repeat)
+    compare('datetime_to_str',
+            lambda dt: datetime.datetime.strftime(dt, "%Y-%m-%d %H:%M"),
+            helpers.datetime_to_str, datetimes, args.repeat)
+    compare('minutes_to_str',
+            lambda m: datetime.datetime.strftime(
+                helpers.minutes_to_datetime(m), "%Y-%m-%d %H:%M"),
+            helpers.minutes_to_str, minutes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
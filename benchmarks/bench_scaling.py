@@ -0,0 +1,269 @@
+"""Time loading, querying and writing synthetic data at several scales.
+
+For each scale, this benchmark generates synthetic data files with
+`benchmarks.synthetic` (or reuses those already in `--datadir`), then times
+each stage of the project on them:
+
+- `load_neos` and `load_approaches`, to read the data files;
+- `link`, to construct an `NEODatabase` from the NEOs and close approaches;
+- `query:<mix>`, to collect the results of each of a few representative mixes
+  of filters (`QUERY_MIXES`);
+- `write_to_csv` and `write_to_json`, to write the results of the `distance`
+  mix.
+
+Each stage is timed `--repeat` times and the fastest time is kept. Its peak
+memory is the peak of the memory allocated while it ran, as traced by
+`tracemalloc` in one extra run, which isn't timed since tracing slows it.
+
+The results are printed as a table, and written as JSON to `--output`, with
+one record per scale and stage - its rows, seconds, rows per second and peak
+bytes - and the Python version and commit that they were measured with. The
+results of another run can be compared with `--compare`.
+
+To run this benchmark from the project root, at 10 and 100 times the scale of
+the test data, run:
+
+    $ python3 -m benchmarks.bench_scaling --scales 10 100 --output bench.json
+
+Generating the data takes about as long as loading it, so keep the data of
+large scales between runs with `--datadir`.
+"""
+import argparse
+import datetime
+import json
+import pathlib
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import synthetic
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from write import write_to_csv, write_to_json
+
+
+# Paths to the root of the project.
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+
+# Representative mixes of filters, as for `create_filters`.
+QUERY_MIXES = {
+    'all': {},
+    'date': dict(start_date=datetime.date(2020, 1, 1),
+                 end_date=datetime.date(2029, 12, 31)),
+    'distance': dict(distance_max=0.05),
+    'hazardous-fast': dict(hazardous=True, velocity_min=20),
+    'mixed': dict(start_date=datetime.date(1950, 1, 1),
+                  end_date=datetime.date(2100, 12, 31), distance_max=0.2,
+                  velocity_max=15, diameter_min=0.1),
+}
+
+
+def measure(function, trace=False):
+    """Call a function, and measure its time and, optionally, peak memory.
+
+    :param function: A zero-argument callable.
+    :param trace: Whether to trace the memory allocated by the call.
+    :return: A tuple of the function's return value, its time in seconds, and
+    its peak memory in bytes (or None, if not traced).
+    """
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        value = function()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else None
+    finally:
+        if trace:
+            tracemalloc.stop()
+    return value, seconds, peak
+
+
+class Stages:
+    """The measurements of the stages of a benchmark at one scale."""
+
+    def __init__(self, scale):
+        """Create a new, empty `Stages`.
+
+        :param scale: The scale of the data.
+        """
+        self.scale = scale
+        self.records = {}
+
+    def record(self, stage, rows, seconds, peak):
+        """Record a measurement of a stage, keeping the fastest time.
+
+        :param stage: The name of the stage.
+        :param rows: The number of rows that the stage handled.
+        :param seconds: The time of the stage, or None if it was traced.
+        :param peak: The peak memory of the stage, or None if not traced.
+        """
+        record = self.records.setdefault(stage, {
+            'scale': self.scale, 'stage': stage, 'rows': rows,
+            'seconds': None, 'rows_per_second': None, 'peak_bytes': None})
+        if peak is not None:
+            record['peak_bytes'] = peak
+        if seconds is not None and (record['seconds'] is None
+                                    or seconds < record['seconds']):
+            record['seconds'] = round(seconds, 6)
+            record['rows_per_second'] = (round(rows / seconds)
+                                         if seconds > 0 else None)
+
+    def run(self, stage, function, rows, trace):
+        """Measure a stage, and record it.
+
+        :param stage: The name of the stage.
+        :param function: A zero-argument callable that runs the stage.
+        :param rows: A 1-argument callable that returns the number of rows
+        that the stage handled, from the function's return value.
+        :param trace: Whether this run traces memory, rather than being timed.
+        :return: The function's return value.
+        """
+        value, seconds, peak = measure(function, trace)
+        self.record(stage, rows(value), None if trace else seconds, peak)
+        return value
+
+
+def run_scale(neo_path, cad_path, scale, repeat, memory, workdir):
+    """Measure every stage on the data files of one scale.
+
+    :param neo_path: The path of the NEO data file.
+    :param cad_path: The path of the close approach data file.
+    :param scale: The scale of the data.
+    :param repeat: The number of timed runs of each stage.
+    :param memory: Whether to trace the memory of each stage in an extra run.
+    :param workdir: A folder in which to write output files.
+    :return: A list of the records of the stages, as dictionaries.
+    """
+    stages = Stages(scale)
+    runs = [True] * memory + [False] * repeat
+
+    for trace in runs:
+        neos = stages.run('load_neos', lambda: load_neos(neo_path), len,
+                          trace)
+        approaches = stages.run('load_approaches',
+                                lambda: load_approaches(cad_path), len, trace)
+        db = stages.run('link', lambda: NEODatabase(neos, approaches),
+                        lambda db: len(approaches), trace)
+
+    results = {}
+    for name, criteria in QUERY_MIXES.items():
+        filters = create_filters(**criteria)
+        for trace in runs:
+            # Count the rows scanned, rather than the results.
+            results[name] = stages.run(
+                f"query:{name}", lambda: list(db.query(filters)),
+                lambda _: db.last_query_stats.scanned, trace)
+
+    written = results['distance']
+    for writer, suffix in ((write_to_csv, 'csv'), (write_to_json, 'json')):
+        path = workdir / f"results.{suffix}"
+        for trace in runs:
+            stages.run(writer.__name__, lambda: writer(written, path),
+                       lambda _: len(written), trace)
+        path.unlink()
+    return list(stages.records.values())
+
+
+def current_commit():
+    """Return the commit of the project's checkout, or None if unknown."""
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.decode().strip()
+
+
+def print_table(records, baseline=None):
+    """Print the records of a benchmark as a table.
+
+    :param records: A list of records, as from `run_scale`.
+    :param baseline: An optional list of records of another run, to compare
+    the time of each stage against.
+    """
+    previous = {(r['scale'], r['stage']): r for r in baseline or ()}
+    print(f"{'scale':>6} {'stage':<22} {'rows':>11} {'seconds':>9} "
+          f"{'rows/s':>11} {'peak MiB':>9}" + (' speedup' if baseline else ''))
+    for record in records:
+        peak = ('' if record['peak_bytes'] is None
+                else f"{record['peak_bytes'] / 2 ** 20:.1f}")
+        seconds = ('' if record['seconds'] is None
+                   else f"{record['seconds']:.3f}")
+        rate = ('' if record['rows_per_second'] is None
+                else f"{record['rows_per_second']:,}")
+        line = (f"{record['scale']:>6g} {record['stage']:<22} "
+                f"{record['rows']:>11,} {seconds:>9} {rate:>11} {peak:>9}")
+        old = previous.get((record['scale'], record['stage']))
+        if old and old['seconds'] and record['seconds']:
+            line += f" {old['seconds'] / record['seconds']:>7.2f}x"
+        print(line)
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', nargs='+', default=[10, 100], type=float,
+                        help="The scales of the data, relative to the test "
+                             "data.")
+    parser.add_argument('--seed', default=0, type=int,
+                        help="The seed of the synthetic data.")
+    parser.add_argument('--repeat', default=3, type=int,
+                        help="The number of times to time each stage.")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Don't trace the peak memory of each stage.")
+    parser.add_argument('--datadir', type=pathlib.Path,
+                        help="A folder in which to keep the generated data, "
+                             "to reuse between runs.")
+    parser.add_argument('--output', type=pathlib.Path,
+                        help="Path to a JSON file in which to write the "
+                             "results.")
+    parser.add_argument('--compare', type=pathlib.Path,
+                        help="Path to a JSON file of the results of another "
+                             "run, to compare with.")
+    args = parser.parse_args()
+
+    workdir = pathlib.Path(tempfile.mkdtemp())
+    datadir = args.datadir or workdir
+    records = []
+    try:
+        for scale in args.scales:
+            folder = datadir / f"scale-{scale:g}-seed-{args.seed}"
+            neo_path, cad_path = folder / 'neos.csv', folder / 'cad.json'
+            if not (neo_path.exists() and cad_path.exists()):
+                print(f"Generating data at scale {scale:g}...",
+                      file=sys.stderr)
+                synthetic.generate(folder, scale, args.seed)
+            records.extend(run_scale(neo_path, cad_path, scale, args.repeat,
+                                     not args.no_memory, workdir))
+    finally:
+        shutil.rmtree(workdir)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+    print_table(records, baseline)
+
+    if args.output:
+        report = {
+            'commit': current_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'results': records,
+        }
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Compare the fixed-schema writers in `write` with `csv.writer`/`json.dumps`.
+
+`write_to_csv`, `write_to_json` and `write_to_ndjson` format each row directly
+to a string. This benchmark times each of them against a reference writer
+that produces the same bytes the generic way, as the writers did before they
+were specialized: a `csv.writer` row, or `json.dumps` of a dictionary with a
+nested 'neo' dictionary, for each close approach, with its time formatted by
+`strftime`. Both write every close approach of the data to a file, flushing
+it every 1000 rows, and the fastest of `--repeat` runs of each is kept.
+
+The first export of a close approach formats its time and numbers, which it
+caches, so the fast writers are timed both on freshly loaded approaches
+('first') and on approaches that were exported before ('again').
+
+To run this benchmark from the project root, on the test data, run:
+
+    $ python3 -m benchmarks.bench_write
+
+Larger data, as generated by `benchmarks.synthetic`, can be given with
+`--neofile` and `--cadfile`.
+"""
+import argparse
+import csv
+import json
+import pathlib
+import shutil
+import tempfile
+import time
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from write import write_to_csv, write_to_json, write_to_ndjson
+
+
+# Paths to the root of the project and the test data files.
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+TEST_NEO_FILE = PROJECT_ROOT / 'tests' / 'test-neos-2020.csv'
+TEST_CAD_FILE = PROJECT_ROOT / 'tests' / 'test-cad-2020.json'
+
+
+# The format of the times of the output.
+TIME_FORMAT = '%Y-%m-%d %H:%M'
+
+# The number of rows between flushes, as in the writers' default.
+FLUSH_EVERY = 1000
+
+
+def reference_record(approach):
+    """Return the dictionary that `json.dumps` formats for a close approach.
+
+    :param approach: A linked `CloseApproach`.
+    :return: A dictionary of the approach's attributes and its NEO's.
+    """
+    return {
+        'datetime_utc': approach.time.strftime(TIME_FORMAT),
+        'distance_au': approach.distance,
+        'velocity_km_s': approach.velocity,
+        'neo': {
+            'designation': approach.neo.designation,
+            'name': approach.neo.name,
+            'diameter_km': approach.neo.diameter,
+            'potentially_hazardous': approach.neo.hazardous,
+        },
+    }
+
+
+def reference_csv(results, filename):
+    """Write close approaches to a CSV file with `csv.writer`."""
+    with open(filename, 'w') as file:
+        writer = csv.writer(file)
+        writer.writerow(('datetime_utc', 'distance_au', 'velocity_km_s',
+                         'designation', 'name', 'diameter_km',
+                         'potentially_hazardous'))
+        for count, result in enumerate(results, start=1):
+            writer.writerow((result.time.strftime(TIME_FORMAT),
+                             result.distance, result.velocity,
+                             result.neo.designation, result.neo.name,
+                             result.neo.diameter, result.neo.hazardous))
+            if count % FLUSH_EVERY == 0:
+                file.flush()
+
+
+def reference_json(results, filename):
+    """Write close approaches to a JSON file with `json.dumps`."""
+    with open(filename, 'w') as file:
+        file.write('[')
+        for count, result in enumerate(results, start=1):
+            if count > 1:
+                file.write(', ')
+            file.write(json.dumps(reference_record(result)))
+            if count % FLUSH_EVERY == 0:
+                file.flush()
+        file.write(']')
+
+
+def reference_ndjson(results, filename):
+    """Write close approaches to an NDJSON file with `json.dumps`."""
+    with open(filename, 'w') as file:
+        for count, result in enumerate(results, start=1):
+            file.write(json.dumps(reference_record(result)) + '\n')
+            if count % FLUSH_EVERY == 0:
+                file.flush()
+
+
+def load_results(neo_csv_path, cad_json_path):
+    """Load and link every close approach of a pair of data files.
+
+    :param neo_csv_path: A path to a CSV file of NEOs.
+    :param cad_json_path: A path to a JSON file of close approaches.
+    :return: A list of linked `CloseApproach`es.
+    """
+    results = load_approaches(cad_json_path)
+    NEODatabase(load_neos(neo_csv_path), results)
+    return results
+
+
+def timed(writer, results, path):
+    """Return the time in which a writer writes the results, in seconds."""
+    start = time.perf_counter()
+    writer(results, path)
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--neofile', default=TEST_NEO_FILE,
+                        type=pathlib.Path,
+                        help="Path to CSV file of near-Earth objects.")
+    parser.add_argument('--cadfile', default=TEST_CAD_FILE,
+                        type=pathlib.Path,
+                        help="Path to JSON file of close approach data.")
+    parser.add_argument('--repeat', default=5, type=int,
+                        help="The number of times to time each writer.")
+    args = parser.parse_args()
+
+    def fresh():
+        """Load a new copy of the results."""
+        return load_results(args.neofile, args.cadfile)
+
+    results = fresh()
+    # Build the approaches' datetimes up front, as they were before the
+    # times were stored as timestamps, so the reference isn't charged for it.
+    for result in results:
+        result.time
+
+    workdir = pathlib.Path(tempfile.mkdtemp())
+    try:
+        print(f"{len(results):,} close approaches")
+        print(f"{'format':<8} {'reference':>11} {'first':>11} {'again':>11} "
+              f"{'speedup':>8} {'again':>8}")
+        for fmt, reference, fast in (
+                ('csv', reference_csv, write_to_csv),
+                ('json', reference_json, write_to_json),
+                ('ndjson', reference_ndjson, write_to_ndjson)):
+            expected, actual = workdir / f"a.{fmt}", workdir / f"b.{fmt}"
+            slow_time = min(timed(reference, results, expected)
+                            for _ in range(args.repeat))
+            # The first export of some results formats them, and later ones
+            # reuse the strings cached by the approaches.
+            first_time = min(timed(fast, fresh(), actual)
+                             for _ in range(args.repeat))
+            again_time = min(timed(fast, results, actual)
+                             for _ in range(args.repeat))
+            assert expected.read_bytes() == actual.read_bytes(), fmt
+            print(f"{fmt:<8} {slow_time * 1000:>8.0f} ms "
+                  f"{first_time * 1000:>8.0f} ms "
+                  f"{again_time * 1000:>8.0f} ms "
+                  f"{slow_time / first_time:>7.2f}x "
+                  f"{slow_time / again_time:>7.2f}x")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
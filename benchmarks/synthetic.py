@@ -0,0 +1,254 @@
+"""Generate synthetic NEO and close approach data files, at any scale.
+
+The files have the same schema as NASA's: a `neos.csv` with every column of
+the Small-Body Database's export, and a `cad.json` in the format of the Close
+Approach Data API. The scale is relative to the test data, so that a scale of
+1 writes 4,226 NEOs and 4,700 close approaches, and a scale of 100 writes
+422,600 NEOs and 470,000 close approaches.
+
+The data is pseudo-random but deterministic: the same scale and seed always
+produce the same bytes, so benchmarks on different versions of the project can
+be compared. Every close approach is of a generated NEO, and the approaches
+are in order of time, from 1900 to 2200, as in NASA's data. Both files are
+written row by row, so memory use doesn't grow with the scale.
+
+To generate data at 100 times the scale of the test data, run:
+
+    $ python3 -m benchmarks.synthetic --scale 100 --outdir data/synthetic
+"""
+import argparse
+import csv
+import datetime
+import json
+import pathlib
+import random
+
+
+# The numbers of NEOs and close approaches in the test data, at scale 1.
+NEOS_PER_SCALE = 4226
+APPROACHES_PER_SCALE = 4700
+
+# The columns of NASA's `neos.csv`.
+NEO_COLUMNS = (
+    'id', 'spkid', 'full_name', 'pdes', 'name', 'prefix', 'neo', 'pha', 'H',
+    'G', 'M1', 'M2', 'K1', 'K2', 'PC', 'diameter', 'extent', 'albedo',
+    'rot_per', 'GM', 'BV', 'UB', 'IR', 'spec_B', 'spec_T', 'H_sigma',
+    'diameter_sigma', 'orbit_id', 'epoch', 'epoch_mjd', 'epoch_cal',
+    'equinox', 'e', 'a', 'q', 'i', 'om', 'w', 'ma', 'ad', 'n', 'tp', 'tp_cal',
+    'per', 'per_y', 'moid', 'moid_ld', 'moid_jup', 't_jup', 'sigma_e',
+    'sigma_a', 'sigma_q', 'sigma_i', 'sigma_om', 'sigma_w', 'sigma_ma',
+    'sigma_ad', 'sigma_n', 'sigma_tp', 'sigma_per', 'class', 'producer',
+    'data_arc', 'first_obs', 'last_obs', 'n_obs_used', 'n_del_obs_used',
+    'n_dop_obs_used', 'condition_code', 'rms', 'two_body', 'A1', 'A2', 'A3',
+    'DT',
+)
+
+# The fields of NASA's `cad.json`.
+CAD_FIELDS = ('des', 'orbit_id', 'jd', 'cd', 'dist', 'dist_min', 'dist_max',
+              'v_rel', 'v_inf', 't_sigma_f', 'h')
+CAD_SIGNATURE = {'source': 'NASA/JPL SBDB Close Approach Data API',
+                 'version': '1.1'}
+
+# The share of NEOs with a name, a diameter, or that are hazardous, as in the
+# full data set.
+NAMED = 0.02
+WITH_DIAMETER = 0.06
+HAZARDOUS = 0.086
+
+# The close approaches span the 300 years from the start of 1900, the Julian
+# date of which is `FIRST_JD`.
+FIRST_DAY = datetime.date(1900, 1, 1)
+FIRST_JD = 2415020.5
+DAYS = (datetime.date(2200, 1, 1) - FIRST_DAY).days
+
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_LETTERS = 'ABCDEFGHJKLMNOPQRSTUVWXYZ'
+_CLASSES = ('APO', 'ATE', 'AMO', 'IEO')
+
+
+def designation(number):
+    """Return the unique primary designation of the NEO of a number.
+
+    One in four NEOs is numbered, like '100004', and the others have a
+    provisional designation, like '1995 BC12'.
+
+    :param number: The number of the NEO, from 0.
+    :return: A string.
+    """
+    if number % 4 == 0:
+        return str(100000 + number // 4)
+    number -= number // 4 + 1
+    letters = len(_LETTERS)
+    half_month = _LETTERS[number % letters]
+    order = _LETTERS[number // letters % letters]
+    cycle = number // letters ** 2
+    year = 1990 + number % 35
+    return f"{year} {half_month}{order}{cycle or ''}"
+
+
+def neo_rows(count, rng):
+    """Generate the rows of a `neos.csv` file.
+
+    :param count: The number of NEOs.
+    :param rng: A `random.Random` from which to draw the NEOs' attributes.
+    :yield: A list of strings for each NEO, in the order of `NEO_COLUMNS`.
+    """
+    for number in range(count):
+        pdes = designation(number)
+        name = f"Synthetic {number}" if rng.random() < NAMED else ''
+        h = rng.uniform(14, 30)
+        diameter = (f"{10 ** (3.1236 - 0.2 * h) / 0.385:.3f}"
+                    if rng.random() < WITH_DIAMETER else '')
+        e = rng.uniform(0.05, 0.9)
+        a = rng.uniform(0.6, 4.0)
+        q = a * (1 - e)
+        moid = rng.uniform(0, 0.5)
+        values = {
+            'id': f"a{2000000 + number:07d}",
+            'spkid': str(2000000 + number),
+            'full_name': f"{pdes} ({name})" if name else f"({pdes})",
+            'pdes': pdes,
+            'name': name,
+            'neo': 'Y',
+            'pha': 'Y' if rng.random() < HAZARDOUS else 'N',
+            'H': f"{h:.1f}",
+            'diameter': diameter,
+            'albedo': f"{rng.uniform(0.02, 0.6):.3f}" if diameter else '',
+            'orbit_id': f"JPL {rng.randint(1, 300)}",
+            'epoch': '2459000.5',
+            'epoch_mjd': '59000',
+            'epoch_cal': '20200531.0000000',
+            'equinox': 'J2000',
+            'e': repr(e),
+            'a': repr(a),
+            'q': repr(q),
+            'i': repr(rng.uniform(0, 40)),
+            'om': repr(rng.uniform(0, 360)),
+            'w': repr(rng.uniform(0, 360)),
+            'ma': repr(rng.uniform(0, 360)),
+            'ad': repr(a * (1 + e)),
+            'n': repr(0.9856076686 / a ** 1.5),
+            'per': repr(365.25 * a ** 1.5),
+            'per_y': repr(a ** 1.5),
+            'moid': f"{moid:.7f}",
+            'moid_ld': repr(moid * 389.17),
+            't_jup': f"{rng.uniform(2.5, 7):.3f}",
+            'sigma_e': f"{rng.uniform(1, 9):.4f}E-8",
+            'sigma_a': f"{rng.uniform(1, 9):.4f}E-9",
+            'class': 'AMO' if q > 1.017 else rng.choice(_CLASSES[:2]),
+            'producer': 'Synthetic',
+            'data_arc': str(rng.randint(1, 20000)),
+            'n_obs_used': str(rng.randint(3, 3000)),
+            'condition_code': str(rng.randint(0, 9)),
+            'rms': f"{rng.uniform(0.1, 0.9):.5f}",
+        }
+        yield [values.get(column, '') for column in NEO_COLUMNS]
+
+
+def approach_rows(count, neos, rng):
+    """Generate the rows of the data of a `cad.json` file, in order of time.
+
+    The times of the approaches are spaced as a Poisson process, so that
+    they're generated in order without being stored and sorted.
+
+    :param count: The number of close approaches.
+    :param neos: The number of NEOs, which the approaches are of.
+    :param rng: A `random.Random` from which to draw the approaches'
+    attributes.
+    :yield: A list of strings for each approach, in the order of
+    `CAD_FIELDS`.
+    """
+    days = 0.0
+    day, calendar = None, None
+    for _ in range(count):
+        days += rng.expovariate(count / DAYS)
+        if days >= DAYS:
+            days = DAYS - 1e-6
+        if int(days) != day:
+            day = int(days)
+            date = FIRST_DAY + datetime.timedelta(days=day)
+            calendar = f"{date.year}-{_MONTHS[date.month - 1]}-{date.day:02d}"
+        minute = int((days - day) * 1440)
+        distance = 0.5 * rng.random() ** 1.5
+        spread = distance * rng.uniform(0, 0.01)
+        velocity = rng.lognormvariate(2.4, 0.5)
+        sigma = rng.random()
+        if sigma < 0.5:
+            t_sigma = f"00:{rng.randint(1, 59):02d}"
+        elif sigma < 0.8:
+            t_sigma = '< 00:01'
+        else:
+            t_sigma = (f"{rng.randint(1, 30)}_{rng.randint(0, 23):02d}:"
+                       f"{rng.randint(0, 59):02d}")
+        yield [
+            designation(rng.randrange(neos)),
+            str(rng.randint(1, 300)),
+            repr(FIRST_JD + days),
+            f"{calendar} {minute // 60:02d}:{minute % 60:02d}",
+            repr(distance),
+            repr(distance - spread),
+            repr(distance + spread),
+            repr(velocity),
+            repr(velocity * rng.uniform(0.9, 1.0)),
+            t_sigma,
+            f"{rng.uniform(14, 30):.1f}",
+        ]
+
+
+def generate(outdir, scale=1, seed=0):
+    """Write a synthetic `neos.csv` and `cad.json` to a folder.
+
+    :param outdir: A Path-like object of the folder, which is created if
+    needed.
+    :param scale: The size of the data, relative to the test data.
+    :param seed: The seed of the pseudo-random data.
+    :return: A tuple of the paths of the NEO and close approach files.
+    """
+    outdir = pathlib.Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    neos = max(1, round(NEOS_PER_SCALE * scale))
+    approaches = max(1, round(APPROACHES_PER_SCALE * scale))
+    neo_path, cad_path = outdir / 'neos.csv', outdir / 'cad.json'
+
+    rng = random.Random(seed)
+    with open(neo_path, 'w', newline='') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(NEO_COLUMNS)
+        writer.writerows(neo_rows(neos, rng))
+
+    # Every value is a string without quotes or backslashes, so the rows are
+    # formatted directly.
+    with open(cad_path, 'w') as file:
+        file.write(f'{{"signature": {json.dumps(CAD_SIGNATURE)}, '
+                   f'"count": {approaches}, '
+                   f'"fields": {json.dumps(list(CAD_FIELDS))}, "data": [\n')
+        separator = ''
+        for row in approach_rows(approaches, neos, rng):
+            file.write(separator + '["' + '", "'.join(row) + '"]')
+            separator = ',\n'
+        file.write('\n]}\n')
+    return neo_path, cad_path
+
+
+def main():
+    """Generate synthetic data files."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', default=10, type=float,
+                        help="The size of the data, relative to the test "
+                             "data.")
+    parser.add_argument('--seed', default=0, type=int,
+                        help="The seed of the pseudo-random data.")
+    parser.add_argument('--outdir', default=pathlib.Path('.'),
+                        type=pathlib.Path,
+                        help="The folder in which to write neos.csv and "
+                             "cad.json.")
+    args = parser.parse_args()
+
+    neo_path, cad_path = generate(args.outdir, args.scale, args.seed)
+    for path in (neo_path, cad_path):
+        print(f"{path} ({path.stat().st_size / 2 ** 20:.1f} MiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Cache the result sets of queries, to answer narrower queries from them.
+
+A `QueryCache` remembers the results of recent queries of an
+`NEODatabase` as sets of row IDs (positions in the database's list of close
+approaches), together with their filters. A new query whose filters are at
+least as narrow as those of a cached query - because it tightens a range on
+the same attribute, or adds filters - can only match rows in the cached set,
+so it's evaluated over those rows instead of over every close approach.
+
+Each cached set records the prefix of rows that it covers: all of them for a
+complete query, or the rows up to the last result of a query that was stopped
+early (by a limit, say). Close approaches are only ever appended to a
+database, so the rows beyond that prefix - including any added since, by
+ingesting - are scanned in full, and the cache never has to be invalidated.
+
+The cache is bounded by the total number of row IDs that it retains, and
+evicts the least recently used sets first.
+
+The main module gives each database of the interactive shell a `QueryCache`,
+since analysts refine queries step by step there.
+"""
+import array
+import collections
+import operator
+import threading
+
+
+# The comparators under which one filter can imply another on the same
+# attribute, such as `distance <= 0.05` implying `distance <= 0.1`.
+_ORDERINGS = (operator.ge, operator.gt, operator.le, operator.lt)
+
+
+def filter_key(f):
+    """Return a hashable key that identifies a filter by what it selects.
+
+    :param f: An `AttributeFilter`.
+    :return: A tuple of the filter's class, comparator and reference value.
+    """
+    return (type(f), f.op, f.value)
+
+
+def implies(a, b):
+    """Return whether every approach that passes one filter passes another.
+
+    This is conservative: it may return False for some filters that do imply
+    each other, but never returns True for filters that don't.
+
+    :param a: An `AttributeFilter`.
+    :param b: Another `AttributeFilter`.
+    :return: Whether `a(approach)` guarantees `b(approach)`.
+    """
+    if type(a) is not type(b):
+        return False
+    if a.op is operator.eq or (a.op is b.op and a.op in _ORDERINGS):
+        # For instance, `x == 3` implies `x >= 2`, and `x >= 3` implies
+        # `x >= 2`, since `3 >= 2`.
+        return bool(b.op(a.value, b.value))
+    return False
+
+
+class _Entry:
+    """A cached result set: its filters, row IDs, and the rows it covers."""
+
+    def __init__(self, filters, rows, scanned):
+        self.filters = filters
+        self.keys = frozenset(filter_key(f) for f in filters)
+        self.rows = rows
+        self.scanned = scanned
+
+
+class QueryCache:
+    """A bounded, least-recently-used cache of the result sets of queries."""
+
+    def __init__(self, max_rows=2000000, max_entries=32):
+        """Create a new, empty `QueryCache`.
+
+        :param max_rows: The maximum total number of row IDs to retain.
+        :param max_entries: The maximum number of result sets to retain.
+        """
+        self.max_rows = max_rows
+        self.max_entries = max_entries
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of cached result sets."""
+        return len(self._entries)
+
+    def lookup(self, filters, total):
+        """Find the cached result set that answers a query most cheaply.
+
+        The cost of answering from a result set is the number of its rows,
+        plus the number of rows beyond those it covers.
+
+        :param filters: The filters of the new query.
+        :param total: The number of rows in the database.
+        :return: A tuple of the cached row IDs, the number of rows that they
+        cover, and the filters of the new query that they weren't already
+        filtered by - or None if no cached set contains the results.
+        """
+        best = None
+        with self._lock:
+            for key, entry in self._entries.items():
+                cost = len(entry.rows) + total - entry.scanned
+                if best is not None and cost >= best[0]:
+                    continue
+                if all(any(implies(new, old) for new in filters)
+                       for old in entry.filters):
+                    best = (cost, key, entry)
+            if best is None or best[0] >= total:
+                self.misses += 1
+                return None
+            _, key, entry = best
+            self._entries.move_to_end(key)
+            self.hits += 1
+        remaining = [f for f in filters if filter_key(f) not in entry.keys]
+        return entry.rows, entry.scanned, remaining
+
+    def store(self, filters, rows, scanned):
+        """Remember the result set of a query.
+
+        Queries without filters, and result sets too large to retain, aren't
+        stored, and neither is a result set that covers fewer rows than the
+        cached set of the same query.
+
+        :param filters: The filters of the query.
+        :param rows: An `array.array` of the row IDs of the query's results,
+        in increasing order.
+        :param scanned: The number of rows that the query covered: every
+        result among the first `scanned` rows is in `rows`.
+        """
+        if not filters or not scanned or len(rows) > self.max_rows:
+            return
+        entry = _Entry(tuple(filters), rows, scanned)
+        with self._lock:
+            old = self._entries.get(entry.keys)
+            if old is not None:
+                if old.scanned > scanned:
+                    return
+                del self._entries[entry.keys]
+                self.rows -= len(old.rows)
+            self._entries[entry.keys] = entry
+            self.rows += len(rows)
+            while (self.rows > self.max_rows
+                   or len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self.rows -= len(evicted.rows)
+
+    @staticmethod
+    def new_rows():
+        """Return an empty, compact array in which to collect row IDs."""
+        return array.array('q')
@@ -11,6 +11,208 @@ data on NEOs and close approaches extracted by `extract.load_neos` and
 
 You'll edit this file in Tasks 2 and 3.
 """
+import collections
+import collections.abc
+import functools
+import itertools
+import threading
+import time
+
+from filters import OPERATOR_SYMBOLS
+from profiling import DISABLED
+
+# The outcome of adding a batch of close approaches to an `NEODatabase`.
+IngestResult = collections.namedtuple('IngestResult',
+                                      'added duplicates unknown')
+
+# The number of close approaches that `NEODatabase.query` scans between checks
+# for cancellation and timeouts.
+CHECK_EVERY = 4096
+
+
+class QueryStats:
+    """The work done by a query of an `NEODatabase`.
+
+    The counts are updated as the query's stream of results is consumed, so
+    they describe as much of the query as has run.
+
+    The plan is 'scan' for a scan of every close approach, or 'cache' for a
+    scan of a cached result set (of `cached_rows` rows, covering the first
+    `cached_scanned` close approaches) and of the close approaches beyond it.
+    """
+
+    def __init__(self):
+        """Create a new `QueryStats`, for a query that hasn't started."""
+        self.filters = ()
+        self.plan = 'scan'
+        self.cached_rows = None
+        self.cached_scanned = None
+        self.total = 0
+        self.scanned = 0
+        self.emitted = 0
+        self.evaluations = []
+        self.failures = []
+        self.seconds = 0.0
+        self.complete = False
+
+    def passes(self, position):
+        """Return the number of times a filter passed.
+
+        :param position: The position of the filter in `filters`.
+        """
+        return self.evaluations[position] - self.failures[position]
+
+    def explain(self):
+        """Describe the plan of the query and the work that it did.
+
+        :return: A list of lines of text.
+        """
+        if self.plan == 'cache':
+            lines = [f"Plan: filter a cached result set of "
+                     f"{self.cached_rows:,} rows, then scan the "
+                     f"{self.total - self.cached_scanned:,} close approaches "
+                     f"beyond the {self.cached_scanned:,} that it covers."]
+        else:
+            lines = [f"Plan: scan all {self.total:,} close approaches."]
+        rate = self.scanned / self.seconds if self.seconds > 0 else 0
+        lines.append(
+            f"Scanned {self.scanned:,} rows and emitted {self.emitted:,} in "
+            f"{self.seconds:.3f} s ({rate:,.0f} rows/s)"
+            + ("." if self.complete else ", before the query was stopped."))
+        for position, f in enumerate(self.filters):
+            evaluations = self.evaluations[position]
+            passes = self.passes(position)
+            share = f"{passes / evaluations:.1%}" if evaluations else '-'
+            value = getattr(f, 'date', f.value)
+            name = (f"{type(f).__name__} "
+                    f"{OPERATOR_SYMBOLS.get(f.op, f.op.__name__)} {value}")
+            lines.append(f"  {name:<32} {evaluations:>11,} evaluated "
+                         f"{passes:>11,} passed {share:>7}")
+        return lines
+
+
+class QueryCancelled(Exception):
+    """A query was cancelled before it finished scanning."""
+
+
+class QueryTimeout(QueryCancelled):
+    """A query ran out of time before it finished scanning."""
+
+
+class ApproachesView(collections.abc.Sequence):
+    """A read-only view of a contiguous range of a list of close approaches.
+
+    An `NEODatabase` keeps all close approaches grouped by NEO in one list,
+    and each `NearEarthObject`'s `.approaches` is a view of its own range of
+    that list, so iterating over them reads a contiguous block of memory.
+
+    Close approaches that are added to the database later are kept in a list
+    of `extra` approaches, after the range. The list is only ever appended
+    to, and each view covers a prefix of it, so extending a view doesn't copy
+    the approaches that were added before.
+    """
+
+    __slots__ = ('_approaches', '_start', '_stop', '_extra', '_extra_count')
+
+    def __init__(self, approaches, start, stop, extra=None, extra_count=0):
+        """Create a new view of `approaches[start:stop]`, followed by extras.
+
+        :param approaches: A list of `CloseApproach`es.
+        :param start: The index of the first close approach in the view.
+        :param stop: The index after the last close approach in the view.
+        :param extra: A list of further `CloseApproach`es, or None.
+        :param extra_count: The number of the further approaches, from the
+        start of `extra`, in the view.
+        """
+        self._approaches = approaches
+        self._start = start
+        self._stop = stop
+        self._extra = extra
+        self._extra_count = extra_count
+
+    def extended(self, approaches):
+        """Return a new view of this view's approaches, followed by others.
+
+        This view is unchanged. The new approaches are appended to the shared
+        list of extras, unless a view has been extended from this one before,
+        in which case this view's extras are copied first.
+
+        :param approaches: An iterable of further `CloseApproach`es.
+        :return: A new `ApproachesView`.
+        """
+        extra = self._extra
+        if extra is None or len(extra) != self._extra_count:
+            extra = [] if extra is None else extra[:self._extra_count]
+        extra.extend(approaches)
+        return ApproachesView(self._approaches, self._start, self._stop,
+                              extra, len(extra))
+
+    def __len__(self):
+        """Return the number of close approaches in this view."""
+        return self._stop - self._start + self._extra_count
+
+    def __getitem__(self, index):
+        """Return the close approach(es) at an index or slice of this view."""
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ApproachesView index out of range")
+        if index >= self._stop - self._start:
+            return self._extra[index - (self._stop - self._start)]
+        return self._approaches[self._start + index]
+
+    def __iter__(self):
+        """Iterate over the close approaches in this view, in order."""
+        # Slicing copies a contiguous block of references in one go, which is
+        # faster than indexing the list once per approach.
+        approaches = self._approaches[self._start:self._stop]
+        if self._extra_count:
+            approaches.extend(self._extra[:self._extra_count])
+        return iter(approaches)
+
+    def __repr__(self):
+        """Return `repr(self)`, listing the close approaches in this view."""
+        return f"ApproachesView({list(self)!r})"
+
+
+class _DeferredApproaches(collections.abc.Sequence):
+    """A placeholder for the approaches of an NEO that haven't been loaded.
+
+    The first access calls a loader, and any access defers to the close
+    approaches it returns. A lazy `NEODatabase` uses a loader that links the
+    database, which replaces this placeholder with the NEO's `ApproachesView`.
+    """
+
+    __slots__ = ('_load', '_approaches')
+
+    def __init__(self, load):
+        """Create a placeholder for the approaches returned by `load()`."""
+        self._load = load
+        self._approaches = None
+
+    def _loaded(self):
+        """Load the close approaches, if needed, and return them."""
+        if self._approaches is None:
+            self._approaches = self._load()
+        return self._approaches
+
+    def __len__(self):
+        """Return the number of close approaches of the NEO."""
+        return len(self._loaded())
+
+    def __getitem__(self, index):
+        """Return the close approach(es) of the NEO at an index (or slice)."""
+        return self._loaded()[index]
+
+    def __iter__(self):
+        """Iterate over the close approaches of the NEO, in order."""
+        return iter(self._loaded())
+
+    def __repr__(self):
+        """Return `repr(self)`, listing the close approaches of the NEO."""
+        return repr(self._loaded())
 
 
 class NEODatabase:
@@ -22,7 +224,7 @@ class NEODatabase:
     querying for close approaches that match criteria.
     """
 
-    def __init__(self, neos, approaches):
+    def __init__(self, neos, approaches, index=None, cache=None):
         """Create a new `NEODatabase`.
 
         As a precondition, this constructor assumes that the collections of
@@ -37,26 +239,263 @@ class NEODatabase:
         NEO has a collection of that NEO's close approaches, and the `.neo`
         attribute of each close approach references the appropriate NEO.
 
-        :param neos: A collection of `NearEarthObject`s.
-        :param approaches: A collection of `CloseApproach`es.
+        Either collection may instead be given as a zero-argument callable
+        that loads it (such as a `functools.partial` of `extract.load_neos`).
+        In that case, the database is lazy: the NEOs are only loaded when an
+        NEO is first looked up, and the close approaches are only loaded and
+        linked when they're first needed - by `query`, or by accessing the
+        `.approaches` of an NEO. Otherwise, the NEOs and close approaches are
+        linked right away.
+
+        :param neos: A collection of `NearEarthObject`s, or a callable that
+        loads one.
+        :param approaches: A collection of `CloseApproach`es, or a callable
+        that loads one.
+        :param index: An optional `index.DataIndex` of the data files. While
+        the NEOs of a lazy database aren't loaded, NEOs are looked up in the
+        index, and their approaches are read from the index when accessed.
+        :param cache: An optional `cache.QueryCache` in which to remember the
+        results of queries, to answer narrower queries from them.
         """
-        self._neos = neos
-        self._approaches = approaches
-        self.neos_dict_des = {}
-        self.neos_dict_name = {}
-        # Use dictionary as an auxiliary data structures?
-        for count, neo in enumerate(self._neos):
-            self.neos_dict_des[neo.designation] = self._neos[count]
-            if neo.name:
-                self.neos_dict_name[neo.name] = self._neos[count]
-                # neos_list = self.neos_dict_name.get(neo.name, [])
-                # neos_list.append(self._neos[count])
-                # self.neos_dict_name[neo.name] = neos_list
-        # Link together the NEOs and their close approaches.
-        for count, ca in enumerate(self._approaches):
-            self._approaches[count].neo = self.neos_dict_des[ca._designation]
-            self.neos_dict_des[ca._designation].approaches.append(
-                self._approaches[count])
+        self._neos_source = neos
+        self._approaches_source = approaches
+        self._neos = None
+        self._approaches = None
+        self._linked = False
+        self.index = index
+        self.cache = cache
+        # The `QueryStats` of the most recent query.
+        self.last_query_stats = None
+        # A `profiling.Profile` in which to record each phase of loading.
+        self.profile = DISABLED
+        # The time taken by each phase of loading, in seconds.
+        self.load_times = {}
+        # The number of batches of approaches added since loading, and the
+        # keys of all approaches (built when the first batch is added).
+        self.version = 0
+        self._approach_keys = None
+        # Guard lazy loading, in case the database is shared between threads.
+        # The NEOs have their own lock, so that lookups needn't wait for the
+        # close approaches to be loaded and linked.
+        self._lock = threading.RLock()
+        self._neos_lock = threading.RLock()
+        if not (callable(neos) or callable(approaches)):
+            self._ensure_linked()
+
+    def _ensure_neos(self, placeholders=True):
+        """Load the NEOs, and index them by designation and name, if needed.
+
+        :param placeholders: Whether to give each NEO placeholder approaches,
+        which link the database on first access.
+        """
+        if self._neos is not None:
+            return
+        with self._neos_lock:
+            if self._neos is not None:
+                return
+            start = time.perf_counter()
+            with self.profile.phase('neos') as phase:
+                neos = self._neos_source
+                if callable(neos):
+                    neos = neos()
+                self.neos_dict_des = {}
+                self.neos_dict_name = {}
+                # Use dictionary as an auxiliary data structures?
+                for neo in neos:
+                    self.neos_dict_des[neo.designation] = neo
+                    if neo.name:
+                        self.neos_dict_name[neo.name] = neo
+                    if placeholders:
+                        # Link on first access of any NEO's approaches.
+                        neo.approaches = _DeferredApproaches(
+                            functools.partial(self._linked_approaches, neo))
+                phase.rows = len(neos)
+            self.load_times['neos'] = time.perf_counter() - start
+            self._neos = neos
+
+    def _ensure_approaches(self):
+        """Load the close approaches, without linking them, if needed."""
+        if self._approaches is not None:
+            return
+        with self._lock:
+            if self._approaches is not None:
+                return
+            start = time.perf_counter()
+            with self.profile.phase('approaches') as phase:
+                approaches = self._approaches_source
+                if callable(approaches):
+                    approaches = approaches()
+                phase.rows = len(approaches)
+            self.load_times['approaches'] = time.perf_counter() - start
+            self._approaches = approaches
+
+    def _ensure_linked(self):
+        """Load the close approaches and link them to the NEOs, if needed."""
+        if self._linked:
+            return
+        with self._lock:
+            if self._linked:
+                return
+            self._ensure_neos(placeholders=False)
+            self._ensure_approaches()
+            # Link together the NEOs and their close approaches.
+            start = time.perf_counter()
+            with self.profile.phase('link') as phase:
+                self._link()
+                phase.rows = len(self._approaches)
+            self.load_times['link'] = time.perf_counter() - start
+            self._linked = True
+
+    @property
+    def neos_loaded(self):
+        """Return whether the NEOs have been loaded."""
+        return self._neos is not None
+
+    @property
+    def linked(self):
+        """Return whether the close approaches have been loaded and linked."""
+        return self._linked
+
+    def ensure_linked(self):
+        """Load and link the close approaches now, if they aren't yet.
+
+        Unlike `load`, this doesn't prepare the NEOs for lookups while the
+        close approaches load, so it's the quickest way to wait for a query's
+        data.
+        """
+        self._ensure_linked()
+
+    def load(self, progress=None):
+        """Load and link all of the data now, rather than on first use.
+
+        This can run on a background thread while other threads use the
+        database: each lookup or query waits only until the data it needs is
+        ready.
+
+        :param progress: An optional callable, called after each phase of
+        loading with the name of the phase ('neos', 'approaches' or 'link'),
+        the number of rows in that phase, and the time it took in seconds (as
+        recorded in `load_times`).
+        """
+        phases = (('neos', self._ensure_neos),
+                  ('approaches', self._ensure_approaches),
+                  ('link', self._ensure_linked))
+        for phase, ensure in phases:
+            # Another thread may have done this phase (or be doing it) first.
+            ensure()
+            if progress is not None and phase in self.load_times:
+                rows = len(self._neos if phase == 'neos'
+                           else self._approaches)
+                progress(phase, rows, self.load_times[phase])
+
+    def _linked_approaches(self, neo):
+        """Link the database, and return an NEO's linked approaches.
+
+        :param neo: A `NearEarthObject` in this database.
+        :return: The NEO's `ApproachesView`.
+        """
+        self._ensure_linked()
+        approaches = neo.approaches
+        # An NEO whose designation is shadowed by a later duplicate is never
+        # linked, and has no approaches.
+        if isinstance(approaches, _DeferredApproaches):
+            return ()
+        return approaches
+
+    def _from_index(self, neo):
+        """Give an NEO read from the index approaches read from the index.
+
+        :param neo: A `NearEarthObject` read from `self.index`, or None.
+        :return: The same NEO, or None.
+        """
+        if neo is not None:
+            neo.approaches = _DeferredApproaches(
+                functools.partial(self.index.approaches_of, neo))
+        return neo
+
+    def _link(self):
+        """Link the NEOs and the close approaches together, in one bulk pass.
+
+        Each NEO is identified by an integer ID - its position in
+        `self.neos_dict_des`. The close approaches are grouped by NEO ID into
+        one contiguous list, `self._approaches_by_neo`, in which the approaches
+        of the NEO with ID `i` are at the indices `self._neo_offsets[i]` up to
+        (but excluding) `self._neo_offsets[i + 1]`, in compressed sparse row
+        style. Each NEO's `.approaches` is a view of its range of that list.
+        """
+        # Group the approaches by NEO, with a single lookup per approach.
+        groups = {designation: [] for designation in self.neos_dict_des}
+        for approach in self._approaches:
+            groups[approach._designation].append(approach)
+
+        # Lay the groups out contiguously, in order of NEO ID.
+        self._approaches_by_neo = list(
+            itertools.chain.from_iterable(groups.values()))
+        self._neo_offsets = [0]
+        self._neo_offsets.extend(itertools.accumulate(
+            map(len, groups.values())))
+
+        offsets = self._neo_offsets
+        for neo_id, (neo, group) in enumerate(zip(self.neos_dict_des.values(),
+                                                  groups.values())):
+            designation = neo.designation
+            for approach in group:
+                approach.neo = neo
+                # Share the NEO's designation rather than keeping a copy.
+                approach._designation = designation
+            neo.approaches = ApproachesView(
+                self._approaches_by_neo, offsets[neo_id], offsets[neo_id + 1])
+
+    def add_approaches(self, approaches):
+        """Add a batch of new close approaches to the database.
+
+        Each new approach is linked to its NEO, and appended to the NEO's
+        approaches and to the results of `query`. The cost is proportional to
+        the size of the batch, rather than to the size of the database -
+        except that the first batch builds the set of keys of the approaches
+        in the database.
+
+        Approaches whose `key` - `(designation, orbit_id, jd)` - is already in
+        the database are skipped as duplicates, as are approaches of NEOs that
+        aren't in the database.
+
+        :param approaches: An iterable of unlinked `CloseApproach`es.
+        :return: An `IngestResult` of the numbers of approaches that were
+        added, that were duplicates, and that were of unknown NEOs.
+        """
+        with self._lock:
+            self._ensure_linked()
+            if self._approach_keys is None:
+                self._approach_keys = {approach.key
+                                       for approach in self._approaches}
+            keys = self._approach_keys
+
+            added = []
+            by_neo = {}
+            duplicates = unknown = 0
+            for approach in approaches:
+                neo = self.neos_dict_des.get(approach._designation)
+                if neo is None:
+                    unknown += 1
+                    continue
+                key = approach.key
+                if key in keys:
+                    duplicates += 1
+                    continue
+                keys.add(key)
+                approach.neo = neo
+                approach._designation = neo.designation
+                added.append(approach)
+                by_neo.setdefault(neo, []).append(approach)
+
+            # Replace (rather than mutate) each view, so that readers of the
+            # old view see a consistent snapshot.
+            for neo, new in by_neo.items():
+                neo.approaches = neo.approaches.extended(new)
+            self._approaches.extend(added)
+            if added:
+                self.version += 1
+        return IngestResult(len(added), duplicates, unknown)
 
     def get_neo_by_designation(self, designation):
         """Find and return an NEO by its primary designation.
@@ -73,6 +512,10 @@ class NEODatabase:
         or `None`.
         """
         # Fetch an NEO by its primary designation.
+        if self._neos is None and self.index is not None:
+            return self._from_index(
+                self.index.neo_by_designation(designation))
+        self._ensure_neos()
         return self.neos_dict_des.get(designation, None)
 
     def get_neo_by_name(self, name):
@@ -90,10 +533,13 @@ class NEODatabase:
         :return: The `NearEarthObject` with the desired name, or `None`.
         """
         # Fetch an NEO by its name.
+        if self._neos is None and self.index is not None:
+            return self._from_index(self.index.neo_by_name(name))
+        self._ensure_neos()
         neo = self.neos_dict_name.get(name, None)
         return neo
 
-    def query(self, filters=()):
+    def query(self, filters=(), cancel=None, timeout=None, stats=None):
         """Query close approaches to yield those that match a set of filters.
 
         This generates a stream of `CloseApproach` objects that match all of
@@ -105,18 +551,126 @@ class NEODatabase:
         isn't guaranteed to be sorted meaningfully, although is often sorted
         by time.
 
+        If the database has a `cache.QueryCache`, a query whose filters are
+        at least as narrow as those of a cached query is only evaluated over
+        the cached results, and the results of each query with filters are
+        cached in turn (as far as it was scanned, if it's stopped early).
+
+        A query can be stopped cooperatively: every `CHECK_EVERY` approaches,
+        the scan checks whether it has been cancelled or has run out of time,
+        and if so raises `QueryCancelled` (or `QueryTimeout`) from the stream.
+
+        The work that the query does is counted, as it's done, in a
+        `QueryStats`, which is also kept as `last_query_stats`.
+
         :param filters: A collection of filters capturing user-specified
         criteria.
+        :param cancel: An optional `threading.Event` that cancels the query
+        when it's set.
+        :param timeout: An optional number of seconds after which the query
+        times out. Only the time spent scanning counts: not loading, nor
+        the time that the stream is paused between results, so a stream can
+        be resumed later, page by page.
+        :param stats: An optional `QueryStats` in which to count the work of
+        the query. If None, a new one is used.
         :return: A stream of matching `CloseApproach` objects.
         """
-        # Generate `CloseApproach` objects that match all of the filters.
-        for approach in self._approaches:
-            if all(f(approach) for f in filters):
-                yield approach
-            # flag = True
-            # for filter in filters:
-            #     if not filter(approach):
-            #         flag = False
-            #         break
-            # if flag:
-            #     yield approach
+        filters = tuple(filters)
+        if stats is None:
+            stats = QueryStats()
+        stats.filters = filters
+        stats.evaluations = [0] * len(filters)
+        stats.failures = [0] * len(filters)
+        self.last_query_stats = stats
+
+        self._ensure_linked()
+        approaches = self._approaches
+        total = len(approaches)
+        cache = self.cache if filters else None
+        found = cache.lookup(filters, total) if cache is not None else None
+        indexed = tuple(enumerate(filters))
+        if found is None:
+            parts = [(range(total), indexed)]
+        else:
+            # Evaluate only the new filters over the cached result set, and
+            # every filter over the rows added since it was cached.
+            rows, scanned, remaining = found
+            parts = [(rows, tuple((position, f) for position, f in indexed
+                                  if f in remaining)),
+                     (range(scanned, total), indexed)]
+            stats.plan = 'cache'
+            stats.cached_rows = len(rows)
+            stats.cached_scanned = scanned
+        stats.total = total
+
+        # Row IDs only increase through the scan, so however early it stops,
+        # the results found so far are all of those up to the last one.
+        matches = cache.new_rows() if cache is not None else None
+        covered = 0
+        try:
+            for row in self._scan(parts, stats, cancel, timeout):
+                if matches is not None:
+                    matches.append(row)
+                covered = row + 1
+                stats.emitted += 1
+                yield approaches[row]
+            covered = total
+            stats.complete = True
+        finally:
+            if matches is not None:
+                cache.store(filters, matches, covered)
+
+    def _scan(self, parts, stats, cancel=None, timeout=None):
+        """Generate the row IDs of the close approaches that pass filters.
+
+        Every `CHECK_EVERY` rows, check whether the scan has been cancelled or
+        has run out of time, as described in `query`. The rows scanned, the
+        evaluations and failures of each filter, and the time spent scanning
+        are counted in `stats` as the scan goes.
+
+        :param parts: An iterable of `(rows, filters)` pairs, of a sequence of
+        row IDs (positions in the list of close approaches) and the filters to
+        evaluate on those rows, as `(position, filter)` pairs of the filter's
+        position in `stats.filters` and the filter.
+        :param stats: The `QueryStats` of the query.
+        :param cancel: An optional `threading.Event` that cancels the scan.
+        :param timeout: An optional number of seconds of scanning allowed.
+        :yield: The row ID of each close approach that passes its filters.
+        """
+        approaches = self._approaches
+        evaluations = stats.evaluations
+        failures = stats.failures
+        scanned = 0
+        started = time.perf_counter()
+        deadline = None if timeout is None else started + timeout
+        try:
+            for rows, filters in parts:
+                for start in range(0, len(rows), CHECK_EVERY):
+                    if cancel is not None and cancel.is_set():
+                        raise QueryCancelled("The query was cancelled.")
+                    if deadline is not None and time.perf_counter() > deadline:
+                        raise QueryTimeout(
+                            f"The query timed out after {timeout:g} s.")
+                    for row in rows[start:start + CHECK_EVERY]:
+                        scanned += 1
+                        approach = approaches[row]
+                        for position, f in filters:
+                            evaluations[position] += 1
+                            if not f(approach):
+                                failures[position] += 1
+                                break
+                        else:
+                            # Don't count the time that the stream is paused.
+                            paused = time.perf_counter()
+                            stats.seconds += paused - started
+                            stats.scanned += scanned
+                            scanned = 0
+                            started = None
+                            yield row
+                            started = time.perf_counter()
+                            if deadline is not None:
+                                deadline += started - paused
+        finally:
+            stats.scanned += scanned
+            if started is not None:
+                stats.seconds += time.perf_counter() - started
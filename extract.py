@@ -10,80 +10,775 @@ formatted as described in the project instructions, into a collection of
 The main module calls these functions with the arguments provided at the
 command line, and uses the resulting collections to build an `NEODatabase`.
 
+Some helpers here locate records by byte offset without parsing whole files:
+`csv_record_spans` finds the records of a CSV file (respecting quoted fields),
+and `cad_fields` and `cad_row_spans` find the fields and the rows of the data
+array of a close approach JSON file. Single records are parsed with
+`neo_columns` and `neo_from_row`, or `approach_fields` and
+`approach_from_row`, as the `index` module does for the records it looks up.
+
+A `ConcurrentLoader` parses a NEO file and a close approach file at the same
+time, in worker processes, so that loading both takes about as long as loading
+the larger one. `load_neos_parallel` and `load_approaches_parallel` split a
+data file into chunks of records and parse them in parallel.
+
 You'll edit this file in Task 2.
 """
+import array
+import concurrent.futures
 import csv
+import functools
+import io
+import itertools
 import json
+import re
+import threading
+import time
 
+from helpers import cd_to_minutes
 from models import NearEarthObject, CloseApproach
 
 
-def load_neos(neo_csv_path):
+# The 'fields' list, and the start of the 'data' array, of a `cad.json` file.
+_CAD_FIELDS = re.compile(rb'"fields"\s*:\s*(\[[^\]]*\])')
+_CAD_DATA = re.compile(rb'"data"\s*:\s*\[')
+
+# A row of the 'data' array, with its preceding separator. Rows are arrays of
+# scalars, so they don't contain any brackets outside of strings.
+_CAD_ROW = re.compile(rb'\s*,?\s*(\[(?:[^\[\]"]|"(?:[^"\\]|\\.)*")*\])')
+
+# The end of a row of the 'data' array, followed by the separator before the
+# next row, or by the end of the array.
+_CAD_ROW_END = re.compile(rb'\]\s*,')
+_CAD_DATA_END = re.compile(rb'\]\s*\]')
+
+
+def csv_record_spans(data, start=0, stop=None):
+    """Find the byte ranges of the records of a CSV file.
+
+    A newline only ends a record if it isn't inside a quoted field - that is,
+    if an even number of quote characters precede it within the record.
+
+    :param data: The contents of a CSV file, as bytes.
+    :param start: The offset at which a record starts.
+    :param stop: The offset at which to stop, which must be a record boundary.
+    If None, stop at the end of `data`.
+    :yield: The `(start, end)` offsets of each record, including its newline.
+    """
+    if stop is None:
+        stop = len(data)
+    position = start
+    quotes = 0
+    while position < stop:
+        newline = data.find(b'\n', position, stop)
+        end = stop if newline == -1 else newline + 1
+        quotes += data.count(b'"', position, end)
+        position = end
+        if quotes % 2 == 0:
+            yield start, end
+            start = end
+            quotes = 0
+    if start < stop:
+        yield start, stop
+
+
+def csv_chunk_spans(data, start, chunk_bytes):
+    """Split the records of a CSV file into chunks of about `chunk_bytes`.
+
+    Each chunk ends at the first record boundary at or after `chunk_bytes`
+    from its start. Only the quotes within each chunk are counted, so finding
+    the boundaries is much cheaper than finding every record.
+
+    :param data: The contents of a CSV file, as bytes.
+    :param start: The offset at which a record starts.
+    :param chunk_bytes: The approximate size of each chunk, in bytes.
+    :return: A list of the `(start, end)` offsets of each chunk.
+    """
+    spans = []
+    stop = len(data)
+    while start < stop:
+        cut = min(start + chunk_bytes, stop)
+        quotes = data.count(b'"', start, cut)
+        while cut < stop:
+            newline = data.find(b'\n', cut)
+            if newline == -1:
+                cut = stop
+                break
+            quotes += data.count(b'"', cut, newline)
+            cut = newline + 1
+            if quotes % 2 == 0:
+                break
+        spans.append((start, cut))
+        start = cut
+    return spans
+
+
+def cad_fields(data):
+    """Find the 'fields' list of a `cad.json` file without parsing the data.
+
+    :param data: The contents of a close approach JSON file, as bytes.
+    :return: The list of field names.
+    """
+    match = _CAD_FIELDS.search(data)
+    if match is None:
+        raise ValueError("No 'fields' list in the close approach data.")
+    return json.loads(match.group(1))
+
+
+def cad_row_spans(data, start=None):
+    """Find the byte ranges of the rows of the data array of a `cad.json` file.
+
+    :param data: The contents of a close approach JSON file, as bytes.
+    :param start: The offset of the first row (or the separator before it). If
+    None, start at the beginning of the 'data' array.
+    :yield: The `(start, end)` offsets of each row, from its opening bracket
+    to its closing bracket, inclusive.
+    """
+    if start is None:
+        match = _CAD_DATA.search(data)
+        if match is None:
+            raise ValueError("No 'data' array in the close approach data.")
+        start = match.end()
+    match = _CAD_ROW.match(data, start)
+    while match is not None:
+        yield match.span(1)
+        match = _CAD_ROW.match(data, match.end())
+
+
+def _outside_strings(data, start, position):
+    """Return whether a position in JSON data is outside of any string.
+
+    :param data: JSON data, as bytes.
+    :param start: An offset outside of any string, before `position`.
+    :param position: An offset.
+    :return: Whether `position` is outside of any string.
+    """
+    # Escaped quotes don't end a string. The close approach data has no
+    # backslashes, let alone escaped backslashes before a closing quote.
+    quotes = data.count(b'"', start, position)
+    escaped = data.count(b'\\"', start, position)
+    return (quotes - escaped) % 2 == 0
+
+
+def _search_outside_strings(pattern, data, start, position, stop=None):
+    """Find the first match of a pattern that isn't inside a JSON string.
+
+    :param pattern: A compiled regular expression.
+    :param data: JSON data, as bytes.
+    :param start: An offset outside of any string, at or before `position`.
+    :param position: The offset at which to start searching.
+    :param stop: The offset at which to stop searching. If None, search to the
+    end of `data`.
+    :return: The first match outside of strings, or None.
+    """
+    if stop is None:
+        stop = len(data)
+    match = pattern.search(data, position, stop)
+    while match is not None and not _outside_strings(data, start,
+                                                     match.start()):
+        match = pattern.search(data, match.end(), stop)
+    return match
+
+
+def cad_chunk_spans(data, start, chunk_bytes):
+    """Split the rows of the data array of a `cad.json` file into chunks.
+
+    Each chunk ends at the end of the first row that ends at or after
+    `chunk_bytes` from its start, or at the end of the last row. A chunk
+    starts at the separator after the previous row (if any), so the rows of a
+    chunk can be decoded by enclosing it in brackets once it's stripped of
+    leading separators. Only the quotes within each chunk are counted, so
+    finding the boundaries is much cheaper than finding every row.
+
+    :param data: The contents of a close approach JSON file, as bytes.
+    :param start: The offset just after the opening bracket of the data array.
+    :param chunk_bytes: The approximate size of each chunk, in bytes.
+    :return: A list of the `(start, end)` offsets of each chunk.
+    """
+    if data[start:start + 64].strip().startswith(b']'):
+        return []
+    spans = []
+    while True:
+        # The first row end after the cut, and the end of the array if it's
+        # before that row end.
+        match = _search_outside_strings(_CAD_ROW_END, data, start,
+                                        start + chunk_bytes)
+        stop = match.start() if match else len(data)
+        last = _search_outside_strings(_CAD_DATA_END, data, start, start,
+                                       stop + 1)
+        if last is not None:
+            spans.append((start, last.start() + 1))
+            return spans
+        if match is None:
+            raise ValueError("Unterminated 'data' array in the close approach "
+                             "data.")
+        spans.append((start, match.start() + 1))
+        start = match.start() + 1
+
+
+def neo_columns(header):
+    """Find the columns of a `neos.csv` header that describe an NEO.
+
+    :param header: The header row of a CSV file of NEOs.
+    :return: The indices of the 'pdes', 'name', 'diameter' and 'pha' columns.
+    """
+    return (header.index('pdes'), header.index('name'),
+            header.index('diameter'), header.index('pha'))
+
+
+def neo_from_row(line, columns):
+    """Create a `NearEarthObject` from a row of a `neos.csv` file.
+
+    :param line: A row of a CSV file of NEOs, as a list of strings.
+    :param columns: The column indices produced by `neo_columns`.
+    :return: A new `NearEarthObject`.
+    """
+    pde_index, name_index, diameter_index, hazardous_index = columns
+
+    hazardous = line[hazardous_index]
+    if hazardous == 'Y':
+        hazardous = True
+    else:
+        hazardous = False
+
+    diameter = line[diameter_index]
+    if len(diameter) == 0:
+        diameter = 'NaN'
+
+    name = line[name_index]
+    if len(name) == 0:
+        name = None
+    return NearEarthObject(pde=line[pde_index],
+                           name=name,
+                           diameter=diameter,
+                           hazardous=hazardous)
+
+
+def approach_fields(fields):
+    """Find the fields of a `cad.json` row that describe a close approach.
+
+    :param fields: The 'fields' list of a JSON file of close approaches.
+    :return: The indices of the 'cd', 'dist', 'v_rel' and 'des' fields, and of
+    the optional 'orbit_id' and 'jd' fields (or None, if they're missing).
+    """
+    def optional(field):
+        return fields.index(field) if field in fields else None
+
+    return (fields.index('cd'), fields.index('dist'),
+            fields.index('v_rel'), fields.index('des'),
+            optional('orbit_id'), optional('jd'))
+
+
+def approach_from_row(ca, fields):
+    """Create a `CloseApproach` from a row of the data of a `cad.json` file.
+
+    :param ca: A row of close approach data, as a list of strings.
+    :param fields: The field indices produced by `approach_fields`.
+    :return: A new `CloseApproach`.
+    """
+    (time_index, distance_index, velocity_index, designation_index,
+     orbit_id_index, jd_index) = fields
+
+    distance = ca[distance_index]
+    if len(distance) == 0:
+        distance = 'nan'
+
+    velocity = ca[velocity_index]
+    if len(velocity) == 0:
+        velocity = 'nan'
+
+    return CloseApproach(
+        time=ca[time_index],
+        distance=distance,
+        velocity=velocity,
+        _designation=ca[designation_index],
+        orbit_id=None if orbit_id_index is None else ca[orbit_id_index],
+        jd=None if jd_index is None else ca[jd_index])
+
+
+# The number of rows between reports of the progress of loading.
+PROGRESS_EVERY = 50000
+
+
+def _convert_rows(rows, convert, columns, progress=None):
+    """Convert rows of a data file into objects, reporting the progress.
+
+    :param rows: An iterable of rows.
+    :param convert: A callable that converts a row, given the row and the
+    indices of its columns, such as `neo_from_row`.
+    :param columns: The indices of the columns of the rows.
+    :param progress: An optional callable, called with the number of rows
+    converted so far, every `PROGRESS_EVERY` rows.
+    :return: A list of the converted rows.
+    """
+    if progress is None:
+        return [convert(row, columns) for row in rows]
+    rows = iter(rows)
+    converted = []
+    while True:
+        batch = [convert(row, columns)
+                 for row in itertools.islice(rows, PROGRESS_EVERY)]
+        if not batch:
+            return converted
+        converted.extend(batch)
+        progress(len(converted))
+
+
+def load_neos(neo_csv_path, progress=None):
     """Read near-Earth object information from a CSV file.
 
     :param neo_csv_path: A path to a CSV file containing data about near-Earth
     objects.
+    :param progress: An optional callable, called with the number of NEOs
+    read so far - 0 when the file is opened, and then every `PROGRESS_EVERY`
+    NEOs.
     :return: A collection of `NearEarthObject`s.
     """
     # Load NEO data from the given CSV file.
     with open(neo_csv_path, mode='r') as file:
+        if progress is not None:
+            progress(0)
         neo_tabular = csv.reader(file)
-        header = next(neo_tabular)
-        pde_index = header.index('pdes')
-        name_index = header.index('name')
-        diameter_index = header.index('diameter')
-        hazardous_index = header.index('pha')
-        NEO_collection = []
-        for line in neo_tabular:
-
-            hazardous = line[hazardous_index]
-            if hazardous == 'Y':
-                hazardous = True
-            else:
-                hazardous = False
-
-            diameter = line[diameter_index]
-            if len(diameter) == 0:
-                diameter = 'NaN'
-
-            name = line[name_index]
-            if len(name) == 0:
-                name = None
-            NEO_collection.append(NearEarthObject(pde=line[pde_index],
-                                                  name=name,
-                                                  diameter=diameter,
-                                                  hazardous=hazardous))
+        columns = neo_columns(next(neo_tabular))
+        NEO_collection = _convert_rows(neo_tabular, neo_from_row, columns,
+                                       progress)
     return NEO_collection
 
 
-def load_approaches(cad_json_path):
+def load_approaches(cad_json_path, progress=None):
     """Read close approach data from a JSON file.
 
     :param cad_json_path: A path to a JSON file containing data about close
     approaches.
+    :param progress: An optional callable, called with the number of close
+    approaches read so far - 0 when the file is opened, and then every
+    `PROGRESS_EVERY` approaches, once the JSON has been parsed.
     :return: A collection of `CloseApproach`es.
     """
     # Load close approach data from the given JSON file.
     with open(cad_json_path) as file:
+        if progress is not None:
+            progress(0)
         ca_dict = json.load(file)
-    fields = ca_dict['fields']
-    time_index = fields.index('cd')
-    distance_index = fields.index('dist')
-    velocity_index = fields.index('v_rel')
-    designation_index = fields.index('des')
-    CA_collection = []
-    for ca in ca_dict['data']:
-
-        distance = ca[distance_index]
-        if len(distance) == 0:
-            distance = 'nan'
-
-        velocity = ca[velocity_index]
-        if len(velocity) == 0:
-            velocity == 'nan'
-
-        CA_collection.append(CloseApproach(time=ca[time_index],
-                                           distance=distance,
-                                           velocity=velocity,
-                                           _designation=ca[designation_index]))
+    fields = approach_fields(ca_dict['fields'])
+    CA_collection = _convert_rows(ca_dict['data'], approach_from_row, fields,
+                                  progress)
     return CA_collection
+
+
+# The default approximate size of the chunks of a data file that are parsed
+# in parallel, in bytes.
+CHUNK_BYTES = 1 << 20
+
+# Close approaches without a time are handed off with this timestamp, which no
+# real approach has.
+_NO_TIME = -1
+
+
+def _neo_columns_from_rows(rows, columns):
+    """Convert rows of a `neos.csv` file into compact columns.
+
+    Columns are much cheaper to send between processes than `NearEarthObject`s:
+    the strings are gathered into one list per column, and the numbers and
+    flags are packed into arrays. (The strings aren't joined, since a quoted
+    CSV field may contain any separator.)
+
+    :param rows: Rows of a CSV file of NEOs, as lists of strings.
+    :param columns: The column indices produced by `neo_columns`.
+    :return: A tuple of a list of designations, a list of names (empty for
+    unnamed NEOs), an array of diameters and a `bytes` of hazardous flags.
+    """
+    pde_index, name_index, diameter_index, hazardous_index = columns
+    designations = []
+    names = []
+    diameters = array.array('d')
+    hazardous = bytearray()
+    for row in rows:
+        designations.append(row[pde_index])
+        names.append(row[name_index])
+        diameters.append(float(row[diameter_index] or 'nan'))
+        hazardous.append(row[hazardous_index] == 'Y')
+    return designations, names, diameters, bytes(hazardous)
+
+
+def _neos_from_columns(neo_columns):
+    """Create `NearEarthObject`s from the columns of `_neo_columns_from_rows`.
+
+    :param neo_columns: A tuple of NEO columns.
+    :return: A list of new `NearEarthObject`s.
+    """
+    designations, names, diameters, hazardous = neo_columns
+    return [NearEarthObject(pde=pde, name=name or None, diameter=diameter,
+                            hazardous=flag)
+            for pde, name, diameter, flag in zip(designations, names,
+                                                 diameters, hazardous)]
+
+
+def _approach_columns_from_rows(rows, fields):
+    """Convert rows of the data of a `cad.json` file into compact columns.
+
+    The calendar dates are converted into timestamps here, so the process that
+    builds the `CloseApproach`es doesn't have to parse them.
+
+    :param rows: Rows of close approach data, as lists of strings.
+    :param fields: The field indices produced by `approach_fields`.
+    :return: A tuple of lists of designations, orbit IDs and Julian dates
+    (empty where unknown), and arrays of timestamps, distances and velocities.
+    """
+    (time_index, distance_index, velocity_index, designation_index,
+     orbit_id_index, jd_index) = fields
+    designations = []
+    orbit_ids = []
+    jds = []
+    minutes = array.array('q')
+    distances = array.array('d')
+    velocities = array.array('d')
+    for row in rows:
+        designations.append(row[designation_index])
+        orbit_ids.append('' if orbit_id_index is None else row[orbit_id_index])
+        jds.append('' if jd_index is None else row[jd_index])
+        calendar_date = row[time_index]
+        minutes.append(cd_to_minutes(calendar_date) if calendar_date
+                       else _NO_TIME)
+        distances.append(float(row[distance_index] or 'nan'))
+        velocities.append(float(row[velocity_index] or 'nan'))
+    return designations, orbit_ids, jds, minutes, distances, velocities
+
+
+def _approaches_from_columns(approach_columns):
+    """Create `CloseApproach`es from columns of close approach data.
+
+    :param approach_columns: A tuple of close approach columns.
+    :return: A list of new `CloseApproach`es.
+    """
+    (designations, orbit_ids, jds, minutes, distances,
+     velocities) = approach_columns
+    from_minutes = CloseApproach.from_minutes
+    return [from_minutes(None if stamp == _NO_TIME else stamp, distance,
+                         velocity, designation, orbit_id or None, jd or None)
+            for designation, orbit_id, jd, stamp, distance, velocity in zip(
+                designations, orbit_ids, jds, minutes, distances,
+                velocities)]
+
+
+def _merge_columns(chunks):
+    """Concatenate the columns of consecutive chunks of a data file, in order.
+
+    :param chunks: A non-empty list of tuples of columns, as produced by
+    `_neo_columns_from_rows` or `_approach_columns_from_rows`.
+    :return: A tuple of the concatenated columns.
+    """
+    if len(chunks) < 2:
+        return chunks[0]
+    merged = []
+    for parts in zip(*chunks):
+        if isinstance(parts[0], list):
+            merged.append([value for part in parts for value in part])
+        elif isinstance(parts[0], bytes):
+            merged.append(b''.join(parts))
+        else:
+            column = array.array(parts[0].typecode)
+            for part in parts:
+                column.extend(part)
+            merged.append(column)
+    return tuple(merged)
+
+
+def _read_range(path, start, stop):
+    """Read a range of bytes of a file.
+
+    :param path: A path to a file.
+    :param start: The offset of the first byte to read.
+    :param stop: The offset after the last byte to read.
+    :return: The bytes.
+    """
+    with open(path, 'rb') as file:
+        file.seek(start)
+        return file.read(stop - start)
+
+
+def neo_csv_chunks(neo_csv_path, chunk_bytes=None):
+    """Find the header of a CSV file of NEOs, and split its records in chunks.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth
+    objects.
+    :param chunk_bytes: The approximate size of each chunk, in bytes. If None,
+    all of the records are in one chunk.
+    :return: A tuple of the column indices produced by `neo_columns`, and a
+    list of the `(start, end)` byte offsets of each chunk.
+    """
+    with open(neo_csv_path, 'rb') as file:
+        data = file.read()
+    header_start, header_end = next(csv_record_spans(data), (0, 0))
+    header = next(csv.reader([data[header_start:header_end].decode('utf-8')]))
+    if chunk_bytes is None:
+        spans = [(header_end, len(data))]
+    else:
+        spans = csv_chunk_spans(data, header_end, chunk_bytes)
+    return neo_columns(header), spans or [(header_end, header_end)]
+
+
+def _load_neo_chunk(neo_csv_path, columns, start, stop):
+    """Read a chunk of the records of a CSV file of NEOs into columns.
+
+    This runs in a worker process.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth
+    objects.
+    :param columns: The column indices produced by `neo_columns`.
+    :param start: The offset at which the chunk starts.
+    :param stop: The offset at which the chunk ends.
+    :return: A tuple of the NEO columns and the time spent, in seconds.
+    """
+    begin = time.perf_counter()
+    text = _read_range(neo_csv_path, start, stop).decode('utf-8')
+    rows = csv.reader(io.StringIO(text, newline=''))
+    neo_columns = _neo_columns_from_rows(rows, columns)
+    return neo_columns, time.perf_counter() - begin
+
+
+def _load_neo_file(neo_csv_path):
+    """Read all of the records of a CSV file of NEOs into columns.
+
+    This runs in a worker process.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth
+    objects.
+    :return: A tuple of the NEO columns and the time spent, in seconds.
+    """
+    begin = time.perf_counter()
+    with open(neo_csv_path, encoding='utf-8', newline='') as file:
+        rows = csv.reader(file)
+        columns = neo_columns(next(rows))
+        neo_data = _neo_columns_from_rows(rows, columns)
+    return neo_data, time.perf_counter() - begin
+
+
+def load_neos_parallel(neo_csv_path, processes=None, chunk_bytes=CHUNK_BYTES):
+    """Read near-Earth object information from a CSV file, in parallel.
+
+    The records are split into chunks, which are parsed into columns by a pool
+    of worker processes. The result is the same as that of `load_neos`.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth
+    objects.
+    :param processes: The number of worker processes. If None, use one for
+    each CPU.
+    :param chunk_bytes: The approximate size of each chunk, in bytes.
+    :return: A collection of `NearEarthObject`s.
+    """
+    columns, spans = neo_csv_chunks(neo_csv_path, chunk_bytes)
+    load_chunk = functools.partial(_load_neo_chunk, neo_csv_path, columns)
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        chunks = list(executor.map(load_chunk, *zip(*spans)))
+    return _neos_from_columns(_merge_columns([chunk for chunk, _ in chunks]))
+
+
+def cad_json_chunks(cad_json_path, chunk_bytes=None):
+    """Find the fields of a JSON file of close approaches, and chunk its rows.
+
+    :param cad_json_path: A path to a JSON file containing data about close
+    approaches.
+    :param chunk_bytes: The approximate size of each chunk, in bytes. If None,
+    all of the rows are in one chunk.
+    :return: A tuple of the field indices produced by `approach_fields`, and
+    a list of the `(start, end)` byte offsets of each chunk.
+    """
+    with open(cad_json_path, 'rb') as file:
+        data = file.read()
+    fields = approach_fields(cad_fields(data))
+    match = _CAD_DATA.search(data)
+    if match is None:
+        raise ValueError("No 'data' array in the close approach data.")
+    spans = cad_chunk_spans(data, match.end(), chunk_bytes or len(data))
+    return fields, spans or [(match.end(), match.end())]
+
+
+def _load_approach_chunk(cad_json_path, fields, start, stop):
+    """Read a chunk of the rows of a close approach JSON file into columns.
+
+    This runs in a worker process.
+
+    :param cad_json_path: A path to a JSON file containing data about close
+    approaches.
+    :param fields: The field indices produced by `approach_fields`.
+    :param start: The offset at which the chunk starts.
+    :param stop: The offset at which the chunk ends.
+    :return: A tuple of the close approach columns and the time spent, in
+    seconds.
+    """
+    begin = time.perf_counter()
+    chunk = _read_range(cad_json_path, start, stop).lstrip(b', \t\r\n')
+    rows = json.loads(b'[' + chunk + b']')
+    approach_columns = _approach_columns_from_rows(rows, fields)
+    return approach_columns, time.perf_counter() - begin
+
+
+def _load_approach_file(cad_json_path):
+    """Read all of the rows of a close approach JSON file into columns.
+
+    This runs in a worker process.
+
+    :param cad_json_path: A path to a JSON file containing data about close
+    approaches.
+    :return: A tuple of the close approach columns and the time spent, in
+    seconds.
+    """
+    begin = time.perf_counter()
+    with open(cad_json_path, 'rb') as file:
+        ca_dict = json.load(file)
+    approach_columns = _approach_columns_from_rows(
+        ca_dict['data'], approach_fields(ca_dict['fields']))
+    return approach_columns, time.perf_counter() - begin
+
+
+def load_approaches_parallel(cad_json_path, processes=None,
+                             chunk_bytes=CHUNK_BYTES):
+    """Read close approach data from a JSON file, in parallel.
+
+    The rows of the data array are split into chunks, which are decoded and
+    converted into columns by a pool of worker processes. The result is the
+    same as that of `load_approaches`.
+
+    :param cad_json_path: A path to a JSON file containing data about close
+    approaches.
+    :param processes: The number of worker processes. If None, use one for
+    each CPU.
+    :param chunk_bytes: The approximate size of each chunk, in bytes.
+    :return: A collection of `CloseApproach`es.
+    """
+    fields, spans = cad_json_chunks(cad_json_path, chunk_bytes)
+    load_chunk = functools.partial(_load_approach_chunk, cad_json_path,
+                                   fields)
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        chunks = list(executor.map(load_chunk, *zip(*spans)))
+    return _approaches_from_columns(
+        _merge_columns([chunk for chunk, _ in chunks]))
+
+
+class ConcurrentLoader:
+    """Load a NEO file and a close approach file concurrently.
+
+    Each file is parsed in a pool of worker processes, which hand its data
+    back as compact columns (see `_neo_columns_from_rows`). The objects are
+    then built from the columns in this process, when they're asked for. With
+    a `chunk_bytes`, the records of each file are also split into chunks
+    that are parsed in parallel; a worker finds the chunks, so that this
+    process never reads the files itself.
+
+    The files are parsed from when `start` is called for them, or else from
+    when they're first asked for, so a file that isn't needed is never read.
+    The `neos` and `approaches` methods can be given to a lazy `NEODatabase`
+    as its loaders. The time spent in each phase of loading is recorded, in
+    seconds, in `timings`.
+    """
+
+    PHASES = ('neos', 'approaches')
+
+    def __init__(self, neo_csv_path, cad_json_path, processes=None,
+                 chunk_bytes=None):
+        """Create a new `ConcurrentLoader` of a pair of data files.
+
+        :param neo_csv_path: A path to a CSV file of NEOs.
+        :param cad_json_path: A path to a JSON file of close approaches.
+        :param processes: The number of worker processes. If None, use two.
+        :param chunk_bytes: The approximate size of each chunk of the data
+        files, in bytes. If None, parse each file in one piece.
+        """
+        self.neo_csv_path = neo_csv_path
+        self.cad_json_path = cad_json_path
+        self.processes = processes or 2
+        self.chunk_bytes = chunk_bytes
+        self.timings = {}
+        self._executor = None
+        self._dispatcher = None
+        # For each started phase, the time it started, and a future of the
+        # list of futures of its chunks.
+        self._started = {}
+        self._plans = {}
+        self._dispatched = 0
+        self._lock = threading.Lock()
+
+    def start(self, *phases):
+        """Start parsing files in worker processes, if not yet started.
+
+        :param phases: The phases to start, of 'neos' and 'approaches'. If
+        none are given, start both.
+        :return: This loader.
+        """
+        with self._lock:
+            for phase in phases or self.PHASES:
+                if phase in self._plans:
+                    continue
+                if self._executor is None:
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.processes)
+                    self._dispatcher = (
+                        concurrent.futures.ThreadPoolExecutor(
+                            max_workers=len(self.PHASES)))
+                self._started[phase] = time.perf_counter()
+                self._plans[phase] = self._dispatcher.submit(self._dispatch,
+                                                             phase)
+                if len(self._plans) == len(self.PHASES):
+                    self._dispatcher.shutdown(wait=False)
+        return self
+
+    def _dispatch(self, phase):
+        """Submit the chunks of a file to the worker processes.
+
+        This runs on a thread of its own, so that waiting for a worker to
+        find the chunks of a file doesn't hold up the caller.
+
+        :param phase: The name of the file's phase, 'neos' or 'approaches'.
+        :return: A list of futures of the columns of each chunk, and the time
+        spent parsing it.
+        """
+        executor = self._executor
+        try:
+            if phase == 'neos':
+                path, find_chunks = self.neo_csv_path, neo_csv_chunks
+                load_file, load_chunk = _load_neo_file, _load_neo_chunk
+            else:
+                path, find_chunks = self.cad_json_path, cad_json_chunks
+                load_file, load_chunk = (_load_approach_file,
+                                         _load_approach_chunk)
+            if self.chunk_bytes is None:
+                return [executor.submit(load_file, path)]
+            columns, spans = executor.submit(find_chunks, path,
+                                             self.chunk_bytes).result()
+            return [executor.submit(load_chunk, path, columns, start, stop)
+                    for start, stop in spans]
+        finally:
+            with self._lock:
+                self._dispatched += 1
+                if self._dispatched == len(self.PHASES):
+                    # The workers exit once both files are parsed.
+                    executor.shutdown(wait=False)
+
+    def _build(self, phase, build):
+        """Wait for a file to be parsed, and build objects from its columns.
+
+        :param phase: The name of the file's phase, 'neos' or 'approaches'.
+        :param build: A function that builds objects from the columns.
+        :return: A list of the objects.
+        """
+        self.start(phase)
+        waited = time.perf_counter()
+        chunks = [future.result() for future in self._plans[phase].result()]
+        built = time.perf_counter()
+        objects = build(_merge_columns([columns for columns, _ in chunks]))
+        done = time.perf_counter()
+        # The total time spent parsing, over all of the workers.
+        self.timings[phase + '.parse'] = sum(parsed for _, parsed in chunks)
+        self.timings[phase + '.wait'] = built - waited
+        self.timings[phase + '.build'] = done - built
+        self.timings[phase + '.ready'] = done - self._started[phase]
+        return objects
+
+    def neos(self):
+        """Return the NEOs of the NEO file, as a list of `NearEarthObject`s."""
+        return self._build('neos', _neos_from_columns)
+
+    def approaches(self):
+        """Return the close approaches, as a list of `CloseApproach`es."""
+        return self._build('approaches', _approaches_from_columns)
@@ -20,6 +20,11 @@ import operator
 import itertools
 
 
+# Symbols for the comparators of filters, for describing them.
+OPERATOR_SYMBOLS = {operator.eq: '==', operator.ne: '!=', operator.ge: '>=',
+                    operator.gt: '>', operator.le: '<=', operator.lt: '<'}
+
+
 class UnsupportedCriterionError(NotImplementedError):
     """A filter criterion is unsupported."""
 
@@ -89,8 +94,21 @@ class DateFilter(AttributeFilter):
 
     The `DateFilter` class is a subclass of `AttributeFilter` that provides a
     method to extract the date from a given time attribute.
+
+    Dates are compared as integer ordinals (see `datetime.date.toordinal`), so
+    the reference date is converted once, and the approach's precomputed
+    `day_ordinal` is compared against it without building a `datetime`.
     """
 
+    def __init__(self, op, value):
+        """Create a new filter from a binary predicate and a reference date.
+
+        :param op: A 2-argument predicate comparator (such as `operator.le`).
+        :param value: The reference `datetime.date` to compare against.
+        """
+        super().__init__(op, value.toordinal())
+        self.date = value
+
     @classmethod
     def get(cls, approach):
         """
@@ -99,10 +117,15 @@ class DateFilter(AttributeFilter):
         :param cls: The `cls` parameter in a class method refers to the class
         itself.
         :param approach: the close approach.
-        :return: The `date` attribute of the `approach` object is being
+        :return: The ordinal of the date of the `approach` object is being
         returned.
         """
-        return approach.time.date()
+        return approach.day_ordinal
+
+    def __repr__(self):
+        """Return a human-readable representation, showing the date."""
+        return f"{self.__class__.__name__}(op=operator.{self.op.__name__}, \
+            value={self.date})"
 
 
 class DistanceFilter(AttributeFilter):
@@ -8,11 +8,90 @@ NASA's close approach data, into a Python `datetime`
 The `datetime_to_str` function converts a Python `datetime` into a string.
 Although `datetime`s already have human-readable string representations, those
 representations display seconds, but NASA's data (and our datetimes!) don't
-provide that level of resolution, so the output format also will not.
+provide that level of resolution, so the output format also will not. The
+`str_to_datetime` function converts such a string back into a `datetime`.
+
+The `cd_to_minutes`, `minutes_to_datetime` and `minutes_to_str` functions
+convert between these strings and a compact integer timestamp - the number of
+minutes since the start of the proleptic Gregorian ordinal day 0 - so that a
+close approach doesn't need to hold a `datetime` until one is asked for.
+
+`strptime` and `strftime` are slow, so the fixed formats are parsed by slicing
+at fixed offsets and formatted from memoized date parts, falling back to
+`strptime` and `strftime` for anything irregular.
 """
 import datetime
 
 
+# The number of minutes in a day.
+MINUTES_PER_DAY = 24 * 60
+
+# English month abbreviations, as used by the `cd` field, and their numbers.
+_MONTHS = {
+    month: number for number, month in enumerate(
+        ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+         'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), start=1)
+}
+
+# The 'hh:mm' string of each minute of the day, and the reverse mapping.
+_TIMES_OF_DAY = tuple(
+    f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60)
+)
+_MINUTES_OF_DAY = {time: minute for minute, time in enumerate(_TIMES_OF_DAY)}
+
+# Memoized (ordinal, year, month, day) tuples, keyed by the date strings they
+# were parsed from, and memoized 'YYYY-MM-DD' strings, keyed by day ordinal.
+_DATES = {}
+_DATE_STRS = {}
+
+
+def _parse_date(date_part):
+    """Parse and memoize a date in YYYY-bb-DD or YYYY-MM-DD format.
+
+    :param date_part: A date string, such as '2020-Dec-31' or '2020-12-31'.
+    :return: An (ordinal, year, month, day) tuple, or None if the date isn't
+    in one of the regular formats.
+    """
+    year, day = date_part[:4], date_part[-2:]
+    if len(date_part) == 11:
+        month = _MONTHS.get(date_part[5:8])
+    elif len(date_part) == 10 and date_part[5:7].isdigit():
+        month = int(date_part[5:7])
+    else:
+        return None
+    if not (month and date_part[4] == date_part[-3] == '-'
+            and year.isdigit() and day.isdigit()):
+        return None
+    try:
+        date = datetime.date(int(year), month, int(day))
+    except ValueError:
+        return None
+    parts = _DATES[date_part] = (date.toordinal(), date.year, date.month,
+                                 date.day)
+    return parts
+
+
+def _parse_fast(text, width):
+    """Parse a date and time at fixed offsets, with memoized lookups.
+
+    :param text: A date of `width` characters, a space, and an hh:mm time.
+    :param width: The width of the date part - 11 for YYYY-bb-DD and 10 for
+    YYYY-MM-DD.
+    :return: A tuple of the memoized (ordinal, year, month, day) tuple and the
+    minute of the day, or None if `text` isn't in the regular format.
+    """
+    if len(text) != width + 6 or text[width] != ' ':
+        return None
+    date_part = text[:width]
+    parts = _DATES.get(date_part)
+    if parts is None:
+        parts = _parse_date(date_part)
+    minute = _MINUTES_OF_DAY.get(text[width + 1:])
+    if parts is None or minute is None:
+        return None
+    return parts, minute
+
+
 def cd_to_datetime(calendar_date):
     """Convert a NASA-formatted calendar date/time description into a datetime.
 
@@ -27,7 +106,11 @@ def cd_to_datetime(calendar_date):
     :return: A naive `datetime` corresponding to the given calendar date and
     time.
     """
-    return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+    parsed = _parse_fast(calendar_date, 11)
+    if parsed is None:
+        return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+    (_, year, month, day), minute = parsed
+    return datetime.datetime(year, month, day, minute // 60, minute % 60)
 
 
 def datetime_to_str(dt):
@@ -42,4 +125,68 @@ def datetime_to_str(dt):
     :param dt: A naive Python datetime.
     :return: That datetime, as a human-readable string without seconds.
     """
+    if dt.tzinfo is None and dt.year >= 1000:
+        # The ISO format matches, and is much faster than `strftime`.
+        return dt.isoformat(' ', 'minutes')
     return datetime.datetime.strftime(dt, "%Y-%m-%d %H:%M")
+
+
+def str_to_datetime(date_string):
+    """Convert a string produced by `datetime_to_str` back into a datetime.
+
+    :param date_string: A date and time in YYYY-MM-DD hh:mm format.
+    :return: A naive `datetime` corresponding to the given date and time.
+    """
+    parsed = _parse_fast(date_string, 10)
+    if parsed is None:
+        return datetime.datetime.strptime(date_string, "%Y-%m-%d %H:%M")
+    (_, year, month, day), minute = parsed
+    return datetime.datetime(year, month, day, minute // 60, minute % 60)
+
+
+def cd_to_minutes(calendar_date):
+    """Convert a NASA-formatted calendar date/time description into minutes.
+
+    The result is the number of minutes since the start of ordinal day 0, so
+    `cd_to_minutes(cd) // MINUTES_PER_DAY` is the proleptic Gregorian ordinal
+    of the date (as from `datetime.date.toordinal`).
+
+    Like `cd_to_datetime`, this falls back to `strptime` for irregular input.
+
+    :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
+    :return: The number of minutes since the start of ordinal day 0.
+    """
+    parsed = _parse_fast(calendar_date, 11)
+    if parsed is None:
+        dt = cd_to_datetime(calendar_date)
+        return dt.toordinal() * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+    (ordinal, _, _, _), minute = parsed
+    return ordinal * MINUTES_PER_DAY + minute
+
+
+def minutes_to_datetime(minutes):
+    """Convert a timestamp from `cd_to_minutes` into a naive datetime.
+
+    :param minutes: The number of minutes since the start of ordinal day 0.
+    :return: The corresponding naive `datetime`.
+    """
+    day, minute = divmod(minutes, MINUTES_PER_DAY)
+    return datetime.datetime.fromordinal(day).replace(hour=minute // 60,
+                                                      minute=minute % 60)
+
+
+def minutes_to_str(minutes):
+    """Convert a timestamp from `cd_to_minutes` into a human-readable string.
+
+    The result is the same as `datetime_to_str(minutes_to_datetime(minutes))`,
+    but the date part is memoized and no `datetime` is built.
+
+    :param minutes: The number of minutes since the start of ordinal day 0.
+    :return: That timestamp, in YYYY-MM-DD hh:mm format.
+    """
+    day, minute = divmod(minutes, MINUTES_PER_DAY)
+    date_str = _DATE_STRS.get(day)
+    if date_str is None:
+        date_str = _DATE_STRS[day] = datetime_to_str(
+            datetime.datetime.fromordinal(day))[:-6]
+    return date_str + ' ' + _TIMES_OF_DAY[minute]
@@ -0,0 +1,222 @@
+"""Index the data files by byte offset, for point lookups without loading them.
+
+A `DataIndex` maps the primary designation and the name of each NEO to the
+byte offset of its record in a `neos.csv` file, and the primary designation of
+each NEO to the byte ranges of its rows in a `cad.json` file. A single NEO (and
+its close approaches) can then be read by seeking to its records and parsing
+only those, instead of loading the whole data set.
+
+Building an index takes a full pass over its data file, so each index is saved
+to a sidecar file next to its data file (such as `neos.csv.idx.json`) and
+reused for as long as the data file is unchanged.
+
+The main module uses a `DataIndex` (with the `--index` option) to serve the
+lookups of the `inspect` subcommand from an `NEODatabase` that hasn't loaded
+its data files.
+"""
+import csv
+import json
+import os
+import pathlib
+
+from extract import (approach_fields, approach_from_row, cad_fields,
+                     cad_row_spans, csv_record_spans, neo_columns,
+                     neo_from_row)
+
+
+# The suffix of a sidecar index file, and the version of its format.
+SIDECAR_SUFFIX = '.idx.json'
+INDEX_VERSION = 1
+
+
+def _read_csv_record(data):
+    """Parse a single CSV record.
+
+    :param data: The bytes of a single CSV record.
+    :return: The record, as a list of strings.
+    """
+    return next(csv.reader([data.decode('utf-8')]), [])
+
+
+def build_neo_index(neo_csv_path):
+    """Index the records of a CSV file of NEOs by designation and by name.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth
+    objects.
+    :return: A dictionary with the file's 'header', and dictionaries mapping
+    'designations' and 'names' to byte offsets of records.
+    """
+    with open(neo_csv_path, 'rb') as file:
+        data = file.read()
+    spans = csv_record_spans(data)
+    start, end = next(spans)
+    header = _read_csv_record(data[start:end])
+    pde_index, name_index, _, _ = neo_columns(header)
+
+    designations = {}
+    names = {}
+    for start, end in spans:
+        row = _read_csv_record(data[start:end])
+        if not row:
+            continue
+        designations[row[pde_index]] = start
+        if row[name_index]:
+            names[row[name_index]] = start
+    return {'header': header, 'designations': designations, 'names': names}
+
+
+def build_approach_index(cad_json_path):
+    """Index the rows of a JSON file of close approaches by NEO designation.
+
+    :param cad_json_path: A path to a JSON file containing data about close
+    approaches.
+    :return: A dictionary with the file's 'fields', and a dictionary mapping
+    the designation of each NEO to a flat list of the start and end offsets of
+    each of its rows.
+    """
+    with open(cad_json_path, 'rb') as file:
+        data = file.read()
+    fields = cad_fields(data)
+    designation_index = fields.index('des')
+
+    rows = {}
+    for start, end in cad_row_spans(data):
+        designation = json.loads(data[start:end])[designation_index]
+        rows.setdefault(designation, []).extend((start, end))
+    return {'fields': fields, 'rows': rows}
+
+
+class DataIndex:
+    """Byte-offset indexes of a pair of NEO and close approach data files.
+
+    Each index is loaded from its sidecar file, or built (and saved) if the
+    sidecar is missing or out of date, when it's first needed.
+    """
+
+    def __init__(self, neo_csv_path, cad_json_path, index_dir=None):
+        """Create a new `DataIndex` of a pair of data files.
+
+        :param neo_csv_path: A path to a CSV file of NEOs.
+        :param cad_json_path: A path to a JSON file of close approaches.
+        :param index_dir: A directory in which to keep the sidecar files. If
+        None, keep each one next to its data file.
+        """
+        self.neo_csv_path = pathlib.Path(neo_csv_path)
+        self.cad_json_path = pathlib.Path(cad_json_path)
+        self.index_dir = pathlib.Path(index_dir) if index_dir else None
+        self._neo_index = None
+        self._approach_index = None
+
+    def sidecar(self, path):
+        """Return the path of the sidecar index file of a data file.
+
+        :param path: The path to a data file.
+        :return: The path to its sidecar index file.
+        """
+        directory = self.index_dir or path.parent
+        return directory / (path.name + SIDECAR_SUFFIX)
+
+    def _load_or_build(self, path, build):
+        """Load the index of a data file from its sidecar, or build it.
+
+        A sidecar is only used if it was built from a data file of the same
+        size and modification time. A newly built index is saved to the
+        sidecar if possible; if not, it is only kept in memory.
+
+        :param path: The path to a data file.
+        :param build: A function that builds the index of a data file.
+        :return: The index of the data file.
+        """
+        stat = path.stat()
+        source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        sidecar = self.sidecar(path)
+        try:
+            with open(sidecar) as file:
+                saved = json.load(file)
+            if (saved.get('version') == INDEX_VERSION
+                    and saved.get('source') == source):
+                return saved['index']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        index = build(path)
+        partial = sidecar.with_name(sidecar.name + '.tmp')
+        try:
+            with open(partial, 'w') as file:
+                json.dump({'version': INDEX_VERSION, 'source': source,
+                           'index': index}, file)
+            os.replace(partial, sidecar)
+        except OSError:
+            pass
+        return index
+
+    @property
+    def neo_index(self):
+        """Return the index of the NEO file, loading it if needed."""
+        if self._neo_index is None:
+            self._neo_index = self._load_or_build(self.neo_csv_path,
+                                                  build_neo_index)
+        return self._neo_index
+
+    @property
+    def approach_index(self):
+        """Return the index of the approach file, loading it if needed."""
+        if self._approach_index is None:
+            self._approach_index = self._load_or_build(self.cad_json_path,
+                                                       build_approach_index)
+        return self._approach_index
+
+    def _read_neo(self, offset):
+        """Read and parse the NEO whose record starts at a byte offset.
+
+        :param offset: The byte offset of a record of the NEO file.
+        :return: A new `NearEarthObject`.
+        """
+        with open(self.neo_csv_path, 'rb') as file:
+            file.seek(offset)
+            record = file.readline()
+            # A quoted field may contain newlines.
+            while record.count(b'"') % 2:
+                line = file.readline()
+                if not line:
+                    break
+                record += line
+        columns = neo_columns(self.neo_index['header'])
+        return neo_from_row(_read_csv_record(record), columns)
+
+    def neo_by_designation(self, designation):
+        """Read the NEO with a primary designation, or None if there isn't one.
+
+        :param designation: The primary designation of the NEO.
+        :return: A new, unlinked `NearEarthObject`, or None.
+        """
+        offset = self.neo_index['designations'].get(designation)
+        return None if offset is None else self._read_neo(offset)
+
+    def neo_by_name(self, name):
+        """Read the NEO with a name, or None if there isn't one.
+
+        :param name: The IAU name of the NEO.
+        :return: A new, unlinked `NearEarthObject`, or None.
+        """
+        offset = self.neo_index['names'].get(name)
+        return None if offset is None else self._read_neo(offset)
+
+    def approaches_of(self, neo):
+        """Read the close approaches of an NEO, linked to that NEO.
+
+        :param neo: A `NearEarthObject`.
+        :return: A list of the NEO's `CloseApproach`es, in file order.
+        """
+        index = self.approach_index
+        fields = approach_fields(index['fields'])
+        offsets = index['rows'].get(neo.designation, ())
+        approaches = []
+        with open(self.cad_json_path, 'rb') as file:
+            for start, end in zip(offsets[::2], offsets[1::2]):
+                file.seek(start)
+                approach = approach_from_row(
+                    json.loads(file.read(end - start)), fields)
+                approach.neo = neo
+                approaches.append(approach)
+        return approaches
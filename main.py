@@ -5,7 +5,7 @@ See `README.md` for a detailed discussion of this project.
 
 This script can be invoked from the command line::
 
-    $ python3 main.py {inspect,query,interactive} [args]
+    $ python3 main.py {inspect,query,watch,interactive} [args]
 
 The `inspect` subcommand looks up an NEO by name or by primary designation, and
 optionally lists all of that NEO's known close approaches:
@@ -27,32 +27,104 @@ The `query` subcommand searches for close approaches that match given criteria:
     --not-hazardous
     $ python3 main.py query --hazardous --max-distance 0.05 --min-velocity 30
 
-The set of results can be limited in size and/or saved to an output file in CSV
-or JSON format:
+The set of results can be limited in size and/or saved to an output file in
+CSV, JSON or newline-delimited JSON format, optionally compressed, or streamed
+to standard output with `-`:
 
     $ python3 main.py query --limit 5 --outfile results.csv
     $ python3 main.py query --limit 15 --outfile results.json
-
-The `interactive` subcommand loads the NEO database and spawns an interactive
-command shell that can repeatedly execute `inspect` and `query` commands
-without having to wait to reload the database each time. However, it doesn't
-hot-reload.
+    $ python3 main.py query --outfile results.ndjson.gz
+    $ python3 main.py query --outfile - --format ndjson
+    $ python3 main.py query --outfile results.csv results.json.gz -
+    $ python3 main.py query --outfile results.csv --parallel-write 8 --shards
+
+With `--explain`, a query also reports its plan, the number of rows that it
+scanned and emitted, and how often each filter was evaluated and passed:
+
+    $ python3 main.py query --hazardous --max-distance 0.05 --explain
+
+The `watch` subcommand evaluates standing queries against close approaches as
+they arrive, as newline-delimited JSON on stdin or appended to a file, and
+writes each match right away:
+
+    $ python3 main.py watch --query="--hazardous --max-distance 0.01
+    --start-date 2026-10-19 --end-date 2026-11-18" --follow new.ndjson
+
+The `interactive` subcommand spawns an interactive command shell that can
+repeatedly execute `inspect` and `query` commands without having to wait to
+reload the database each time. The prompt appears right away, while the data
+loads on a background thread, reporting the rows read and rows/s about every
+second; each command only waits for the data it needs, and the `status`
+command shows the progress of loading. When the data files
+change, the shell reloads them on a background thread, and swaps in the new
+database between commands. The `ingest` command adds the close approaches of
+smaller JSON files to the database, without reloading it. A query that ends
+with `&` runs as a background job, managed with the `jobs`, `wait` and
+`cancel` commands, and Ctrl-C stops a query running in the foreground without
+ending the session. Any query can be given a `--timeout` in seconds. The
+`next` (or `more`) command shows the next page of results of the last query,
+resuming its scan where the previous page stopped. The shell remembers the
+results of recent queries, and answers a narrower query (such as one with an
+added filter) by filtering the remembered results of a broader one.
+
+With `--slow-log FILE`, each query (from the command line or the interactive
+shell) that takes at least `--slow-threshold` seconds (1 by default), once the
+data has loaded, is logged to FILE as a line of JSON, and the shell's `slowlog`
+command summarizes the slowest queries:
+
+    $ python3 main.py --slow-log slow.ndjson --slow-threshold 0.5 interactive
 
 If needed, the script can load data from data files other than the default with
 `--neofile` or `--cadfile`.
+
+With `--index`, NEOs are looked up through byte-offset indexes of the data
+files (kept in `.idx.json` sidecar files next to them), so `inspect` reads only
+the records of the NEO that it looks up instead of loading both data files:
+
+    $ python3 main.py --index inspect --verbose --pdes 433
+
+With `--parallel-load`, the two data files are parsed at the same time in
+worker processes, and with `--timing`, the time spent in each phase of loading
+them is reported on standard error:
+
+    $ python3 main.py --parallel-load --timing query --limit 5
+
+With `--load-processes N`, the data files are loaded concurrently by N worker
+processes, which parse chunks of each data file in parallel.
+
+With `--profile`, the time, rows/s and peak memory (traced by `tracemalloc`) of
+each phase of the run - loading the NEOs, loading the close approaches, linking
+them, scanning for results, and the rest of the subcommand, such as writing the
+results - are reported on standard error. With `--profile-out FILE`, cProfile
+statistics of the whole run are saved to FILE:
+
+    $ python3 main.py --profile --profile-out query.prof query --outfile a.csv
+    $ python3 -m pstats query.prof
 """
 import argparse
 import cmd
+import cProfile
 import datetime
+import functools
+import io
+import itertools
 import pathlib
 import shlex
 import sys
+import threading
 import time
 
-from extract import load_neos, load_approaches
-from database import NEODatabase
+from extract import CHUNK_BYTES, ConcurrentLoader, load_neos, load_approaches
+from cache import QueryCache
+from database import NEODatabase, QueryCancelled, QueryStats, QueryTimeout
+from profiling import DISABLED, Profile
+from slowlog import SlowQueryLog, describe_filters, query_entry, summarize
+from index import DataIndex
 from filters import create_filters, limit
-from write import write_to_csv, write_to_json
+from watch import (StandingQueries, follow, read_lines,
+                   watch as watch_stream)
+from write import (STDOUT, WRITERS, output_format, write_parallel,
+                   write_to_many)
 
 
 # Paths to the root of the project and the `data` subfolder.
@@ -96,6 +168,33 @@ def make_parser():
     parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'),
                         type=pathlib.Path,
                         help="Path to JSON file of close approach data.")
+    parser.add_argument('--index', action='store_true',
+                        help="Look up NEOs through byte-offset indexes of the \
+                            data files, building them if needed.")
+    parser.add_argument('--parallel-load', action='store_true',
+                        help="Parse the two data files concurrently, in \
+                            worker processes.")
+    parser.add_argument('--load-processes', type=int, metavar='N',
+                        help="Parse the data files in chunks with N worker \
+                            processes. Implies --parallel-load.")
+    parser.add_argument('--timing', action='store_true',
+                        help="Report the time spent in each phase of loading \
+                            the data files on standard error.")
+    parser.add_argument('--profile', action='store_true',
+                        help="Report the time, rows/s and peak memory of each \
+                            phase of the run on standard error. Tracing \
+                            memory slows the run down.")
+    parser.add_argument('--profile-out', type=pathlib.Path, metavar='FILE',
+                        help="Save cProfile statistics of the main thread \
+                            for the whole run to FILE, for `pstats`.")
+    parser.add_argument('--slow-log', type=pathlib.Path, metavar='FILE',
+                        help="Append an entry, as a line of JSON, to FILE \
+                            for each query that takes at least \
+                            --slow-threshold seconds.")
+    parser.add_argument('--slow-threshold', type=float, default=1.0,
+                        metavar='SECONDS',
+                        help="The time above which a query is logged in \
+                            --slow-log. Defaults to 1 second.")
     subparsers = parser.add_subparsers(dest='cmd')
 
     # Add the `inspect` subcommand parser.
@@ -197,10 +296,40 @@ def make_parser():
     query.add_argument('-l', '--limit', type=int,
                        help="The maximum number of matches to return. "
                             "Defaults to 10 if no --outfile is given.")
-    query.add_argument('-o', '--outfile', type=pathlib.Path,
-                       help="File in which to save structured results. "
+    query.add_argument('-o', '--outfile', type=pathlib.Path, nargs='+',
+                       help="File(s) in which to save structured results. "
+                            "Use `-` for standard output, and a trailing "
+                            "`.gz`, `.bz2` or `.xz` to compress a file. "
+                            "Several files are written from a single query. "
                             "If omitted, results are printed to standard \
                                 output.")
+    query.add_argument('-f', '--format', choices=sorted(WRITERS),
+                       help="The format of any --outfile whose extension "
+                            "doesn't determine one, such as `-`. Defaults "
+                            "to csv for `-`.")
+    query.add_argument('--pipeline', action='store_true',
+                       help="Write --outfile on a separate thread, so that "
+                            "formatting and writing overlap with the query. "
+                            "Always the case with several output files.")
+    query.add_argument('--parallel-write', type=int, metavar='N',
+                       help="Format --outfile in N worker processes, in "
+                            "contiguous chunks of results.")
+    query.add_argument('--shards', action='store_true',
+                       help="With --parallel-write, write each chunk of "
+                            "results to its own numbered file, such as "
+                            "`results.00000.csv`.")
+    query.add_argument('--flush-every', type=int, default=1000,
+                       help="The number of rows to write to --outfile "
+                            "between flushes. Use 0 to only flush at the "
+                            "end. Defaults to 1000.")
+    query.add_argument('--explain', action='store_true',
+                       help="After the query, describe its plan and the "
+                            "work it did on standard error: the rows "
+                            "scanned and emitted, and how often each filter "
+                            "was evaluated and passed.")
+    query.add_argument('--timeout', type=float, metavar='SECONDS',
+                       help="Stop the query if it hasn't finished scanning "
+                            "the close approaches after this many seconds.")
 
     repl = subparsers.add_parser(
         'interactive', description="Start an interactive command session "
@@ -211,6 +340,27 @@ def make_parser():
         action='store_true',
         help="If specified, kill the session whenever a project file is \
             modified.")
+
+    watch = subparsers.add_parser(
+        'watch', description="Evaluate standing queries against new close "
+        "approaches, read as newline-delimited JSON from stdin or a growing "
+        "file, and write each match as it arrives.")
+    watch.add_argument('--query', action='append', required=True,
+                       metavar='FILTERS', dest='queries',
+                       help="The filters of a standing query, as for the "
+                            "`query` subcommand, such as "
+                            "--query=\"--hazardous --max-distance 0.01\". "
+                            "May be repeated.")
+    watch.add_argument('--follow', type=pathlib.Path, metavar='FILE',
+                       help="Read the close approaches appended to a file, "
+                            "rather than stdin. If the file doesn't exist "
+                            "yet, wait for it.")
+    watch.add_argument('--from-start', action='store_true',
+                       help="With --follow, also read the close approaches "
+                            "already in the file.")
+    watch.add_argument('--interval', type=float, default=0.5,
+                       help="With --follow, how often to check for new close "
+                            "approaches, in seconds. Defaults to 0.5.")
     return parser, inspect, query
 
 
@@ -253,48 +403,324 @@ def inspect(database, pdes=None, name=None, verbose=False):
     return neo
 
 
-def query(database, args):
+def filters_from_args(args):
+    """Create a collection of filters from the options of a query.
+
+    :param args: The arguments of a query, as parsed by the query parser.
+    :return: A collection of filters, from `create_filters`.
+    """
+    return create_filters(
+        date=args.date, start_date=args.start_date, end_date=args.end_date,
+        distance_min=args.distance_min, distance_max=args.distance_max,
+        velocity_min=args.velocity_min, velocity_max=args.velocity_max,
+        diameter_min=args.diameter_min, diameter_max=args.diameter_max,
+        hazardous=args.hazardous
+    )
+
+
+def query(database, args, cancel=None, stdout=None, profile=DISABLED,
+          slowlog=None):
     """Perform the `query` subcommand.
 
     Create a collection of filters with `create_filters` and supply them to the
     database's `query` method to produce a stream of matching results.
 
     If an output file wasn't given, print these results to stdout, limiting to
-    10 entries if no limit was specified. If an output file was given, use the
-    file's extension to infer whether the file should hold CSV or JSON data,
-    and then write the results to the output file in that format.
+    10 entries if no limit was specified. If output files were given, use each
+    file's extension (or the `--format` option) to infer whether the file
+    should hold CSV, JSON or NDJSON data, and then write the results to every
+    output file in its format, from a single pass over the query results.
+
+    With `--explain`, the plan of the query and the work that it did (from a
+    `database.QueryStats`) are printed to stderr afterwards.
+
+    If the query is cancelled or times out, `database.QueryCancelled` is
+    raised, and any output files are left with the results written so far.
 
     :param database: The `NEODatabase` containing data on NEOs and their close
     approaches.
     :param args: All arguments from the command line, as parsed by the
     top-level parser.
+    :param cancel: An optional `threading.Event` that cancels the query when
+    it's set.
+    :param stdout: A text stream on which to print results if there are no
+    output files. If None, use standard output.
+    :param profile: A `profiling.Profile` in which to record the time spent
+    scanning for results, as the 'scan' phase.
+    :param slowlog: An optional `slowlog.SlowQueryLog` in which to log the
+    query if it's slow.
+    :return: If the results were printed, the stream of results, which
+    resumes right after the last printed result. Otherwise, None.
     """
     # Construct a collection of filters from arguments supplied at the command
     # line.
-    filters = create_filters(
-        date=args.date, start_date=args.start_date, end_date=args.end_date,
-        distance_min=args.distance_min, distance_max=args.distance_max,
-        velocity_min=args.velocity_min, velocity_max=args.velocity_max,
-        diameter_min=args.diameter_min, diameter_max=args.diameter_max,
-        hazardous=args.hazardous
-    )
-    # Query the database with the collection of filters.
-    results = database.query(filters)
-
-    if not args.outfile:
+    filters = filters_from_args(args)
+    # Pair each output file with the writer for its format.
+    targets = []
+    for outfile in args.outfile or ():
+        fmt = output_format(outfile) or args.format
+        if fmt is None and str(outfile) == STDOUT:
+            fmt = 'csv'
+        if fmt is None:
+            print(
+                "Please use an output file that ends with `.csv`, `.json`, "
+                "`.ndjson` or `.jsonl` (optionally followed by `.gz`, `.bz2` "
+                "or `.xz`), or choose a --format.",
+                file=sys.stderr)
+            return
+        targets.append((fmt, outfile))
+
+    if slowlog is not None:
+        # Wait for the data to load, so that the time of the query as logged
+        # doesn't include it.
+        start = time.perf_counter()
+        database.ensure_linked()
+        loaded = time.perf_counter()
+
+    # Query the database with the collection of filters, counting the work
+    # that it does.
+    stats = QueryStats()
+    results = profile.stream('scan', database.query(
+        filters, cancel=cancel, timeout=args.timeout, stats=stats))
+    try:
+        return write_results(results, targets, args, stdout)
+    finally:
+        if args.explain:
+            print('\n'.join(stats.explain()), file=sys.stderr)
+        if slowlog is not None:
+            seconds = time.perf_counter() - loaded
+            slowlog.record(query_entry(
+                filters, args.limit or (None if targets else 10),
+                [fmt for fmt, _ in targets] or ['text'], stats, seconds,
+                {'load': loaded - start, 'scan': stats.seconds,
+                 'output': max(seconds - stats.seconds, 0.0)}))
+
+
+def write_results(results, targets, args, stdout=None):
+    """Print the results of a query, or write them to output files.
+
+    :param results: A stream of `CloseApproach` objects.
+    :param targets: A list of `(fmt, outfile)` pairs of the output files.
+    :param args: The arguments of the query, as parsed by the query parser.
+    :param stdout: A text stream on which to print results if there are no
+    output files. If None, use standard output.
+    :return: If the results were printed, the rest of the stream of results.
+    Otherwise, None.
+    """
+    if not targets:
         # Write the results to stdout, limiting to 10 entries if not specified.
         for result in limit(results, args.limit or 10):
-            print(result)
+            print(result, file=stdout)
+        return results
+    elif args.parallel_write:
+        # Format chunks of the results in worker processes.
+        try:
+            write_parallel(targets, limit(results, args.limit),
+                           processes=args.parallel_write, shards=args.shards)
+        except ValueError as err:
+            print(err, file=sys.stderr)
+    elif len(targets) == 1 and not args.pipeline:
+        # Write the results to a single file, on this thread.
+        fmt, outfile = targets[0]
+        WRITERS[fmt](limit(results, args.limit), outfile,
+                     flush_every=args.flush_every)
     else:
-        # Write the results to a file.
-        if args.outfile.suffix == '.csv':
-            write_to_csv(limit(results, args.limit), args.outfile)
-        elif args.outfile.suffix == '.json':
-            write_to_json(limit(results, args.limit), args.outfile)
+        # Write the results to every file, from a single pass of the query.
+        write_to_many(((WRITERS[fmt], outfile) for fmt, outfile in targets),
+                      limit(results, args.limit),
+                      flush_every=args.flush_every)
+
+
+def watch(database, args, query_parser):
+    """Perform the `watch` subcommand.
+
+    Parse each standing query with the query parser, and evaluate them all
+    against each close approach that arrives, until the stream ends or the
+    user interrupts.
+
+    :param database: The `NEODatabase` containing data on NEOs.
+    :param args: All arguments from the command line, as parsed by the
+    top-level parser.
+    :param query_parser: The subparser for the `query` subcommand.
+    """
+    queries = StandingQueries()
+    for text in args.queries:
+        query_args = NEOShell.parse_arg_with(text, query_parser)
+        if query_args is None:
+            return
+        queries.register(text, filters_from_args(query_args))
+
+    if args.follow:
+        lines = follow(args.follow, from_start=args.from_start,
+                       interval=args.interval)
+    else:
+        lines = read_lines(sys.stdin)
+    try:
+        watch_stream(database, queries, lines)
+    except KeyboardInterrupt:
+        pass
+
+
+class QueryJob:
+    """A query running on a background thread of the interactive shell.
+
+    The results of a job without output files are collected, and shown when
+    the job is reported as finished.
+    """
+
+    def __init__(self, number, command, database, args, slowlog=None):
+        """Create a new `QueryJob`. Use `.start()` to start it.
+
+        :param number: The number of the job in the shell.
+        :param command: The text of the query command, for display.
+        :param database: The `NEODatabase` to query.
+        :param args: The arguments of the query, as parsed by the query parser.
+        :param slowlog: An optional `slowlog.SlowQueryLog` in which to log
+        the query if it's slow.
+        """
+        self.number = number
+        self.slowlog = slowlog
+        self.command = command
+        self.state = 'Running'
+        self.error = None
+        self.cancel = threading.Event()
+        self.output = None if args.outfile else io.StringIO()
+        self.started = None
+        self.finished = None
+        self.thread = threading.Thread(target=self._run,
+                                       args=(database, args),
+                                       name=f'neo-job-{number}', daemon=True)
+
+    def start(self):
+        """Start running the query on its thread.
+
+        :return: This job.
+        """
+        self.started = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def _run(self, database, args):
+        """Run the query, and record how it finished."""
+        try:
+            query(database, args, cancel=self.cancel, stdout=self.output,
+                  slowlog=self.slowlog)
+        except QueryTimeout as err:
+            self.state, self.error = 'Timed out', err
+        except QueryCancelled as err:
+            self.state, self.error = 'Cancelled', err
+        except Exception as err:
+            self.state, self.error = 'Failed', err
         else:
-            print(
-                "Please use an output file that ends with `.csv` or `.json`.",
-                file=sys.stderr)
+            self.state = 'Done'
+        finally:
+            self.finished = time.perf_counter()
+
+    @property
+    def running(self):
+        """Return whether the query is still running."""
+        return self.thread.is_alive()
+
+    def __str__(self):
+        """Return `str(self)`, a line describing the job and its state."""
+        end = self.finished if self.finished is not None \
+            else time.perf_counter()
+        return (f"[{self.number}] {self.state:<10} {end - self.started:7.1f} s"
+                f"  query {self.command}")
+
+
+class QueryCursor:
+    """The position of the shell's last query in its stream of results.
+
+    A cursor expires when the data changes: when the shell swaps in reloaded
+    data, or when close approaches are ingested.
+    """
+
+    def __init__(self, database, results, page_size):
+        """Create a new `QueryCursor`.
+
+        :param database: The `NEODatabase` that was queried.
+        :param results: The rest of the stream of results.
+        :param page_size: The default number of results in each page.
+        """
+        self.database = database
+        self.version = database.version
+        self.results = results
+        self.page_size = page_size
+
+    def expired(self, database):
+        """Return whether the data has changed since the query.
+
+        :param database: The shell's current `NEODatabase`.
+        """
+        return (database is not self.database
+                or database.version != self.version)
+
+    def page(self, size=None):
+        """Fetch the next page of results.
+
+        :param size: The number of results in the page. If None, use the page
+        size of the query.
+        :return: A list of at most `size` results, empty at the end.
+        """
+        return list(itertools.islice(self.results, size or self.page_size))
+
+
+class LoadProgress:
+    """Report the rows read so far by each phase of loading, while it runs.
+
+    An instance is called by the loaders (as the `progress` of
+    `build_database`) with the name of the phase and the rows read so far,
+    and reports the count and its rate at most once every `interval` seconds.
+    """
+
+    # Describe the rows read in each phase.
+    NOUNS = {'neos': "NEOs", 'approaches': "close approaches"}
+
+    def __init__(self, file=None, interval=1.0):
+        """Create a new `LoadProgress`.
+
+        :param file: A text stream on which to report. If None, use standard
+        error.
+        :param interval: The minimum time between reports, in seconds.
+        """
+        self.file = file
+        self.interval = interval
+        self.phase = None
+        self.rows = 0
+        self.started = None
+        self._reported = None
+        self._lock = threading.Lock()
+
+    def __call__(self, phase, rows):
+        """Record the rows read so far by a phase, and report them if due.
+
+        :param phase: The name of the phase, 'neos' or 'approaches'.
+        :param rows: The number of rows read so far in the phase.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if phase != self.phase:
+                self.phase, self.started, self._reported = phase, now, now
+            self.rows = rows
+            if now - self._reported < self.interval:
+                return
+            self._reported = now
+        print(f"[{self.describe()}]", file=self.file or sys.stderr)
+
+    def describe(self):
+        """Describe the phase being loaded, with its rows and rows/s so far.
+
+        :return: A description, or None if nothing has been loaded yet.
+        """
+        with self._lock:
+            phase, rows, started = self.phase, self.rows, self.started
+        if phase is None:
+            return None
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        return (f"Loading {self.NOUNS.get(phase, phase)}: {rows:,} so far "
+                f"({rate:,.0f} rows/s)")
 
 
 class NEOShell(cmd.Cmd):
@@ -321,6 +747,10 @@ class NEOShell(cmd.Cmd):
             inspect_parser,
             query_parser,
             aggressive=False,
+            reload=None,
+            watch=(),
+            slowlog=None,
+            progress=None,
             **kwargs):
         """Create a new `NEOShell`.
 
@@ -333,6 +763,13 @@ class NEOShell(cmd.Cmd):
         :param query_parser: The subparser for the `query` subcommand.
         :param aggressive: Whether to kill the session whenever a project file
         is changed.
+        :param reload: An optional zero-argument callable that creates a new
+        `NEODatabase` from the data files, to reload them when they change.
+        :param watch: The paths of the data files to watch for changes.
+        :param slowlog: An optional `slowlog.SlowQueryLog` in which to log
+        slow queries.
+        :param progress: An optional `LoadProgress`, to which the loaders of
+        the database report the rows read while each phase runs.
         :param kwargs: A dictionary of excess keyword arguments passed to the
         superclass.
         """
@@ -341,6 +778,161 @@ class NEOShell(cmd.Cmd):
         self.inspect = inspect_parser
         self.query = query_parser
         self.aggressive = aggressive
+        self.loader = None
+        self.load_started = None
+        self.load_progress = {}
+        self.progress = progress
+        self.reload = reload
+        self.watch = [pathlib.Path(path) for path in watch]
+        self.data_signature = self._stat_data()
+        self.reloader = None
+        self._reloaded = None
+        self._failed_signature = None
+        self._reload_lock = threading.Lock()
+        self.jobs = {}
+        self._next_job = 1
+        self.cursor = None
+        self.slowlog = slowlog
+
+    def load_in_background(self):
+        """Start loading and linking the database on a background thread.
+
+        Progress is reported on stderr as each phase of loading finishes,
+        and while it runs by any `progress` given to the shell.
+        """
+        self.load_started = time.perf_counter()
+        self.loader = threading.Thread(
+            target=self.db.load, kwargs={'progress': self._report_progress},
+            name='neo-loader', daemon=True)
+        self.loader.start()
+
+    def _report_progress(self, phase, rows, seconds):
+        """Record and report that a phase of loading has finished.
+
+        :param phase: The name of the phase.
+        :param rows: The number of rows in the phase.
+        :param seconds: The time that the phase took, in seconds.
+        """
+        self.load_progress[phase] = (rows, seconds)
+        print(f"[{self._describe_phase(phase)}]", file=sys.stderr)
+
+    def _describe_phase(self, phase):
+        """Describe a finished phase of loading, with its rate in rows/s.
+
+        :param phase: The name of a finished phase.
+        :return: A description of the phase.
+        """
+        rows, seconds = self.load_progress[phase]
+        rate = rows / seconds if seconds > 0 else float('inf')
+        verb = {'neos': "Loaded {:,} NEOs",
+                'approaches': "Loaded {:,} close approaches",
+                'link': "Linked {:,} close approaches"}[phase]
+        return (verb.format(rows)
+                + f" in {seconds:.2f} s ({rate:,.0f} rows/s)")
+
+    def _stat_data(self):
+        """Return the size and modification time of each watched data file.
+
+        :return: A tuple of `(size, mtime_ns)` pairs, with None for each file
+        that can't be read.
+        """
+        signature = []
+        for path in self.watch:
+            try:
+                stat = path.stat()
+            except OSError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def _reload_data(self, signature):
+        """Build and load a new database, to be swapped in between commands.
+
+        This runs on a background thread.
+
+        :param signature: The signature of the data files being loaded.
+        """
+        start = time.perf_counter()
+        progress = {}
+
+        def record(phase, rows, seconds):
+            """Record that a phase of the reload has finished."""
+            progress[phase] = (rows, seconds)
+
+        try:
+            database = self.reload()
+            database.load(progress=record)
+        except Exception as err:
+            with self._reload_lock:
+                self._failed_signature = signature
+            print(f"[Couldn't reload the data files: {err}]", file=sys.stderr)
+            return
+        with self._reload_lock:
+            self._reloaded = (database, signature, progress, start)
+        print(f"[Reloaded the data files in "
+              f"{time.perf_counter() - start:.2f} s.]", file=sys.stderr)
+
+    def check_data(self):
+        """Swap in reloaded data, and start a reload if the data has changed.
+
+        The new database is built and loaded on a background thread, and only
+        replaces `self.db` here, between commands, so that no command sees a
+        partially loaded database or pays for the reload. The progress of
+        loading, as shown by `status`, becomes that of the new database.
+        """
+        with self._reload_lock:
+            reloaded, self._reloaded = self._reloaded, None
+            failed = self._failed_signature
+            if reloaded is not None:
+                (self.db, self.data_signature, self.load_progress,
+                 self.load_started) = reloaded
+                self.loader = self.reloader
+        if reloaded is not None:
+            print("[Now using the reloaded data.]", file=sys.stderr)
+
+        if self.reload is None or self.reloading:
+            return
+        signature = self._stat_data()
+        if signature in (self.data_signature, failed):
+            return
+        print("[The data files have changed. Reloading them in the "
+              "background.]", file=sys.stderr)
+        with self._reload_lock:
+            self.reloader = threading.Thread(
+                target=self._reload_data, args=(signature,),
+                name='neo-reloader', daemon=True)
+            self.reloader.start()
+
+    @property
+    def reloading(self):
+        """Return whether the data files are being reloaded."""
+        with self._reload_lock:
+            reloader = self.reloader
+        return reloader is not None and reloader.is_alive()
+
+    def _wait_notice(self, ready, what):
+        """Tell the user if a command has to wait for data to finish loading.
+
+        :param ready: Whether the data that the command needs is ready.
+        :param what: A description of the data.
+        """
+        if not ready and self.loader is not None and self.loader.is_alive():
+            print(f"Waiting for {what} to finish loading...", file=sys.stderr)
+
+    def cmdloop(self, intro=None):
+        """Run the session, returning to the prompt when Ctrl-C is pressed.
+
+        Ctrl-C stops the command that's running in the foreground (if any),
+        but not the background jobs, nor the session itself.
+        """
+        while True:
+            try:
+                return super().cmdloop(intro)
+            except KeyboardInterrupt:
+                print("\nInterrupted. Type `exit` to exit.", file=sys.stderr)
+                # Don't show the intro again.
+                intro = ''
 
     @classmethod
     def parse_arg_with(cls, arg, parser):
@@ -389,6 +981,10 @@ class NEOShell(cmd.Cmd):
         args = self.parse_arg_with(arg, self.inspect)
         if not args:
             return
+        if args.verbose:
+            self._wait_notice(self.db.linked, "the close approaches")
+        elif self.db.index is None:
+            self._wait_notice(self.db.neos_loaded, "the NEOs")
 
         # Run the `inspect` subcommand.
         inspect(self.db,
@@ -422,16 +1018,286 @@ class NEOShell(cmd.Cmd):
 
             (neo) query --limit 5 --outfile results.csv
             (neo) query --limit 5 --outfile results.json
+            (neo) query --limit 5 --outfile results.ndjson.gz
+            (neo) query --limit 5 --outfile results.csv results.json
+
+        Use `next` to show the next page of results of the last query.
+
+        A query can be stopped with Ctrl-C, or after a number of seconds with
+        `--timeout`. End the command with `&` to run it as a background job,
+        and manage the jobs with `jobs`, `wait` and `cancel`:
+
+            (neo) query --outfile everything.csv &
         """
+        arg = arg.rstrip()
+        background = arg.endswith('&')
+        if background:
+            arg = arg[:-1].rstrip()
         args = self.parse_arg_with(arg, self.query)
         if not args:
             return
 
-        # Run the `inspect` subcommand.
-        query(self.db, args)
+        if background:
+            job = QueryJob(self._next_job, arg, self.db, args,
+                           slowlog=self.slowlog).start()
+            self.jobs[job.number] = job
+            self._next_job += 1
+            print(f"[{job.number}] Started.")
+            return
+
+        self._wait_notice(self.db.linked, "the close approaches")
+        # Run the `query` subcommand, and keep the rest of any printed results
+        # for `next`.
+        self.cursor = None
+        try:
+            results = query(self.db, args, slowlog=self.slowlog)
+        except QueryCancelled as err:
+            print(err, file=sys.stderr)
+        except KeyboardInterrupt:
+            print("\nThe query was interrupted.", file=sys.stderr)
+        else:
+            if results is not None:
+                self.cursor = QueryCursor(self.db, results, args.limit or 10)
+
+    def do_next(self, arg):
+        """Show the next page of results of the last query.
+
+        The scan resumes where the last page stopped, so each page takes time
+        in proportion to its size. Pages have the size of the query's
+        `--limit`, unless another size is given:
+
+            (neo) query --hazardous --limit 5
+            (neo) next
+            (neo) next 20
+
+        The cursor expires when the data is reloaded or close approaches are
+        ingested.
+        """
+        try:
+            size = int(arg) if arg.strip() else None
+        except ValueError:
+            size = 0
+        if size is not None and size < 1:
+            print(f"Not a number of results: {arg}", file=sys.stderr)
+            return
+        if self.cursor is None:
+            print("There's no query to continue.", file=sys.stderr)
+            return
+        if self.cursor.expired(self.db):
+            self.cursor = None
+            print("The data has changed since the last query. Please run the "
+                  "query again.", file=sys.stderr)
+            return
+
+        try:
+            page = self.cursor.page(size)
+        except QueryCancelled as err:
+            page = None
+            print(err, file=sys.stderr)
+        except KeyboardInterrupt:
+            page = None
+            print("\nThe query was interrupted.", file=sys.stderr)
+        if not page:
+            self.cursor = None
+            if page is not None:
+                print("No more results.")
+            return
+        for result in page:
+            print(result)
+
+    def do_more(self, arg):
+        """Shorthand for `next`."""
+        self.do_next(arg)
+
+    def _jobs_from_arg(self, arg):
+        """Find the jobs named by the numbers passed to a command.
+
+        :param arg: The additional text supplied after the command: job
+        numbers, optionally prefixed with `%`.
+        :return: A list of `QueryJob`s, or None if any isn't a known job.
+        """
+        jobs = []
+        for word in arg.split():
+            try:
+                jobs.append(self.jobs[int(word.lstrip('%'))])
+            except (ValueError, KeyError):
+                print(f"No such job: {word}", file=sys.stderr)
+                return None
+        return jobs
+
+    def report_jobs(self):
+        """Report each background job that has finished, and forget it.
+
+        The collected results of a finished job are printed with it.
+        """
+        for number, job in list(self.jobs.items()):
+            if job.running:
+                continue
+            del self.jobs[number]
+            print(job)
+            if job.output is not None:
+                print(job.output.getvalue(), end='')
+            if job.error is not None:
+                print(job.error, file=sys.stderr)
+
+    def do_jobs(self, _arg):
+        """List the background jobs.
+
+            (neo) jobs
+        """
+        if not self.jobs:
+            print("No background jobs.")
+        for job in self.jobs.values():
+            print(job)
+
+    def do_wait(self, arg):
+        """Wait for background jobs to finish, and show their results.
+
+        Wait for every running job, or only for the given jobs:
+
+            (neo) wait
+            (neo) wait 1 3
+
+        Ctrl-C stops waiting, but doesn't stop the jobs.
+        """
+        jobs = self._jobs_from_arg(arg)
+        if jobs is None:
+            return
+        try:
+            for job in jobs or list(self.jobs.values()):
+                job.thread.join()
+        except KeyboardInterrupt:
+            print("\nStopped waiting. The jobs are still running.",
+                  file=sys.stderr)
+
+    def do_cancel(self, arg):
+        """Cancel running background jobs.
+
+            (neo) cancel 2
+
+        The scan of a cancelled query stops within a few thousand close
+        approaches, and any output files keep the results written so far.
+        """
+        jobs = self._jobs_from_arg(arg)
+        if jobs is None:
+            return
+        if not jobs:
+            print("Please give the number of a job to cancel.",
+                  file=sys.stderr)
+        for job in jobs:
+            if job.running:
+                job.cancel.set()
+                print(f"[{job.number}] Cancelling.")
+
+    def do_ingest(self, arg):
+        """Add new close approaches from JSON files to the database.
+
+        Each file has the same format as the close approach data file. The
+        new approaches are linked to the NEOs in the database, and approaches
+        that are already in the database are skipped:
+
+            (neo) ingest cad-delta.json
+
+        Ingested approaches only last until the data files are reloaded.
+        """
+        try:
+            paths = shlex.split(arg)
+        except ValueError as err:
+            print(err, file=sys.stderr)
+            return
+        if not paths:
+            print("Please give the path of a close approach file to ingest.",
+                  file=sys.stderr)
+            return
+        self._wait_notice(self.db.linked, "the close approaches")
+        for path in paths:
+            start = time.perf_counter()
+            try:
+                approaches = load_approaches(path)
+            except (OSError, ValueError, KeyError) as err:
+                print(f"Couldn't read {path}: {err}", file=sys.stderr)
+                continue
+            result = self.db.add_approaches(approaches)
+            print(f"Added {result.added:,} close approaches from {path} "
+                  f"({result.duplicates:,} duplicates, {result.unknown:,} of "
+                  f"unknown NEOs) in {time.perf_counter() - start:.2f} s.")
+
+    def do_status(self, _arg):
+        """Show the progress of loading the data in the background.
+
+            (neo) status
+        """
+        with self._reload_lock:
+            loader, started = self.loader, self.load_started
+        if loader is None:
+            print("The data is loaded on first use.")
+            return
+        for phase in ('neos', 'approaches', 'link'):
+            if phase in self.load_progress:
+                print(self._describe_phase(phase))
+        if (loader.is_alive() and self.progress is not None
+                and self.progress.phase not in self.load_progress):
+            loading = self.progress.describe()
+            if loading is not None:
+                print(loading)
+        if loader.is_alive():
+            elapsed = time.perf_counter() - started
+            print(f"Still loading, after {elapsed:.1f} s.")
+        else:
+            print("The data is ready.")
+        if self.reloading:
+            print("The changed data files are being reloaded.")
+        cache = self.db.cache
+        if cache is not None:
+            print(f"{len(cache)} cached result set(s) of {cache.rows:,} rows "
+                  f"({cache.hits:,} hits, {cache.misses:,} misses).")
+
+    def do_slowlog(self, arg):
+        """Summarize the slowest queries in the slow query log.
+
+        Queries are grouped by their filters, worst first, and the ten worst
+        groups are shown, or as many as given:
+
+            (neo) slowlog
+            (neo) slowlog 3
+
+        Queries are only logged with the `--slow-log` option.
+        """
+        if self.slowlog is None:
+            print("There's no slow query log. Start the session with "
+                  "--slow-log FILE to keep one.", file=sys.stderr)
+            return
+        try:
+            top = int(arg) if arg.strip() else 10
+        except ValueError:
+            print(f"Not a number of queries: {arg}", file=sys.stderr)
+            return
+        groups = summarize(self.slowlog.entries(), top)
+        if not groups:
+            print(f"No queries have taken {self.slowlog.threshold:g} s or "
+                  f"more.")
+            return
+        print(f"{'count':>5} {'max s':>8} {'mean s':>8} {'scanned':>11}  "
+              f"filters")
+        for group in groups:
+            print(f"{group['count']:>5} {group['max']:8.3f} "
+                  f"{group['mean']:8.3f} {group['max_scanned']:>11,}  "
+                  f"{describe_filters(group['filters'])}")
 
     def do_EOF(self, _arg):
-        """Exit the interactive session."""
+        """Exit the interactive session.
+
+        Any running background jobs are cancelled first, so that their output
+        files are closed properly.
+        """
+        running = [job for job in self.jobs.values() if job.running]
+        if running:
+            print(f"Cancelling {len(running)} running job(s).",
+                  file=sys.stderr)
+        for job in running:
+            job.cancel.set()
+        for job in running:
+            job.thread.join()
         return True
 
     # Alternative ways to quit.
@@ -439,7 +1305,8 @@ class NEOShell(cmd.Cmd):
     do_quit = do_EOF
 
     def precmd(self, line):
-        """Watch for changes to the files in this project."""
+        """Watch for changes to the data files and to this project's files."""
+        self.check_data()
         changed = [f for f in PROJECT_ROOT.glob(
             '*.py') if f.stat().st_mtime > _START]
         if changed:
@@ -460,26 +1327,160 @@ class NEOShell(cmd.Cmd):
                 return 'exit'
         return line
 
+    def postcmd(self, stop, line):
+        """Report the background jobs that finished during the command."""
+        self.report_jobs()
+        return stop
+
+
+def timed(timings, phase, load):
+    """Wrap a loader to record the time it takes in a dictionary of timings.
+
+    :param timings: A dictionary of phase names to times, in seconds.
+    :param phase: The name of the phase of loading.
+    :param load: A zero-argument callable that loads some data.
+    :return: A zero-argument callable that loads the same data.
+    """
+    def timed_load():
+        """Load the data, recording how long it takes to be ready."""
+        start = time.perf_counter()
+        result = load()
+        timings[phase + '.ready'] = time.perf_counter() - start
+        return result
+    return timed_load
+
+
+def report_timings(timings):
+    """Print the time spent in each phase of loading to standard error.
+
+    :param timings: A dictionary of phase names to times, in seconds.
+    """
+    for phase, seconds in timings.items():
+        print(f"{phase:<20} {seconds * 1000:10.1f} ms", file=sys.stderr)
+
+
+def build_database(args, timings=None, progress=None):
+    """Create a lazy `NEODatabase` of the data files given on the command line.
+
+    :param args: All arguments from the command line, as parsed by the
+    top-level parser.
+    :param timings: An optional dictionary in which to record the time spent
+    in each phase of loading, in seconds.
+    :param progress: An optional callable, called with the name of a phase of
+    loading ('neos' or 'approaches') and the number of rows read so far,
+    periodically while that phase runs. It isn't called when the data files
+    are loaded in worker processes.
+    :return: A new `NEODatabase`, which loads the data files on first use.
+    """
+    if timings is None:
+        timings = {}
+    index = DataIndex(args.neofile, args.cadfile) if args.index else None
+    if args.parallel_load or args.load_processes:
+        chunk_bytes = CHUNK_BYTES if args.load_processes else None
+        loader = ConcurrentLoader(args.neofile, args.cadfile,
+                                  processes=args.load_processes,
+                                  chunk_bytes=chunk_bytes)
+        # Every subcommand but `inspect` links the close approaches, so parse
+        # both files at once; `inspect` parses the close approaches only if
+        # it shows them.
+        if args.cmd != 'inspect':
+            loader.start()
+        # Share the loader's timings with the caller.
+        loader.timings = timings
+        load_neo_data, load_approach_data = loader.neos, loader.approaches
+    else:
+        def reporter(phase):
+            """Return a progress callback for a phase, or None."""
+            if progress is None:
+                return None
+            return functools.partial(progress, phase)
+
+        load_neo_data = timed(
+            timings, 'neos', functools.partial(
+                load_neos, args.neofile, progress=reporter('neos')))
+        load_approach_data = timed(
+            timings, 'approaches', functools.partial(
+                load_approaches, args.cadfile,
+                progress=reporter('approaches')))
+    # Analysts refine queries step by step in the interactive shell, so
+    # remember the results of its queries.
+    cache = QueryCache() if args.cmd == 'interactive' else None
+    return NEODatabase(load_neo_data, load_approach_data, index=index,
+                       cache=cache)
+
 
 def main():
     """Run the main script."""
     parser, inspect_parser, query_parser = make_parser()
     args = parser.parse_args()
 
-    # Extract data from the data files into structured Python objects.
-    database = NEODatabase(
-        load_neos(
-            args.neofile), load_approaches(
-            args.cadfile))
+    profile = Profile(trace_memory=True) if args.profile else DISABLED
+    profiler = cProfile.Profile() if args.profile_out else None
+    if profiler is not None:
+        profiler.enable()
+
+    # Extract data from the data files into structured Python objects, lazily,
+    # so that each subcommand only loads the data that it needs.
+    timings = {}
+    # Report the rows read while the interactive shell loads the data.
+    progress = LoadProgress() if args.cmd == 'interactive' else None
+    database = build_database(args, timings, progress)
+    database.profile = profile
+    slowlog = (SlowQueryLog(args.slow_log, args.slow_threshold)
+               if args.slow_log else None)
+
+    # Run the chosen subcommand. Its phase of the profile excludes the phases
+    # of loading and scanning nested in it.
+    try:
+        with profile.phase(args.cmd or 'none'):
+            run(args, database, inspect_parser, query_parser, profile,
+                slowlog, progress)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_out)
+
+    if args.timing:
+        report_timings(timings)
+    if args.profile:
+        profile.stop()
+        profile.report()
 
-    # Run the chosen subcommand.
+
+def run(args, database, inspect_parser, query_parser, profile=DISABLED,
+        slowlog=None, progress=None):
+    """Run the subcommand chosen on the command line.
+
+    :param args: All arguments from the command line, as parsed by the
+    top-level parser.
+    :param database: The `NEODatabase` containing data on NEOs and their close
+    approaches.
+    :param inspect_parser: The subparser for the `inspect` subcommand.
+    :param query_parser: The subparser for the `query` subcommand.
+    :param profile: A `profiling.Profile` in which to record the phases of
+    the subcommand.
+    :param slowlog: An optional `slowlog.SlowQueryLog` of slow queries.
+    :param progress: An optional `LoadProgress`, to which the database's
+    loaders report.
+    """
     if args.cmd == 'inspect':
         inspect(database, pdes=args.pdes, name=args.name, verbose=args.verbose)
     elif args.cmd == 'query':
-        query(database, args)
+        try:
+            query(database, args, profile=profile, slowlog=slowlog)
+        except QueryCancelled as err:
+            print(err, file=sys.stderr)
+    elif args.cmd == 'watch':
+        watch(database, args, query_parser)
     elif args.cmd == 'interactive':
-        NEOShell(database, inspect_parser, query_parser,
-                 aggressive=args.aggressive).cmdloop()
+        shell = NEOShell(
+            database, inspect_parser, query_parser,
+            aggressive=args.aggressive,
+            reload=functools.partial(build_database, args),
+            watch=(args.neofile, args.cadfile), slowlog=slowlog,
+            progress=progress)
+        shell.load_in_background()
+        shell.cmdloop()
 
 
 if __name__ == '__main__':
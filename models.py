@@ -17,7 +17,8 @@ quirks of the data set, such as missing names and unknown diameters.
 
 You'll edit this file in Task 1.
 """
-from helpers import cd_to_datetime, datetime_to_str
+from helpers import (MINUTES_PER_DAY, cd_to_minutes, minutes_to_datetime,
+                     minutes_to_str)
 
 
 class NearEarthObject:
@@ -98,9 +99,18 @@ class CloseApproach:
     initially, this information (the NEO's primary designation) is saved in a
     private attribute, but the referenced NEO is eventually replaced in the
     `NEODatabase` constructor.
+
+    The approach time is stored as an integer number of minutes, with the
+    integer ordinal of its date in `day_ordinal` for fast date comparisons.
+    The `time` property only builds a `datetime` when it's needed.
+
+    When they're known, the ID of the orbit solution used to compute the
+    approach (`orbit_id`) and its exact time as a Julian date string (`jd`)
+    identify the approach, along with the NEO's designation.
     """
 
-    def __init__(self, time, distance, velocity, _designation: str):
+    def __init__(self, time, distance, velocity, _designation: str,
+                 orbit_id=None, jd=None):
         """Create a new `CloseApproach`.
 
         :parameters:
@@ -116,18 +126,94 @@ class CloseApproach:
             _designation: string
                 Primary designation of the NEO in place of a NearEarthObject
                 typed object.
+            orbit_id: string, optional
+                ID of the orbit solution used to compute the approach.
+            jd: string, optional
+                Time of the approach, as a Julian date.
         """
         self._designation = str(_designation)
+        self.orbit_id = orbit_id
+        self.jd = jd
+        # Store the approach time as a compact integer timestamp, along with
+        # the integer ordinal of its date. The `datetime` itself is only built
+        # when the `time` property is first accessed.
         if time:
-            self.time = cd_to_datetime(time)
+            self._minutes = cd_to_minutes(time)
+            self.day_ordinal = self._minutes // MINUTES_PER_DAY
         else:
-            self.time = None
+            self._minutes = None
+            self.day_ordinal = None
+        self._time = None
+        self._formatted = None
         self.distance = float(distance)
         self.velocity = float(velocity)
 
         # Create an attribute for the referenced NEO, originally None.
         self.neo = None
 
+    @classmethod
+    def from_minutes(cls, minutes, distance, velocity, _designation,
+                     orbit_id=None, jd=None):
+        """Create a new `CloseApproach` from already-converted values.
+
+        This skips the parsing and coercion done by the constructor, for
+        loaders that have converted the values elsewhere.
+
+        :param minutes: The approach time, as from `cd_to_minutes`, or None.
+        :param distance: The nominal approach distance in au, as a float.
+        :param velocity: The relative approach velocity in km/s, as a float.
+        :param _designation: The primary designation of the NEO, as a string.
+        :param orbit_id: The ID of the orbit solution, as a string, or None.
+        :param jd: The time of the approach as a Julian date string, or None.
+        :return: A new `CloseApproach`.
+        """
+        approach = cls.__new__(cls)
+        approach._designation = _designation
+        approach.orbit_id = orbit_id
+        approach.jd = jd
+        approach._minutes = minutes
+        if minutes is None:
+            approach.day_ordinal = None
+        else:
+            approach.day_ordinal = minutes // MINUTES_PER_DAY
+        approach._time = None
+        approach._formatted = None
+        approach.distance = distance
+        approach.velocity = velocity
+        approach.neo = None
+        return approach
+
+    @property
+    def time(self):
+        """Return the approach time, as a naive `datetime` in UTC.
+
+        The `datetime` is computed from the compact timestamp on first access,
+        and cached.
+        """
+        if self._time is None and self._minutes is not None:
+            self._time = minutes_to_datetime(self._minutes)
+        return self._time
+
+    @property
+    def minutes(self):
+        """Return the approach time as a timestamp from `cd_to_minutes`.
+
+        This is the compact form of `time`, or None if the time is unknown.
+        """
+        return self._minutes
+
+    @property
+    def key(self):
+        """Return the `(designation, orbit_id, jd)` identifying this approach.
+
+        Approaches with the same key are the same approach, from different
+        batches of data. If the Julian date is unknown, the approach time (in
+        minutes) stands in for it.
+        """
+        if self.jd is None:
+            return (self._designation, self.orbit_id, self._minutes)
+        return (self._designation, self.orbit_id, self.jd)
+
     @property
     def time_str(self):
         """Return a formatted repr of this `CloseApproach`'s approach time.
@@ -139,9 +225,25 @@ class CloseApproach:
 
         The `datetime_to_str` method converts a `datetime` object to a
         formatted string that can be used in human-readable representations and
-        in serialization to CSV and JSON files.
+        in serialization to CSV and JSON files. Here, `minutes_to_str` produces
+        the same string directly from the compact timestamp, without building
+        the `datetime`.
+        """
+        return minutes_to_str(self._minutes)
+
+    @property
+    def formatted(self):
+        """Return the approach's time, distance and velocity, as strings.
+
+        These are `time_str` and the `repr` of each float, as the `write`
+        module writes them. They're formatted on first access and cached, so
+        exporting an approach again - in another format, or from the results
+        of a cached query - doesn't format them again.
         """
-        return datetime_to_str(self.time)
+        if self._formatted is None:
+            self._formatted = (self.time_str, repr(self.distance),
+                               repr(self.velocity))
+        return self._formatted
 
     def __str__(self):
         """Return `str(self)`."""
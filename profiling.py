@@ -0,0 +1,180 @@
+"""Profile the phases of a run: their time, rows, and peak memory.
+
+A `Profile` records named phases, such as loading the NEOs or writing the
+results of a query. Each phase records its time (excluding the time of any
+phases nested in it), the number of rows it handled, and - if memory tracing
+is on - the peak memory traced by `tracemalloc` while it ran:
+
+    profile = Profile(trace_memory=True)
+    with profile.phase('neos') as phase:
+        neos = load_neos(path)
+        phase.rows = len(neos)
+    profile.report()
+
+A stream of results can also be profiled with `stream`, which records only the
+time spent producing each result, so that the consumer's time stays with the
+enclosing phase.
+
+The main module uses a `Profile` with the `--profile` option. An `NEODatabase`
+records its phases of loading in its `profile`, which is `DISABLED` - a
+profile that measures nothing - unless the main module sets it.
+"""
+import contextlib
+import sys
+import threading
+import time
+import tracemalloc
+
+
+class Phase:
+    """The measurements of a phase of a run."""
+
+    def __init__(self, name):
+        """Create a new, empty `Phase`.
+
+        :param name: The name of the phase.
+        """
+        self.name = name
+        self.seconds = 0.0
+        self.rows = None
+        self.peak = None
+
+    @property
+    def rate(self):
+        """Return the rows handled per second, or None if unknown."""
+        if self.rows is None or self.seconds <= 0:
+            return None
+        return self.rows / self.seconds
+
+
+class Profile:
+    """A profile of the phases of a run."""
+
+    def __init__(self, enabled=True, trace_memory=False):
+        """Create a new `Profile`.
+
+        :param enabled: Whether to measure anything at all.
+        :param trace_memory: Whether to trace memory with `tracemalloc`, to
+        record the peak memory of each phase. Tracing memory slows the run.
+        """
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.phases = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started = time.perf_counter()
+        self._tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+
+    def stop(self):
+        """Stop tracing memory, if this profile started it."""
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def _get(self, name):
+        """Return the phase of a name, adding it if it's new."""
+        with self._lock:
+            if name not in self.phases:
+                self.phases[name] = Phase(name)
+            return self.phases[name]
+
+    def _checkpoint(self, stack):
+        """Fold the peak memory so far into every running phase, and reset it.
+
+        Before Python 3.9, `tracemalloc` can't reset its peak, so each phase
+        records the peak since tracing started.
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        for phase in stack:
+            phase.peak = peak if phase.peak is None else max(phase.peak, peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Measure a phase of the run, which may be nested in another.
+
+        Phases nest on a separate stack on each thread. If a phase with the
+        same name runs more than once, its measurements are added together.
+
+        :param name: The name of the phase.
+        :yield: The `Phase`, on which the caller can set `rows`.
+        """
+        if not self.enabled:
+            yield Phase(name)
+            return
+        phase = self._get(name)
+        stack = self._local.__dict__.setdefault('stack', [])
+        if self.trace_memory:
+            self._checkpoint(stack)
+        stack.append(phase)
+        start = time.perf_counter()
+        try:
+            yield phase
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.trace_memory:
+                self._checkpoint(stack)
+            stack.pop()
+            phase.seconds += elapsed
+            # Count the time of a nested phase only once.
+            if stack:
+                stack[-1].seconds -= elapsed
+
+    def stream(self, name, iterable):
+        """Profile the time spent producing each value of a stream.
+
+        Memory isn't traced for each value, as that would be too slow.
+
+        :param name: The name of the phase.
+        :param iterable: An iterable of values, such as the results of a query.
+        :yield: Each value of the iterable.
+        """
+        if not self.enabled:
+            yield from iterable
+            return
+        phase = self._get(name)
+        phase.rows = phase.rows or 0
+        stack = self._local.__dict__.setdefault('stack', [])
+        iterator = iter(iterable)
+        while True:
+            stack.append(phase)
+            start = time.perf_counter()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                phase.seconds += elapsed
+                if stack:
+                    stack[-1].seconds -= elapsed
+            phase.rows += 1
+            yield value
+
+    def report(self, file=None):
+        """Print a table of the phases of the run.
+
+        :param file: A text stream on which to print the table. If None, use
+        standard error.
+        """
+        file = file or sys.stderr
+        total = time.perf_counter() - self._started
+        print(f"{'phase':<12} {'seconds':>9} {'share':>6} {'rows':>11} "
+              f"{'rows/s':>11} {'peak MiB':>9}", file=file)
+        for phase in self.phases.values():
+            rows = '' if phase.rows is None else f"{phase.rows:,}"
+            rate = '' if phase.rate is None else f"{phase.rate:,.0f}"
+            peak = ('' if phase.peak is None
+                    else f"{phase.peak / 2 ** 20:.1f}")
+            share = phase.seconds / total if total > 0 else 0
+            print(f"{phase.name:<12} {phase.seconds:9.3f} {share:6.1%} "
+                  f"{rows:>11} {rate:>11} {peak:>9}", file=file)
+        print(f"{'total':<12} {total:9.3f}", file=file)
+
+
+# A profile that measures nothing.
+DISABLED = Profile(enabled=False)
@@ -0,0 +1,175 @@
+"""Log the queries that take longer than a threshold, and summarize the log.
+
+A `SlowQueryLog` appends a JSON object to a local file, one per line, for each
+query that takes at least its threshold in seconds (not counting any wait for
+the data to load). Each entry records when the query ran, how long it took,
+its normalized filters, its limit and output formats, the rows that it scanned
+and emitted (from its `QueryStats`), and the time of each of its phases, such
+as:
+
+    {"time": "2026-10-19T09:30:00Z", "seconds": 2.41,
+     "filters": [{"attribute": "distance", "op": "<=", "value": 0.1}],
+     "limit": null, "formats": ["csv"], "plan": "scan", "complete": true,
+     "rows_scanned": 406785, "rows_emitted": 13162,
+     "phases": {"load": 1.52, "scan": 0.35, "output": 2.06}}
+
+The `summarize` function groups the entries of a log by their filters, to
+find the worst offenders.
+
+The main module keeps a slow query log with the `--slow-log` option, for the
+`query` subcommand and for the queries of the interactive shell, whose
+`slowlog` command shows the summary.
+"""
+import datetime
+import json
+import os
+import threading
+
+from filters import OPERATOR_SYMBOLS
+
+
+def normalize_filters(filters):
+    """Describe a collection of filters in a canonical, JSON-ready form.
+
+    Filters are described by their attribute, comparator and reference value,
+    and sorted, so that the same criteria always have the same description
+    regardless of the order of the options that created them.
+
+    :param filters: A collection of filters, as from `create_filters`.
+    :return: A sorted list of dictionaries with the 'attribute', 'op' and
+    'value' of each filter.
+    """
+    described = []
+    for f in filters:
+        attribute = type(f).__name__
+        if attribute.endswith('Filter'):
+            attribute = attribute[:-len('Filter')]
+        value = getattr(f, 'date', f.value)
+        if isinstance(value, datetime.date):
+            value = value.isoformat()
+        described.append({'attribute': attribute.lower(),
+                          'op': OPERATOR_SYMBOLS.get(f.op, f.op.__name__),
+                          'value': value})
+    return sorted(described, key=lambda d: (d['attribute'], d['op']))
+
+
+def query_entry(filters, limit, formats, stats, seconds, phases):
+    """Create an entry of the slow query log for a query.
+
+    :param filters: The filters of the query.
+    :param limit: The limit of the query, or None.
+    :param formats: A list of the formats of the query's output, such as
+    `['csv', 'json']`, or `['text']` for results printed to stdout.
+    :param stats: The `database.QueryStats` of the query.
+    :param seconds: The time that the query took, in seconds.
+    :param phases: A dictionary of the names of the phases of the query to
+    their times, in seconds.
+    :return: A dictionary, ready to be recorded.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return {
+        'time': now.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'seconds': round(seconds, 6),
+        'filters': normalize_filters(filters),
+        'limit': limit,
+        'formats': list(formats),
+        'plan': stats.plan,
+        'complete': stats.complete,
+        'rows_scanned': stats.scanned,
+        'rows_emitted': stats.emitted,
+        'phases': {name: round(seconds, 6)
+                   for name, seconds in phases.items()},
+    }
+
+
+class SlowQueryLog:
+    """An append-only log of slow queries, as JSON lines in a local file.
+
+    Each entry is appended with a single write to the file opened with
+    `O_APPEND`, so that processes sharing a log on a local file system don't
+    interleave their entries. The lock only orders the entries of the threads
+    of one process.
+    """
+
+    def __init__(self, path, threshold=1.0):
+        """Create a new `SlowQueryLog`.
+
+        :param path: The path of the log file, which is created if needed.
+        :param threshold: The minimum time of a query to log, in seconds.
+        """
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+
+    def record(self, entry):
+        """Append an entry to the log, if its query took long enough.
+
+        :param entry: A dictionary, as from `query_entry`.
+        :return: Whether the entry was logged.
+        """
+        if entry['seconds'] < self.threshold:
+            return False
+        line = (json.dumps(entry, sort_keys=True) + '\n').encode()
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                         0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        return True
+
+    def entries(self):
+        """Read the entries of the log, skipping any lines that are damaged.
+
+        :return: A list of dictionaries, oldest first. The list is empty if
+        the log doesn't exist yet.
+        """
+        entries = []
+        try:
+            with open(self.path) as file:
+                for line in file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+
+def summarize(entries, top=10):
+    """Group the entries of a slow query log by their filters.
+
+    :param entries: An iterable of entries, as from `SlowQueryLog.entries`.
+    :param top: The number of groups to return.
+    :return: A list of at most `top` dictionaries, each with the 'filters' of
+    a group, its 'count' of entries, and its 'max', 'mean' and 'total'
+    seconds, and its 'max_scanned' rows - worst (by 'max') first.
+    """
+    groups = {}
+    for entry in entries:
+        key = json.dumps(entry.get('filters', []), sort_keys=True)
+        group = groups.setdefault(key, {
+            'filters': entry.get('filters', []), 'count': 0, 'max': 0.0,
+            'total': 0.0, 'max_scanned': 0})
+        group['count'] += 1
+        group['total'] += entry['seconds']
+        group['max'] = max(group['max'], entry['seconds'])
+        group['max_scanned'] = max(group['max_scanned'],
+                                   entry.get('rows_scanned', 0))
+    for group in groups.values():
+        group['mean'] = group['total'] / group['count']
+    return sorted(groups.values(), key=lambda g: g['max'], reverse=True)[:top]
+
+
+def describe_filters(filters):
+    """Describe normalized filters briefly, such as `distance <= 0.1`.
+
+    :param filters: A list of filters, as from `normalize_filters`.
+    :return: A string.
+    """
+    if not filters:
+        return '(no filters)'
+    return ', '.join(f"{f['attribute']} {f['op']} {f['value']}"
+                     for f in filters)
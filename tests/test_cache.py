@@ -0,0 +1,116 @@
+"""Check that cached result sets answer narrower queries correctly.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_cache
+"""
+import datetime
+import operator
+import pathlib
+import unittest
+
+from cache import QueryCache, implies
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import (DateFilter, DistanceFilter, HazardousFilter,
+                     VelocityFilter, create_filters)
+from models import CloseApproach
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+# A refinement workflow: each step is at least as narrow as the one before.
+STEPS = [
+    dict(start_date=datetime.date(2020, 3, 1)),
+    dict(start_date=datetime.date(2020, 3, 1), distance_max=0.1),
+    dict(start_date=datetime.date(2020, 3, 1), distance_max=0.1,
+         hazardous=False),
+    dict(start_date=datetime.date(2020, 4, 1), distance_max=0.05,
+         hazardous=False),
+    dict(date=datetime.date(2020, 4, 15), distance_max=0.05,
+         hazardous=False),
+]
+
+
+class TestImplies(unittest.TestCase):
+    def test_tighter_ranges_imply_looser_ones(self):
+        self.assertTrue(implies(DistanceFilter(operator.le, 0.05),
+                                DistanceFilter(operator.le, 0.1)))
+        self.assertTrue(implies(VelocityFilter(operator.ge, 20),
+                                VelocityFilter(operator.ge, 10)))
+        self.assertTrue(implies(
+            DateFilter(operator.eq, datetime.date(2020, 4, 15)),
+            DateFilter(operator.ge, datetime.date(2020, 3, 1))))
+
+    def test_looser_and_unrelated_filters_dont(self):
+        self.assertFalse(implies(DistanceFilter(operator.le, 0.1),
+                                 DistanceFilter(operator.le, 0.05)))
+        self.assertFalse(implies(DistanceFilter(operator.ge, 0.05),
+                                 DistanceFilter(operator.le, 0.1)))
+        self.assertFalse(implies(VelocityFilter(operator.le, 0.05),
+                                 DistanceFilter(operator.le, 0.1)))
+        self.assertFalse(implies(HazardousFilter(operator.eq, True),
+                                 HazardousFilter(operator.eq, False)))
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = QueryCache()
+        self.db = NEODatabase(load_neos(TEST_NEO_FILE),
+                              load_approaches(TEST_CAD_FILE),
+                              cache=self.cache)
+        self.uncached = NEODatabase(load_neos(TEST_NEO_FILE),
+                                    load_approaches(TEST_CAD_FILE))
+
+    def assertSameResults(self, criteria):
+        self.assertEqual(
+            [a.key for a in self.db.query(create_filters(**criteria))],
+            [a.key for a in self.uncached.query(create_filters(**criteria))])
+
+    def test_refinements_match_uncached_queries(self):
+        for criteria in STEPS:
+            with self.subTest(criteria=criteria):
+                self.assertSameResults(criteria)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, len(STEPS) - 1)
+
+    def test_broader_queries_are_not_answered_from_the_cache(self):
+        self.assertSameResults(STEPS[1])
+        self.assertSameResults(STEPS[0])
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_stopped_queries_cover_a_prefix_of_the_rows(self):
+        results = self.db.query(create_filters(**STEPS[0]))
+        first = [next(results) for _ in range(5)]
+        results.close()
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.rows, 5)
+        self.assertEqual(first,
+                         list(self.db.query(create_filters(**STEPS[0])))[:5])
+        for criteria in STEPS:
+            with self.subTest(criteria=criteria):
+                self.assertSameResults(criteria)
+
+    def test_ingested_approaches_are_found(self):
+        list(self.db.query(create_filters(**STEPS[0])))
+        approach = CloseApproach(time='2020-Apr-15 00:00', distance='0.01',
+                                 velocity='10', _designation='2020 NJ1',
+                                 orbit_id='1', jd='2458954.5')
+        self.db.add_approaches([approach])
+        results = list(self.db.query(create_filters(**STEPS[-1])))
+        self.assertIn(approach, results)
+
+    def test_retained_rows_are_bounded(self):
+        cache = QueryCache(max_rows=1000)
+        db = NEODatabase(load_neos(TEST_NEO_FILE),
+                         load_approaches(TEST_CAD_FILE), cache=cache)
+        for criteria in STEPS:
+            list(db.query(create_filters(**criteria)))
+            self.assertLessEqual(cache.rows, 1000)
+        self.assertGreater(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,11 +12,14 @@ These tests should pass when Task 2 is complete.
 """
 import pathlib
 import math
+import threading
 import unittest
 
 
 from extract import load_neos, load_approaches
-from database import NEODatabase
+from database import NEODatabase, QueryCancelled, QueryStats, QueryTimeout
+from filters import create_filters
+from models import CloseApproach
 
 
 # Paths to the test data files.
@@ -54,6 +57,18 @@ class TestDatabase(unittest.TestCase):
                     self.fail(f"{approach} appears in the approaches of multiple NEOs.")
                 seen.add(approach)
 
+    def test_database_construction_keeps_each_neos_approaches_in_order(self):
+        expected = {}
+        for approach in self.approaches:
+            expected.setdefault(approach.neo.designation, []).append(approach)
+        for neo in self.neos:
+            self.assertEqual(list(neo.approaches), expected.get(neo.designation, []))
+            self.assertEqual(len(neo.approaches), len(expected.get(neo.designation, [])))
+
+    def test_database_construction_links_approaches_to_neo_designations(self):
+        for approach in self.approaches:
+            self.assertIs(approach._designation, approach.neo.designation)
+
     def test_get_neo_by_designation(self):
         cerberus = self.db.get_neo_by_designation('1865')
         self.assertIsNotNone(cerberus)
@@ -115,5 +130,169 @@ class TestDatabase(unittest.TestCase):
         self.assertIsNone(nonexistent)
 
 
+class TestLazyDatabase(unittest.TestCase):
+    def setUp(self):
+        self.loaded = []
+
+        def loader(name, function, path):
+            def load():
+                self.loaded.append(name)
+                return function(path)
+            return load
+
+        self.db = NEODatabase(loader('neos', load_neos, TEST_NEO_FILE),
+                              loader('approaches', load_approaches, TEST_CAD_FILE))
+
+    def test_construction_loads_nothing(self):
+        self.assertEqual(self.loaded, [])
+
+    def test_lookup_only_loads_neos(self):
+        cerberus = self.db.get_neo_by_designation('1865')
+        self.assertEqual(cerberus.name, 'Cerberus')
+        self.assertIsNotNone(self.db.get_neo_by_name('Adonis'))
+        self.assertEqual(self.loaded, ['neos'])
+
+    def test_accessing_approaches_links_the_database(self):
+        cerberus = self.db.get_neo_by_designation('1865')
+        approaches = list(cerberus.approaches)
+        self.assertEqual(self.loaded, ['neos', 'approaches'])
+        self.assertGreater(len(approaches), 0)
+        for approach in approaches:
+            self.assertIs(approach.neo, cerberus)
+
+    def test_query_loads_everything_once(self):
+        self.assertEqual(len(list(self.db.query())), 4700)
+        self.assertEqual(len(list(self.db.query())), 4700)
+        self.assertEqual(self.loaded, ['neos', 'approaches'])
+
+    def test_load_reports_progress_of_each_phase(self):
+        progress = []
+        self.db.load(progress=lambda *args: progress.append(args))
+        self.assertTrue(self.db.neos_loaded)
+        self.assertTrue(self.db.linked)
+        self.assertEqual([(phase, rows) for phase, rows, _ in progress],
+                         [('neos', 4226), ('approaches', 4700),
+                          ('link', 4700)])
+
+    def test_lookups_and_queries_wait_for_background_loading(self):
+        thread = threading.Thread(target=self.db.load)
+        thread.start()
+        self.assertEqual(self.db.get_neo_by_designation('1865').name,
+                         'Cerberus')
+        self.assertEqual(len(list(self.db.query())), 4700)
+        thread.join()
+        self.assertEqual(self.loaded, ['neos', 'approaches'])
+
+
+class TestAddApproaches(unittest.TestCase):
+    def setUp(self):
+        self.approaches = load_approaches(TEST_CAD_FILE)
+        self.db = NEODatabase(load_neos(TEST_NEO_FILE), self.approaches)
+        self.apophis = self.db.get_neo_by_designation('99942')
+
+    def new_approach(self, designation='99942', jd='2459000.5'):
+        return CloseApproach(time='2020-May-31 00:00', distance='0.3',
+                             velocity='10', _designation=designation,
+                             orbit_id='220', jd=jd)
+
+    def test_new_approaches_are_linked_and_queried(self):
+        before = len(self.apophis.approaches)
+        approach = self.new_approach()
+        result = self.db.add_approaches([approach])
+        self.assertEqual(result, (1, 0, 0))
+        self.assertIs(approach.neo, self.apophis)
+        self.assertEqual(len(self.apophis.approaches), before + 1)
+        self.assertIs(self.apophis.approaches[-1], approach)
+        self.assertIn(approach, list(self.db.query()))
+        self.assertEqual(self.db.version, 1)
+
+    def test_duplicates_and_unknown_neos_are_skipped(self):
+        existing = load_approaches(TEST_CAD_FILE)[:10]
+        batch = existing + [self.new_approach(), self.new_approach(),
+                            self.new_approach(designation='not-an-neo')]
+        result = self.db.add_approaches(batch)
+        self.assertEqual((result.added, result.duplicates, result.unknown),
+                         (1, 11, 1))
+        self.assertEqual(len(list(self.db.query())), 4701)
+
+    def test_old_views_are_unchanged(self):
+        view = self.apophis.approaches
+        before = list(view)
+        self.db.add_approaches([self.new_approach(jd='2459001.5')])
+        self.assertEqual(list(view), before)
+
+    def test_small_batches_append_to_shared_extras(self):
+        before = len(self.apophis.approaches)
+        views = []
+        for day in range(100):
+            self.db.add_approaches([self.new_approach(jd=f"2459{day:03d}.5")])
+            views.append(self.apophis.approaches)
+        view = views[-1]
+        self.assertEqual(len(view), before + 100)
+        self.assertEqual(view[-1].jd, '2459099.5')
+        # Extending an older view again doesn't change the newer views.
+        older = views[49].extended([self.new_approach(jd='2460000.5')])
+        self.assertEqual(len(older), before + 51)
+        self.assertEqual(older[-1].jd, '2460000.5')
+        self.assertEqual(list(view)[-1].jd, '2459099.5')
+        self.assertEqual(len(view), before + 100)
+
+
+class TestQueryCancellation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE),
+                             load_approaches(TEST_CAD_FILE))
+
+    def test_uncancelled_query_yields_every_match(self):
+        cancel = threading.Event()
+        self.assertEqual(list(self.db.query(cancel=cancel, timeout=60)),
+                         list(self.db.query()))
+
+    def test_cancelled_query_stops_scanning(self):
+        cancel = threading.Event()
+        results = []
+        with self.assertRaises(QueryCancelled):
+            for approach in self.db.query(cancel=cancel):
+                results.append(approach)
+                cancel.set()
+        self.assertLess(len(results), len(list(self.db.query())))
+
+    def test_query_times_out(self):
+        with self.assertRaises(QueryTimeout):
+            list(self.db.query(timeout=0))
+
+
+class TestQueryStats(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE),
+                             load_approaches(TEST_CAD_FILE))
+
+    def test_stats_count_the_work_of_a_complete_query(self):
+        filters = create_filters(distance_max=0.1, hazardous=True)
+        results = list(self.db.query(filters))
+        stats = self.db.last_query_stats
+        self.assertTrue(stats.complete)
+        self.assertEqual(stats.plan, 'scan')
+        self.assertEqual(stats.scanned, 4700)
+        self.assertEqual(stats.emitted, len(results))
+        # Each filter is only evaluated on the rows that passed the previous.
+        self.assertEqual(stats.evaluations[0], 4700)
+        self.assertEqual(stats.evaluations[1], stats.passes(0))
+        self.assertEqual(stats.passes(1), len(results))
+        self.assertEqual(len(stats.explain()), 2 + len(filters))
+
+    def test_stats_describe_a_stopped_query(self):
+        stats = QueryStats()
+        results = self.db.query(create_filters(distance_max=0.1),
+                                stats=stats)
+        next(results)
+        self.assertIs(self.db.last_query_stats, stats)
+        self.assertFalse(stats.complete)
+        self.assertEqual(stats.emitted, 1)
+        self.assertLess(stats.scanned, 4700)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -12,11 +12,17 @@ These tests should pass when Task 2 is complete.
 """
 import collections.abc
 import datetime
+import json
 import pathlib
+import shutil
+import tempfile
 import math
 import unittest
+import unittest.mock
 
-from extract import load_neos, load_approaches
+from extract import (ConcurrentLoader, cad_chunk_spans, csv_chunk_spans,
+                     load_neos, load_neos_parallel, load_approaches,
+                     load_approaches_parallel)
 from models import NearEarthObject, CloseApproach
 
 
@@ -50,6 +56,13 @@ class TestLoadNEOs(unittest.TestCase):
     def test_neos_contain_all_elements(self):
         self.assertEqual(len(self.neos), 4226)
 
+    def test_progress_is_reported_while_loading(self):
+        reported = []
+        with unittest.mock.patch('extract.PROGRESS_EVERY', 1000):
+            neos = load_neos(TEST_NEO_FILE, progress=reported.append)
+        self.assertEqual(reported, [0, 1000, 2000, 3000, 4000, 4226])
+        self.assertEqual(len(neos), 4226)
+
     def test_neos_contain_2019_SC8_no_name_no_diameter(self):
         self.assertIn('2019 SC8', self.neos_by_designation)
         neo = self.neos_by_designation['2019 SC8']
@@ -107,6 +120,15 @@ class TestLoadApproaches(unittest.TestCase):
         self.assertIsNotNone(approach)
         self.assertIsInstance(approach.time, datetime.datetime)
 
+    def test_approach_day_ordinal_matches_time(self):
+        for approach in self.approaches:
+            self.assertEqual(approach.day_ordinal, approach.time.date().toordinal())
+
+    def test_approach_time_matches_calendar_date(self):
+        approach = self.get_first_approach_or_none()
+        self.assertIsNotNone(approach)
+        self.assertEqual(approach.time, datetime.datetime(2020, 1, 1, 0, 54))
+
     def test_approach_distance_is_float(self):
         approach = self.get_first_approach_or_none()
         self.assertIsNotNone(approach)
@@ -118,5 +140,132 @@ class TestLoadApproaches(unittest.TestCase):
         self.assertIsInstance(approach.velocity, float)
 
 
+def neo_values(neos):
+    return [(neo.designation, neo.name, str(neo.diameter), neo.hazardous)
+            for neo in neos]
+
+
+def approach_values(approaches):
+    return [(approach._designation, approach._minutes, approach.day_ordinal,
+             str(approach.distance), str(approach.velocity))
+            for approach in approaches]
+
+
+class TestConcurrentLoader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.loader = ConcurrentLoader(TEST_NEO_FILE, TEST_CAD_FILE).start()
+        cls.neos = cls.loader.neos()
+        cls.approaches = cls.loader.approaches()
+
+    def test_neos_match_load_neos(self):
+        self.assertEqual(neo_values(self.neos),
+                         neo_values(load_neos(TEST_NEO_FILE)))
+
+    def test_approaches_match_load_approaches(self):
+        self.assertEqual(approach_values(self.approaches),
+                         approach_values(load_approaches(TEST_CAD_FILE)))
+
+    def test_approaches_are_unlinked(self):
+        for approach in self.approaches:
+            self.assertIsNone(approach.neo)
+            self.assertIsInstance(approach.time, datetime.datetime)
+
+    def test_chunked_loading_matches_unchunked_loading(self):
+        loader = ConcurrentLoader(TEST_NEO_FILE, TEST_CAD_FILE, processes=2,
+                                  chunk_bytes=4096)
+        self.assertEqual(neo_values(loader.neos()), neo_values(self.neos))
+        self.assertEqual(approach_values(loader.approaches()),
+                         approach_values(self.approaches))
+
+    def test_approaches_are_parsed_only_when_needed(self):
+        loader = ConcurrentLoader(TEST_NEO_FILE, TEST_CAD_FILE)
+        self.assertEqual(neo_values(loader.neos()), neo_values(self.neos))
+        self.assertNotIn('approaches', loader._plans)
+        self.assertEqual(approach_values(loader.approaches()),
+                         approach_values(self.approaches))
+
+    def test_missing_data_fails_when_approaches_are_needed(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        path = tmp / 'cad.json'
+        path.write_text(json.dumps({'fields': ['des', 'cd', 'dist']}))
+        loader = ConcurrentLoader(TEST_NEO_FILE, path, chunk_bytes=4096)
+        self.assertEqual(neo_values(loader.neos()), neo_values(self.neos))
+        with self.assertRaises(ValueError):
+            loader.approaches()
+
+    def test_timings_are_recorded(self):
+        for phase in ('neos', 'approaches'):
+            for step in ('parse', 'wait', 'build', 'ready'):
+                self.assertGreaterEqual(self.loader.timings[f'{phase}.{step}'],
+                                        0)
+
+
+class TestLoadNEOsParallel(unittest.TestCase):
+    def test_small_chunks_match_load_neos(self):
+        self.assertEqual(
+            neo_values(load_neos_parallel(TEST_NEO_FILE, processes=2,
+                                          chunk_bytes=4096)),
+            neo_values(load_neos(TEST_NEO_FILE)))
+
+    def test_chunks_end_at_record_boundaries(self):
+        data = b'a,b\n1,"x\ny\nz"\n2,"w"\n3,v\n'
+        spans = csv_chunk_spans(data, 4, 1)
+        self.assertEqual([data[start:end] for start, end in spans],
+                         [b'1,"x\ny\nz"\n', b'2,"w"\n', b'3,v\n'])
+
+    def test_quoted_fields_with_newlines_and_commas(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        path = tmp / 'neos.csv'
+        path.write_text('full_name,pdes,name,diameter,pha\n'
+                        + '"1 One, ""the first""\n",1,One,1.5,Y\n' * 50
+                        + '"2 (2000 AB)",2,,,N\n', encoding='utf-8')
+        self.assertEqual(
+            neo_values(load_neos_parallel(path, processes=2, chunk_bytes=64)),
+            neo_values(load_neos(path)))
+
+    def test_names_with_newlines_stay_in_their_rows(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        path = tmp / 'neos.csv'
+        path.write_text('pdes,name,diameter,pha\n1,"Na\nme",,N\n2,Other,,N\n',
+                        encoding='utf-8')
+        neos = load_neos_parallel(path, processes=1)
+        self.assertEqual([(neo.designation, neo.name) for neo in neos],
+                         [('1', 'Na\nme'), ('2', 'Other')])
+
+    def test_empty_file_has_no_neos(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        path = tmp / 'neos.csv'
+        path.write_text('pdes,name,diameter,pha\n')
+        self.assertEqual(load_neos_parallel(path, processes=1), [])
+
+
+class TestLoadApproachesParallel(unittest.TestCase):
+    def test_small_chunks_match_load_approaches(self):
+        self.assertEqual(
+            approach_values(load_approaches_parallel(
+                TEST_CAD_FILE, processes=2, chunk_bytes=4096)),
+            approach_values(load_approaches(TEST_CAD_FILE)))
+
+    def test_chunks_end_at_row_boundaries(self):
+        data = b'{"data": [["a],["], ["b", ""],\n["c"]], "fields": ["x"]}'
+        spans = cad_chunk_spans(data, data.index(b'[') + 1, 1)
+        self.assertEqual([data[start:end] for start, end in spans],
+                         [b'["a],["]', b', ["b", ""]', b',\n["c"]'])
+
+    def test_empty_data_has_no_approaches(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        path = tmp / 'cad.json'
+        path.write_text(json.dumps({
+            'fields': ['des', 'cd', 'dist', 'v_rel'], 'count': '0',
+            'data': []}))
+        self.assertEqual(load_approaches_parallel(path, processes=1), [])
+
+
 if __name__ == '__main__':
     unittest.main()
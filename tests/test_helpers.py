@@ -0,0 +1,73 @@
+"""Check that dates and times are converted to and from strings correctly.
+
+The conversions in `helpers` have fast paths for the fixed formats of NASA's
+data, which must agree exactly with `strptime` and `strftime`, and must fall
+back to them for anything irregular.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_helpers
+"""
+import datetime
+import unittest
+
+from helpers import (MINUTES_PER_DAY, cd_to_datetime, cd_to_minutes,
+                     datetime_to_str, minutes_to_datetime, minutes_to_str,
+                     str_to_datetime)
+
+
+def every_few_days(start, stop, step=7):
+    """Generate datetimes from `start` to `stop` at varying times of day."""
+    current = start
+    minute = 0
+    while current < stop:
+        yield current.replace(hour=minute // 60, minute=minute % 60)
+        current += datetime.timedelta(days=step)
+        minute = (minute + 97) % MINUTES_PER_DAY
+
+
+class TestCalendarDates(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.datetimes = list(every_few_days(datetime.datetime(1900, 1, 1),
+                                            datetime.datetime(2200, 12, 31)))
+
+    def test_cd_to_datetime_matches_strptime(self):
+        for dt in self.datetimes:
+            cd = dt.strftime('%Y-%b-%d %H:%M')
+            self.assertEqual(cd_to_datetime(cd), datetime.datetime.strptime(cd, '%Y-%b-%d %H:%M'))
+
+    def test_str_to_datetime_matches_strptime(self):
+        for dt in self.datetimes:
+            string = dt.strftime('%Y-%m-%d %H:%M')
+            self.assertEqual(str_to_datetime(string), dt)
+
+    def test_datetime_to_str_matches_strftime(self):
+        for dt in self.datetimes:
+            self.assertEqual(datetime_to_str(dt), dt.strftime('%Y-%m-%d %H:%M'))
+
+    def test_minutes_round_trip(self):
+        for dt in self.datetimes:
+            minutes = cd_to_minutes(dt.strftime('%Y-%b-%d %H:%M'))
+            self.assertEqual(minutes // MINUTES_PER_DAY, dt.toordinal())
+            self.assertEqual(minutes_to_datetime(minutes), dt)
+            self.assertEqual(minutes_to_str(minutes), dt.strftime('%Y-%m-%d %H:%M'))
+
+    def test_irregular_dates_fall_back_to_strptime(self):
+        self.assertEqual(cd_to_datetime('2020-Jan-1 0:54'), datetime.datetime(2020, 1, 1, 0, 54))
+        self.assertEqual(cd_to_minutes('2020-Jan-1 0:54'),
+                         cd_to_minutes('2020-Jan-01 00:54'))
+        self.assertEqual(str_to_datetime('2020-1-1 0:54'), datetime.datetime(2020, 1, 1, 0, 54))
+
+    def test_invalid_dates_are_rejected(self):
+        for cd in ('2021-Feb-29 00:00', '2020-Foo-01 00:00', '2020-Jan-01 24:00', ''):
+            with self.assertRaises(ValueError):
+                cd_to_datetime(cd)
+            with self.assertRaises(ValueError):
+                cd_to_minutes(cd)
+        with self.assertRaises(ValueError):
+            str_to_datetime('2020-13-01 00:00')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Check that a `DataIndex` looks up the same NEOs and approaches as loading.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_index
+"""
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from extract import (load_neos, load_approaches, cad_row_spans,
+                     csv_record_spans)
+from database import NEODatabase
+from index import DataIndex, SIDECAR_SUFFIX
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestScanners(unittest.TestCase):
+    def test_csv_record_spans_respect_quoted_newlines(self):
+        data = b'a,b\n1,"x\ny"\n2,z'
+        records = [data[start:end] for start, end in csv_record_spans(data)]
+        self.assertEqual(records, [b'a,b\n', b'1,"x\ny"\n', b'2,z'])
+
+    def test_cad_row_spans_match_json_data(self):
+        data = TEST_CAD_FILE.read_bytes()
+        rows = [json.loads(data[start:end])
+                for start, end in cad_row_spans(data)]
+        self.assertEqual(rows, json.loads(data)['data'])
+
+
+class TestDataIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(TEST_NEO_FILE)
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = NEODatabase(cls.neos, cls.approaches)
+
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.neofile = self.tmp / 'neos.csv'
+        self.cadfile = self.tmp / 'cad.json'
+        shutil.copy(TEST_NEO_FILE, self.neofile)
+        shutil.copy(TEST_CAD_FILE, self.cadfile)
+        self.index = DataIndex(self.neofile, self.cadfile)
+
+    def assertSameNEO(self, indexed, loaded):
+        self.assertEqual(indexed.designation, loaded.designation)
+        self.assertEqual(indexed.name, loaded.name)
+        self.assertEqual(indexed.hazardous, loaded.hazardous)
+        self.assertEqual(str(indexed.diameter), str(loaded.diameter))
+
+    def test_neo_by_designation_matches_loaded_neos(self):
+        for neo in self.neos[:200]:
+            indexed = self.index.neo_by_designation(neo.designation)
+            self.assertSameNEO(indexed, self.db.get_neo_by_designation(
+                neo.designation))
+
+    def test_neo_by_name_matches_loaded_neos(self):
+        for neo in self.neos:
+            if neo.name:
+                indexed = self.index.neo_by_name(neo.name)
+                self.assertSameNEO(indexed, self.db.get_neo_by_name(neo.name))
+
+    def test_missing_neos_are_none(self):
+        self.assertIsNone(self.index.neo_by_designation('not-real-designation'))
+        self.assertIsNone(self.index.neo_by_name('not-real-name'))
+
+    def test_approaches_of_match_linked_approaches(self):
+        for designation in ('99942', '2020 NJ1', '68347'):
+            loaded = self.db.get_neo_by_designation(designation)
+            neo = self.index.neo_by_designation(designation)
+            approaches = self.index.approaches_of(neo)
+            self.assertEqual([(a.time_str, a.distance, a.velocity)
+                              for a in approaches],
+                             [(a.time_str, a.distance, a.velocity)
+                              for a in loaded.approaches])
+            for approach in approaches:
+                self.assertIs(approach.neo, neo)
+
+    def test_sidecars_are_saved_and_reused(self):
+        self.index.neo_by_designation('99942')
+        sidecar = self.index.sidecar(self.neofile)
+        self.assertEqual(sidecar.name, 'neos.csv' + SIDECAR_SUFFIX)
+        self.assertTrue(sidecar.exists())
+
+        index = DataIndex(self.neofile, self.cadfile)
+        with unittest.mock.patch('index.build_neo_index') as build:
+            index.neo_by_designation('99942')
+        build.assert_not_called()
+
+    def test_sidecars_are_rebuilt_when_the_data_changes(self):
+        self.index.neo_by_designation('99942')
+        data = self.neofile.read_bytes()
+        self.neofile.write_bytes(data.replace(b'Apophis', b'Apophys'))
+        stat = self.neofile.stat()
+        os.utime(self.neofile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        index = DataIndex(self.neofile, self.cadfile)
+        self.assertEqual(index.neo_by_designation('99942').name, 'Apophys')
+        self.assertIsNone(index.neo_by_name('Apophis'))
+
+    def test_lazy_database_uses_index_without_loading(self):
+        def fail():
+            raise AssertionError("The data files should not be loaded.")
+
+        db = NEODatabase(fail, fail, index=self.index)
+        neo = db.get_neo_by_name('Apophis')
+        self.assertEqual(neo.designation, '99942')
+        self.assertEqual(len(neo.approaches),
+                         len(self.db.get_neo_by_name('Apophis').approaches))
+        self.assertIsNone(db.get_neo_by_designation('not-real-designation'))
+
+
+if __name__ == '__main__':
+    unittest.main()
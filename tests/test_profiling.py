@@ -0,0 +1,85 @@
+"""Check that a `Profile` records the phases of loading and querying.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_profiling
+"""
+import functools
+import io
+import pathlib
+import time
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from profiling import DISABLED, Profile
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestProfile(unittest.TestCase):
+    def test_nested_phases_are_counted_once(self):
+        profile = Profile()
+        with profile.phase('outer'):
+            time.sleep(0.02)
+            with profile.phase('inner') as inner:
+                time.sleep(0.05)
+                inner.rows = 10
+        outer = profile.phases['outer']
+        self.assertGreaterEqual(inner.seconds, 0.05)
+        # Without the inner phase, the outer phase is the shorter one.
+        self.assertGreaterEqual(outer.seconds, 0.02)
+        self.assertLess(outer.seconds, inner.seconds)
+        self.assertAlmostEqual(inner.rate, 10 / inner.seconds)
+
+    def test_stream_records_only_the_time_producing_values(self):
+        profile = Profile()
+
+        def slow():
+            for value in range(3):
+                time.sleep(0.01)
+                yield value
+
+        with profile.phase('consume'):
+            for _ in profile.stream('produce', slow()):
+                time.sleep(0.02)
+        produce, consume = profile.phases['produce'], profile.phases['consume']
+        self.assertEqual(produce.rows, 3)
+        self.assertGreaterEqual(produce.seconds, 0.03)
+        self.assertGreaterEqual(consume.seconds, 0.06)
+        self.assertLess(produce.seconds, consume.seconds)
+
+    def test_database_records_the_phases_of_loading(self):
+        profile = Profile(trace_memory=True)
+        self.addCleanup(profile.stop)
+        db = NEODatabase(functools.partial(load_neos, TEST_NEO_FILE),
+                         functools.partial(load_approaches, TEST_CAD_FILE))
+        db.profile = profile
+        db.load()
+        self.assertEqual(list(profile.phases), ['neos', 'approaches', 'link'])
+        self.assertEqual(profile.phases['neos'].rows, 4226)
+        self.assertEqual(profile.phases['approaches'].rows, 4700)
+        for phase in profile.phases.values():
+            self.assertGreater(phase.peak, 0)
+
+        report = io.StringIO()
+        profile.report(report)
+        lines = report.getvalue().splitlines()
+        self.assertEqual(lines[0].split(),
+                         ['phase', 'seconds', 'share', 'rows', 'rows/s',
+                          'peak', 'MiB'])
+        self.assertEqual([line.split()[0] for line in lines[1:]],
+                         ['neos', 'approaches', 'link', 'total'])
+
+    def test_disabled_profile_records_nothing(self):
+        with DISABLED.phase('anything') as phase:
+            phase.rows = 1
+        self.assertEqual(list(DISABLED.stream('values', [1, 2])), [1, 2])
+        self.assertEqual(DISABLED.phases, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+"""Check the background loading and reloading of the interactive shell.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_shell
+"""
+import contextlib
+import io
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from main import (LoadProgress, NEOShell, QueryJob, build_database,
+                  make_parser)
+from models import CloseApproach
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestShellReload(unittest.TestCase):
+    def setUp(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        self.neofile = tmp / 'neos.csv'
+        self.cadfile = tmp / 'cad.json'
+        shutil.copy(TEST_NEO_FILE, self.neofile)
+        shutil.copy(TEST_CAD_FILE, self.cadfile)
+
+        _, inspect_parser, query_parser = make_parser()
+        self.shell = NEOShell(self.make_database(), inspect_parser,
+                              query_parser, reload=self.make_database,
+                              watch=(self.neofile, self.cadfile))
+        self.stderr = io.StringIO()
+        redirect = contextlib.redirect_stderr(self.stderr)
+        redirect.__enter__()
+        self.addCleanup(redirect.__exit__, None, None, None)
+
+    def make_database(self):
+        return NEODatabase(lambda: load_neos(self.neofile),
+                           lambda: load_approaches(self.cadfile))
+
+    def touch(self, path, text=None):
+        if text is not None:
+            path.write_text(text)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_unchanged_data_is_not_reloaded(self):
+        self.shell.check_data()
+        self.assertIsNone(self.shell.reloader)
+
+    def test_changed_data_is_swapped_in_between_commands(self):
+        old = self.shell.db
+        old.load()
+        self.touch(self.neofile,
+                   self.neofile.read_text().replace('Apophis', 'Apophys'))
+
+        self.shell.check_data()
+        self.shell.reloader.join()
+        self.assertIs(self.shell.db, old)
+        self.shell.check_data()
+        self.assertIsNot(self.shell.db, old)
+        self.assertEqual(self.shell.db.get_neo_by_designation('99942').name,
+                         'Apophys')
+        self.assertTrue(self.shell.db.linked)
+        # The old snapshot is left untouched.
+        self.assertEqual(old.get_neo_by_designation('99942').name, 'Apophis')
+
+    def test_status_describes_the_reloaded_data(self):
+        self.touch(self.neofile,
+                   self.neofile.read_text().replace('Apophis', 'Apophys'))
+        self.shell.check_data()
+        self.shell.reloader.join()
+        self.shell.check_data()
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.shell.do_status('')
+        lines = stdout.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('Loaded 4,226 NEOs'))
+        self.assertIn('The data is ready.', lines)
+
+    def test_failed_reload_keeps_the_old_data(self):
+        old = self.shell.db
+        self.touch(self.cadfile, '{"fields": [')
+
+        self.shell.check_data()
+        self.shell.reloader.join()
+        self.shell.check_data()
+        self.assertIs(self.shell.db, old)
+        self.assertIn("Couldn't reload", self.stderr.getvalue())
+
+
+class TestLoadProgress(unittest.TestCase):
+    def test_rows_are_reported_while_a_phase_runs(self):
+        out = io.StringIO()
+        progress = LoadProgress(file=out, interval=0)
+        self.assertIsNone(progress.describe())
+        db = build_database(make_parser()[0].parse_args(
+            ['--neofile', str(TEST_NEO_FILE), '--cadfile', str(TEST_CAD_FILE),
+             'interactive']), progress=progress)
+        with unittest.mock.patch('extract.PROGRESS_EVERY', 1000):
+            db.load()
+        counts = [line.split(' so far')[0]
+                  for line in out.getvalue().splitlines()]
+        self.assertEqual(counts[:7], [
+            '[Loading NEOs: 0', '[Loading NEOs: 1,000', '[Loading NEOs: 2,000',
+            '[Loading NEOs: 3,000', '[Loading NEOs: 4,000',
+            '[Loading NEOs: 4,226', '[Loading close approaches: 0'])
+        self.assertEqual(counts[-1], '[Loading close approaches: 4,700')
+        self.assertIn('rows/s', progress.describe())
+
+
+class TestShellJobs(unittest.TestCase):
+    def setUp(self):
+        _, inspect_parser, query_parser = make_parser()
+        database = NEODatabase(load_neos(TEST_NEO_FILE),
+                               load_approaches(TEST_CAD_FILE))
+        self.shell = NEOShell(database, inspect_parser, query_parser)
+        self.stdout = io.StringIO()
+        redirect = contextlib.redirect_stdout(self.stdout)
+        redirect.__enter__()
+        self.addCleanup(redirect.__exit__, None, None, None)
+
+    def test_background_query_results_are_shown_when_it_finishes(self):
+        self.shell.onecmd('query --limit 2 &')
+        job = self.shell.jobs[1]
+        self.shell.onecmd('wait')
+        self.assertEqual(job.state, 'Done')
+        self.shell.report_jobs()
+        self.assertEqual(self.shell.jobs, {})
+        lines = self.stdout.getvalue().splitlines()
+        self.assertEqual(lines[0], '[1] Started.')
+        self.assertIn('[1] Done', lines[1])
+        self.assertEqual(len(lines), 4)
+
+    def test_cancelled_job_stops(self):
+        args = NEOShell.parse_arg_with('--limit 2', self.shell.query)
+        job = QueryJob(1, '--limit 2', self.shell.db, args)
+        # Cancel the job before it has had the chance to scan.
+        job.cancel.set()
+        job.start().thread.join()
+        self.assertEqual(job.state, 'Cancelled')
+        self.assertEqual(job.output.getvalue(), '')
+
+    def test_job_times_out(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.shell.onecmd('query --timeout 0 --limit 2 &')
+            self.shell.onecmd('wait %1')
+            self.shell.report_jobs()
+        self.assertIn('[1] Timed out', self.stdout.getvalue())
+        self.assertIn('timed out', stderr.getvalue())
+
+
+class TestShellPaging(unittest.TestCase):
+    def setUp(self):
+        _, inspect_parser, query_parser = make_parser()
+        self.approaches = load_approaches(TEST_CAD_FILE)
+        database = NEODatabase(load_neos(TEST_NEO_FILE), self.approaches)
+        self.shell = NEOShell(database, inspect_parser, query_parser)
+        self.stdout = io.StringIO()
+        self.stderr = io.StringIO()
+        for redirect in (contextlib.redirect_stdout(self.stdout),
+                         contextlib.redirect_stderr(self.stderr)):
+            redirect.__enter__()
+            self.addCleanup(redirect.__exit__, None, None, None)
+
+    def lines(self):
+        lines = self.stdout.getvalue().splitlines()
+        self.stdout.seek(0)
+        self.stdout.truncate()
+        return lines
+
+    def test_next_continues_where_the_last_page_stopped(self):
+        expected = [str(approach) for approach in self.approaches[:10]]
+        self.shell.onecmd('query --limit 3')
+        self.assertEqual(self.lines(), expected[:3])
+        self.shell.onecmd('next')
+        self.assertEqual(self.lines(), expected[3:6])
+        self.shell.onecmd('more 4')
+        self.assertEqual(self.lines(), expected[6:10])
+
+    def test_next_reports_the_end_of_the_results(self):
+        self.shell.onecmd('query --date 2020-01-01 --limit 100')
+        self.lines()
+        self.shell.onecmd('next')
+        self.assertEqual(self.lines(), ['No more results.'])
+        self.assertIsNone(self.shell.cursor)
+
+    def test_cursor_expires_when_approaches_are_ingested(self):
+        self.shell.onecmd('query --limit 3')
+        self.lines()
+        self.shell.db.add_approaches([CloseApproach(
+            time='2020-May-31 00:00', distance='0.3', velocity='10',
+            _designation='99942', orbit_id='220', jd='2459000.5')])
+        self.shell.onecmd('next')
+        self.assertEqual(self.lines(), [])
+        self.assertIn('data has changed', self.stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Check that slow queries are logged, and that the log is summarized.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_slowlog
+"""
+import contextlib
+import datetime
+import io
+import json
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from main import NEOShell, make_parser
+from slowlog import SlowQueryLog, normalize_filters, summarize
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    def setUp(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        self.path = tmp / 'slow.ndjson'
+
+    def test_filters_are_normalized(self):
+        filters = normalize_filters(create_filters(
+            hazardous=True, distance_max=0.1,
+            start_date=datetime.date(2020, 1, 1)))
+        self.assertEqual(filters, [
+            {'attribute': 'date', 'op': '>=', 'value': '2020-01-01'},
+            {'attribute': 'distance', 'op': '<=', 'value': 0.1},
+            {'attribute': 'hazardous', 'op': '==', 'value': True},
+        ])
+
+    def test_only_slow_queries_are_logged(self):
+        log = SlowQueryLog(self.path, threshold=1.0)
+        self.assertFalse(log.record({'seconds': 0.5, 'filters': []}))
+        self.assertEqual(log.entries(), [])
+        self.assertTrue(log.record({'seconds': 1.5, 'filters': []}))
+        with open(self.path, 'a') as file:
+            file.write('{"damaged\n')
+        self.assertEqual(log.entries(), [{'seconds': 1.5, 'filters': []}])
+
+    def test_summary_groups_by_filters_worst_first(self):
+        fast = [{'attribute': 'distance', 'op': '<=', 'value': 0.1}]
+        slow = [{'attribute': 'hazardous', 'op': '==', 'value': True}]
+        entries = [{'seconds': 1.0, 'filters': fast, 'rows_scanned': 10},
+                   {'seconds': 3.0, 'filters': slow, 'rows_scanned': 20},
+                   {'seconds': 2.0, 'filters': fast, 'rows_scanned': 30}]
+        groups = summarize(entries)
+        self.assertEqual([g['filters'] for g in groups], [slow, fast])
+        self.assertEqual(groups[1]['count'], 2)
+        self.assertEqual(groups[1]['mean'], 1.5)
+        self.assertEqual(groups[1]['max_scanned'], 30)
+        self.assertEqual(len(summarize(entries, top=1)), 1)
+
+    def test_shell_logs_and_summarizes_queries(self):
+        _, inspect_parser, query_parser = make_parser()
+        database = NEODatabase(load_neos(TEST_NEO_FILE),
+                               load_approaches(TEST_CAD_FILE))
+        shell = NEOShell(database, inspect_parser, query_parser,
+                         slowlog=SlowQueryLog(self.path, threshold=0))
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            shell.onecmd('query --max-distance 0.1 --limit 3')
+            shell.onecmd('slowlog')
+        entry = json.loads(self.path.read_text())
+        self.assertEqual(entry['limit'], 3)
+        self.assertEqual(entry['formats'], ['text'])
+        self.assertEqual(entry['rows_emitted'], 3)
+        self.assertEqual(set(entry['phases']), {'load', 'scan', 'output'})
+        self.assertIn('distance <= 0.1', stdout.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Check that synthetic data files are deterministic and in NASA's schema.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_synthetic
+"""
+import csv
+import json
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.synthetic import designation, generate
+from database import NEODatabase
+from extract import load_neos, load_approaches
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestSynthetic(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = pathlib.Path(tempfile.mkdtemp())
+        cls.neo_path, cls.cad_path = generate(cls.tmp / 'a', scale=0.5)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_designations_are_unique(self):
+        designations = [designation(n) for n in range(100000)]
+        self.assertEqual(len(set(designations)), len(designations))
+
+    def test_schema_matches_the_test_data(self):
+        with open(TEST_NEO_FILE) as file, open(self.neo_path) as synthetic:
+            self.assertEqual(next(csv.reader(synthetic)),
+                             next(csv.reader(file)))
+        with open(TEST_CAD_FILE) as file, open(self.cad_path) as synthetic:
+            cad, expected = json.load(synthetic), json.load(file)
+        self.assertEqual(cad['fields'], expected['fields'])
+        self.assertEqual(cad['count'], len(cad['data']))
+
+    def test_every_approach_is_of_a_generated_neo(self):
+        neos = load_neos(self.neo_path)
+        approaches = load_approaches(self.cad_path)
+        self.assertEqual((len(neos), len(approaches)), (2113, 2350))
+        NEODatabase(neos, approaches)
+        self.assertTrue(all(approach.neo for approach in approaches))
+        times = [approach.time for approach in approaches]
+        self.assertEqual(times, sorted(times))
+
+    def test_same_seed_writes_the_same_bytes(self):
+        paths = generate(self.tmp / 'b', scale=0.5)
+        for ours, theirs in zip((self.neo_path, self.cad_path), paths):
+            self.assertEqual(ours.read_bytes(), theirs.read_bytes())
+        other = generate(self.tmp / 'c', scale=0.5, seed=1)[1]
+        self.assertNotEqual(self.cad_path.read_bytes(), other.read_bytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
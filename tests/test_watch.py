@@ -0,0 +1,152 @@
+"""Check that standing queries match the same approaches as `query` does.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_watch
+"""
+import datetime
+import io
+import json
+import operator
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import DistanceFilter, create_filters
+from watch import StandingQueries, follow, watch
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+QUERIES = {
+    'hazardous and close': dict(hazardous=True, distance_max=0.1),
+    'close': dict(distance_max=0.1),
+    'march': dict(start_date=datetime.date(2020, 3, 1),
+                  end_date=datetime.date(2020, 3, 31)),
+    'everything': dict(),
+}
+
+
+class CountingDistanceFilter(DistanceFilter):
+    calls = 0
+
+    @classmethod
+    def get(cls, approach):
+        cls.calls += 1
+        return approach.distance
+
+
+class TestStandingQueries(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE),
+                             load_approaches(TEST_CAD_FILE))
+        cls.queries = StandingQueries()
+        for name, criteria in QUERIES.items():
+            cls.queries.register(name, create_filters(**criteria))
+
+    def test_shared_filters_are_registered_once(self):
+        self.assertEqual(len(self.queries.filters), 4)
+
+    def test_matches_agree_with_query(self):
+        matches = {name: [] for name in QUERIES}
+        for approach in self.db.query():
+            for name in self.queries.match(approach):
+                matches[name].append(approach)
+        for name, criteria in QUERIES.items():
+            with self.subTest(name=name):
+                self.assertEqual(
+                    matches[name],
+                    list(self.db.query(create_filters(**criteria))))
+
+    def test_shared_filters_are_evaluated_once_per_approach(self):
+        queries = StandingQueries()
+        for _ in range(3):
+            queries.register('close', [
+                CountingDistanceFilter(operator.le, 0.1)])
+        approach = next(iter(self.db.query()))
+        CountingDistanceFilter.calls = 0
+        queries.match(approach)
+        self.assertEqual(CountingDistanceFilter.calls, 1)
+
+
+class TestWatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE),
+                             load_approaches(TEST_CAD_FILE))
+        cls.queries = StandingQueries()
+        cls.queries.register('close', create_filters(distance_max=0.01))
+
+    def test_matches_are_written_and_bad_lines_skipped(self):
+        lines = [
+            json.dumps({'des': '99942', 'cd': '2029-Apr-13 21:46',
+                        'dist': '0.00025', 'v_rel': '7.4'}) + '\n',
+            json.dumps({'des': '99942', 'cd': '2029-Apr-13 21:46',
+                        'dist': '0.5', 'v_rel': '7.4'}) + '\n',
+            'not json\n',
+            json.dumps({'des': 'not-an-neo', 'cd': '2029-Apr-13 21:46',
+                        'dist': '0.00025', 'v_rel': '7.4'}) + '\n',
+        ]
+        out, err = io.StringIO(), io.StringIO()
+        self.assertEqual(watch(self.db, self.queries, lines, out, err), 1)
+        match = json.loads(out.getvalue())
+        self.assertEqual(match['query'], 'close')
+        self.assertEqual(match['approach']['neo']['name'], 'Apophis')
+        self.assertEqual(match['approach']['datetime_utc'], '2029-04-13 21:46')
+        self.assertEqual(len(err.getvalue().splitlines()), 2)
+
+    def test_follow_reads_only_appended_complete_lines(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        path = tmp / 'stream.ndjson'
+        path.write_text('old\n')
+
+        polls = []
+
+        def running():
+            # Append a line in two parts, and stop after a few polls.
+            polls.append(None)
+            if len(polls) == 2:
+                with open(path, 'a') as file:
+                    file.write('new')
+            elif len(polls) == 3:
+                with open(path, 'a') as file:
+                    file.write(' line\n')
+            return len(polls) < 6
+
+        lines = list(follow(path, interval=0, running=running))
+        self.assertEqual(lines, ['new line\n'])
+
+    def test_follow_waits_for_a_missing_file(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        path = tmp / 'stream.ndjson'
+
+        polls = []
+
+        def running():
+            # Create the file after a few polls, and stop a few polls later.
+            polls.append(None)
+            if len(polls) == 3:
+                path.write_text('first\n')
+            return len(polls) < 6
+
+        lines = list(follow(path, interval=0, running=running))
+        self.assertEqual(lines, ['first\n'])
+
+    def test_follow_stops_while_waiting_for_a_missing_file(self):
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        lines = follow(tmp / 'missing.ndjson', interval=0,
+                       running=lambda: False)
+        self.assertEqual(list(lines), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,14 +20,22 @@ import csv
 import datetime
 import io
 import json
+import gzip
+import lzma
 import pathlib
+import tempfile
+import threading
 import unittest
 import unittest.mock
 
 
 from extract import load_neos, load_approaches
 from database import NEODatabase
-from write import write_to_csv, write_to_json
+from helpers import datetime_to_str
+from models import NearEarthObject, CloseApproach
+from write import (write_to_csv, write_to_json, write_to_ndjson,
+                   output_format, write_pipelined, write_to_many,
+                   write_parallel, shard_name)
 
 
 TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
@@ -132,6 +140,27 @@ class TestWriteToCSV(unittest.TestCase):
         self.assertSetEqual(set(fieldnames), set(rows[0].keys()))
 
 
+class TestWriteToCSVStreaming(unittest.TestCase):
+    @unittest.mock.patch('write.open')
+    def test_csv_rows_are_written_before_results_are_exhausted(self, mock_file):
+        results = build_results(5)
+        seen = []
+
+        with UncloseableStringIO() as buf:
+            mock_file.return_value = buf
+
+            def stream():
+                for result in results:
+                    # Record how many lines were written before this result.
+                    seen.append(buf.getvalue().count('\n'))
+                    yield result
+
+            write_to_csv(stream(), None, flush_every=1)
+
+        # The header, then one more line for each result already consumed.
+        self.assertEqual(seen, [1, 2, 3, 4, 5])
+
+
 class TestWriteToJSON(unittest.TestCase):
     @classmethod
     @unittest.mock.patch('write.open')
@@ -226,5 +255,250 @@ class TestWriteToJSON(unittest.TestCase):
         self.assertIsInstance(approach['neo']['potentially_hazardous'], bool)
 
 
+class TestWriteToNDJSON(unittest.TestCase):
+    @classmethod
+    @unittest.mock.patch('write.open')
+    def setUpClass(cls, mock_file):
+        results = build_results(5)
+
+        with UncloseableStringIO() as buf:
+            mock_file.return_value = buf
+            write_to_ndjson(results, None)
+            buf.seek(0)
+            cls.value = buf.getvalue()
+
+    def test_ndjson_data_has_one_object_per_line(self):
+        lines = self.value.splitlines()
+        self.assertEqual(len(lines), 5)
+        for line in lines:
+            self.assertIsInstance(json.loads(line), collections.abc.Mapping)
+
+    def test_ndjson_element_matches_json_element(self):
+        results = build_results(1)
+        with UncloseableStringIO() as buf:
+            with unittest.mock.patch('write.open', return_value=buf):
+                write_to_json(results, None)
+            buf.seek(0)
+            expected = json.load(buf)[0]
+        self.assertEqual(json.loads(self.value.splitlines()[0]), expected)
+
+
+class TestWriteCompressed(unittest.TestCase):
+    def test_output_format_ignores_compression_extension(self):
+        self.assertEqual(output_format(pathlib.Path('a.csv')), 'csv')
+        self.assertEqual(output_format(pathlib.Path('a.csv.gz')), 'csv')
+        self.assertEqual(output_format(pathlib.Path('a.json')), 'json')
+        self.assertEqual(output_format(pathlib.Path('a.ndjson.xz')), 'ndjson')
+        self.assertEqual(output_format(pathlib.Path('a.jsonl')), 'ndjson')
+        self.assertIsNone(output_format(pathlib.Path('a.txt')))
+        self.assertIsNone(output_format(pathlib.Path('-')))
+
+    def test_compressed_csv_matches_uncompressed_csv(self):
+        results = build_results(5)
+        with tempfile.TemporaryDirectory() as tmp:
+            plain = pathlib.Path(tmp) / 'results.csv'
+            compressed = pathlib.Path(tmp) / 'results.csv.gz'
+            write_to_csv(results, plain)
+            write_to_csv(results, compressed)
+            with gzip.open(compressed, 'rt') as infile:
+                self.assertEqual(infile.read(), plain.read_text())
+
+    def test_str_paths_are_compressed(self):
+        self.assertEqual(output_format('a.csv.gz'), 'csv')
+        results = build_results(5)
+        with tempfile.TemporaryDirectory() as tmp:
+            compressed = str(pathlib.Path(tmp) / 'results.csv.gz')
+            write_to_csv(results, compressed)
+            with gzip.open(compressed, 'rt') as infile:
+                self.assertEqual(len(infile.read().splitlines()), 6)
+
+    def test_compressed_ndjson_is_well_formed(self):
+        results = build_results(5)
+        with tempfile.TemporaryDirectory() as tmp:
+            compressed = pathlib.Path(tmp) / 'results.ndjson.xz'
+            write_to_ndjson(results, compressed)
+            with lzma.open(compressed, 'rt') as infile:
+                data = [json.loads(line) for line in infile]
+        self.assertEqual(len(data), 5)
+
+    def test_stdout_target(self):
+        results = build_results(5)
+        with unittest.mock.patch('sys.stdout', new=io.StringIO()) as stdout:
+            write_to_ndjson(results, pathlib.Path('-'))
+        self.assertEqual(len(stdout.getvalue().splitlines()), 5)
+
+
+class TestWritePipelined(unittest.TestCase):
+    def test_pipelined_output_matches_direct_output(self):
+        results = build_results(50)
+        with tempfile.TemporaryDirectory() as tmp:
+            for writer in (write_to_csv, write_to_json, write_to_ndjson):
+                direct = pathlib.Path(tmp) / 'direct'
+                pipelined = pathlib.Path(tmp) / 'pipelined'
+                writer(results, direct)
+                write_pipelined(writer, results, pipelined, batch_size=7, depth=2)
+                self.assertEqual(direct.read_text(), pipelined.read_text())
+
+    def test_pipelined_writer_errors_stop_the_query(self):
+        consumed = []
+
+        def stream():
+            for result in build_results(100):
+                consumed.append(result)
+                yield result
+
+        def failing_writer(results, filename):
+            next(iter(results))
+            raise OSError("disk full")
+
+        with self.assertRaises(OSError):
+            write_pipelined(failing_writer, stream(), None, batch_size=1, depth=1)
+        self.assertLess(len(consumed), 100)
+
+    def test_pipelined_writer_errors_after_the_results_are_raised(self):
+        def failing_writer(results, filename):
+            for _ in results:
+                pass
+            raise OSError("close failed")
+
+        errors = []
+
+        def write():
+            try:
+                write_pipelined(failing_writer, build_results(10), None,
+                                batch_size=3, depth=1)
+            except OSError as err:
+                errors.append(err)
+
+        thread = threading.Thread(target=write, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+
+class TestWriteToMany(unittest.TestCase):
+    def test_single_scan_writes_every_target(self):
+        results = build_results(50)
+        consumed = []
+
+        def stream():
+            for result in results:
+                consumed.append(result)
+                yield result
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = pathlib.Path(tmp)
+            writers = (write_to_csv, write_to_json, write_to_ndjson)
+            targets = [(writer, tmp / writer.__name__) for writer in writers]
+            write_to_many(targets, stream(), batch_size=8, depth=1)
+
+            self.assertEqual(len(consumed), 50)
+            for writer, filename in targets:
+                expected = tmp / 'expected'
+                writer(results, expected)
+                self.assertEqual(filename.read_text(), expected.read_text())
+
+
+class TestWriteParallel(unittest.TestCase):
+    WRITERS = {'csv': write_to_csv, 'json': write_to_json, 'ndjson': write_to_ndjson}
+
+    def test_stitched_output_matches_direct_output(self):
+        results = build_results(100)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = pathlib.Path(tmp)
+            targets = [(fmt, tmp / f'parallel.{fmt}') for fmt in self.WRITERS]
+            chunks = write_parallel(targets, results, processes=2, chunk_size=30)
+            self.assertEqual(chunks, 4)
+            for fmt, filename in targets:
+                expected = tmp / f'expected.{fmt}'
+                self.WRITERS[fmt](results, expected)
+                self.assertEqual(filename.read_text(), expected.read_text())
+
+    def test_shards_are_complete_files_in_order(self):
+        results = build_results(100)
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = pathlib.Path(tmp) / 'results.json.gz'
+            chunks = write_parallel([('json', filename)], results, processes=2,
+                                    chunk_size=30, shards=True)
+            self.assertEqual(chunks, 4)
+            data = []
+            for index in range(chunks):
+                with gzip.open(shard_name(filename, index), 'rt') as infile:
+                    data.extend(json.load(infile))
+        self.assertEqual([row['datetime_utc'] for row in data],
+                         [datetime_to_str(approach.time) for approach in results])
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name(pathlib.Path('a/results.csv'), 3), pathlib.Path('a/results.00003.csv'))
+        self.assertEqual(shard_name(pathlib.Path('r.v2.ndjson.xz'), 0), pathlib.Path('r.v2.00000.ndjson.xz'))
+
+
+class TestWriteMatchesReferenceSerializers(unittest.TestCase):
+    """Check that the fixed-schema serializers match `csv` and `json` exactly."""
+
+    @classmethod
+    def setUpClass(cls):
+        neos = [
+            NearEarthObject('433', name='Eros', diameter=16.84, hazardous=False),
+            NearEarthObject('X1', name='Comma, "Quote"', diameter='inf', hazardous=True),
+            NearEarthObject('2020 AB', name=None, diameter='nan'),
+        ]
+        approaches = [
+            CloseApproach('1900-Jan-01 00:00', '0.1', '5', '433'),
+            CloseApproach('2020-Dec-31 23:59', '1e-05', '12.5', 'X1'),
+            CloseApproach('2200-Feb-28 12:30', '0.0211660525256395', '7.35926323695148', '2020 AB'),
+            CloseApproach('2020-Mar-01 01:01', '0.3', '40', '433'),
+        ]
+        NEODatabase(neos, approaches)
+        cls.approaches = approaches + list(build_results(50))
+
+    def write(self, writer):
+        with UncloseableStringIO() as buf:
+            with unittest.mock.patch('write.open', return_value=buf):
+                writer(self.approaches, None)
+            return buf.getvalue()
+
+    def test_csv_matches_csv_writer(self):
+        expected = io.StringIO()
+        reference = csv.writer(expected)
+        reference.writerow(('datetime_utc', 'distance_au', 'velocity_km_s', 'designation', 'name', 'diameter_km', 'potentially_hazardous'))
+        for approach in self.approaches:
+            reference.writerow((datetime_to_str(approach.time), approach.distance, approach.velocity,
+                                approach.neo.designation, approach.neo.name, approach.neo.diameter, approach.neo.hazardous))
+        self.assertEqual(self.write(write_to_csv), expected.getvalue())
+
+    def test_json_matches_json_dumps(self):
+        expected = json.dumps([
+            {
+                'datetime_utc': datetime_to_str(approach.time),
+                'distance_au': approach.distance,
+                'velocity_km_s': approach.velocity,
+                'neo': {
+                    'designation': approach.neo.designation,
+                    'name': approach.neo.name,
+                    'diameter_km': approach.neo.diameter,
+                    'potentially_hazardous': approach.neo.hazardous,
+                }
+            }
+            for approach in self.approaches
+        ])
+        self.assertEqual(self.write(write_to_json), expected)
+
+    def test_exporting_again_reuses_the_formatted_values(self):
+        first = self.write(write_to_csv)
+        approach = self.approaches[0]
+        self.assertEqual(approach.formatted,
+                         (approach.time_str, '0.1', '5.0'))
+        self.assertIs(approach.formatted, approach.formatted)
+        self.assertEqual(self.write(write_to_csv), first)
+
+    def test_empty_json_is_an_empty_list(self):
+        with UncloseableStringIO() as buf:
+            with unittest.mock.patch('write.open', return_value=buf):
+                write_to_json((), None)
+            self.assertEqual(json.loads(buf.getvalue()), [])
+
+
 if __name__ == '__main__':
     unittest.main()
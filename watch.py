@@ -0,0 +1,220 @@
+"""Evaluate standing queries against a stream of new close approaches.
+
+A `StandingQueries` holds a set of named queries, each a collection of filters
+from `filters.create_filters`. Each new close approach is evaluated against all
+of the queries at once: a filter that appears in several queries (with the
+same attribute, comparator and reference value) is evaluated only once per
+approach, and only as far as needed to decide each query.
+
+Close approaches arrive as newline-delimited JSON objects with the fields of
+the close approach data (`des`, `cd`, `dist`, `v_rel`, and optionally
+`orbit_id` and `jd`), such as:
+
+    {"des":"99942","cd":"2029-Apr-13 21:46","dist":"0.00025","v_rel":"7.4"}
+
+They're read from standard input with `read_lines`, or from a growing file
+with `follow`, and each match is written as soon as it's found, as a JSON
+object of the query's name and the approach, in the format of
+`write.write_to_ndjson`. The history of the stream is never rescanned.
+
+The main module uses these with the `watch` subcommand.
+"""
+import json
+import pathlib
+import sys
+import time
+
+from models import CloseApproach
+from write import json_objects
+
+
+class StandingQueries:
+    """A set of named queries, evaluated together on each new approach.
+
+    The distinct filters of all queries are kept in one list, keyed by their
+    class, comparator and reference value, and each query refers to its
+    filters by their positions in that list.
+    """
+
+    def __init__(self):
+        """Create a new, empty set of standing queries."""
+        self.filters = []
+        self.queries = []
+        self._positions = {}
+
+    def register(self, name, filters):
+        """Register a query.
+
+        :param name: The name of the query, which labels its matches.
+        :param filters: A collection of filters, as from `create_filters`.
+        """
+        positions = []
+        for f in filters:
+            key = (type(f), f.op, f.value)
+            if key not in self._positions:
+                self._positions[key] = len(self.filters)
+                self.filters.append(f)
+            positions.append(self._positions[key])
+        self.queries.append((name, tuple(positions)))
+
+    def match(self, approach):
+        """Find the queries that a close approach matches.
+
+        :param approach: A linked `CloseApproach`.
+        :return: A list of the names of the matching queries, in the order in
+        which they were registered.
+        """
+        filters = self.filters
+        results = {}
+        matches = []
+        for name, positions in self.queries:
+            for position in positions:
+                result = results.get(position)
+                if result is None:
+                    result = results[position] = filters[position](approach)
+                if not result:
+                    break
+            else:
+                matches.append(name)
+        return matches
+
+
+def approach_from_record(record):
+    """Create a `CloseApproach` from a JSON object of close approach fields.
+
+    :param record: A dictionary with the fields of a row of close approach
+    data, such as 'des', 'cd', 'dist' and 'v_rel'.
+    :return: A new, unlinked `CloseApproach`.
+    """
+    return CloseApproach(time=record['cd'],
+                         distance=record.get('dist') or 'nan',
+                         velocity=record.get('v_rel') or 'nan',
+                         _designation=record['des'],
+                         orbit_id=record.get('orbit_id'),
+                         jd=record.get('jd'))
+
+
+def read_lines(stream):
+    """Generate the lines of a stream as they arrive.
+
+    Unlike iterating over a file object, this doesn't read ahead, so each line
+    is produced as soon as it's written.
+
+    :param stream: A text stream, such as `sys.stdin`.
+    :yield: Each line of the stream.
+    """
+    for line in iter(stream.readline, ''):
+        yield line
+
+
+def _open_when_present(path, interval, running):
+    """Open a file for reading, waiting for it to exist if it doesn't yet.
+
+    :param path: A path to a file.
+    :param interval: How long to wait between attempts, in seconds.
+    :param running: A callable that returns whether to keep waiting.
+    :return: The open file, or None if stopped before it existed.
+    """
+    while running():
+        try:
+            return open(path)
+        except FileNotFoundError:
+            time.sleep(interval)
+    return None
+
+
+def follow(path, from_start=False, interval=0.5, running=lambda: True):
+    """Generate the lines appended to a file, like `tail -f`.
+
+    An incomplete last line is held back until it's finished. If the file is
+    truncated or replaced, it's followed again from its start. If the file
+    doesn't exist (yet, or for a moment while it's replaced), it's waited for,
+    and all of its lines are new once it appears.
+
+    :param path: A path to a file.
+    :param from_start: Whether to start with the lines already in the file.
+    If False, start with the lines appended after it's opened.
+    :param interval: How long to wait for more lines, in seconds.
+    :param running: A callable that returns whether to keep following.
+    :yield: Each complete line appended to the file.
+    """
+    path = pathlib.Path(path)
+    try:
+        file = open(path)
+    except FileNotFoundError:
+        file = _open_when_present(path, interval, running)
+    else:
+        if not from_start:
+            file.seek(0, 2)
+    if file is None:
+        return
+    try:
+        partial = ''
+        while running():
+            line = file.readline()
+            if line:
+                partial += line
+                if partial.endswith('\n'):
+                    yield partial
+                    partial = ''
+                continue
+            time.sleep(interval)
+            try:
+                size = path.stat().st_size
+            except OSError:
+                continue
+            if size < file.tell():
+                # The file was truncated or replaced; start over.
+                file.close()
+                file = _open_when_present(path, interval, running)
+                if file is None:
+                    return
+                partial = ''
+    finally:
+        if file is not None:
+            file.close()
+
+
+def watch(database, queries, lines, outfile=None, errfile=None):
+    """Evaluate standing queries on each new close approach in a stream.
+
+    Each approach is linked to its NEO in the database before it's evaluated.
+    Lines that can't be parsed, and approaches of unknown NEOs, are reported
+    and skipped.
+
+    :param database: An `NEODatabase` of the NEOs.
+    :param queries: A `StandingQueries`.
+    :param lines: An iterable of lines of newline-delimited JSON.
+    :param outfile: A text stream on which to write each match. If None, use
+    standard output.
+    :param errfile: A text stream on which to report skipped lines. If None,
+    use standard error.
+    :return: The number of matches.
+    """
+    outfile = outfile or sys.stdout
+    errfile = errfile or sys.stderr
+    matched = 0
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            approach = approach_from_record(json.loads(line))
+        except (ValueError, KeyError, TypeError) as err:
+            print(f"Skipping line {number}: {err!r}", file=errfile)
+            continue
+        neo = database.get_neo_by_designation(approach._designation)
+        if neo is None:
+            print(f"Skipping line {number}: unknown NEO "
+                  f"{approach._designation!r}", file=errfile)
+            continue
+        approach.neo = neo
+
+        names = queries.match(approach)
+        if names:
+            formatted = next(json_objects([approach]))
+            for name in names:
+                outfile.write('{"query": ' + json.dumps(name)
+                              + ', "approach": ' + formatted + '}\n')
+            outfile.flush()
+            matched += len(names)
+    return matched
@@ -1,56 +1,362 @@
-"""Write a stream of close approaches to CSV or to JSON.
+"""Write a stream of close approaches to CSV, JSON or newline-delimited JSON.
 
-This module exports two functions: `write_to_csv` and `write_to_json`, each of
-which accept an `results` stream of close approaches and a path to which to
-write the data.
+This module exports three functions: `write_to_csv`, `write_to_json` and
+`write_to_ndjson`, each of which accept an `results` stream of close approaches
+and a path to which to write the data.
 
 These functions are invoked by the main module with the output of the `limit`
 function and the filename supplied by the user at the command line. The file's
-extension determines which of these functions is used.
+extension determines which of these functions is used - see `output_format`.
+
+A path of `-` writes to standard output, and a trailing `.gz`, `.bz2` or `.xz`
+extension transparently compresses the output. Compression runs on a separate
+thread, so that it overlaps with the query that produces the results.
+
+The `write_pipelined` function runs any of these writers on a separate thread,
+fed with batches of results through a bounded queue, so that formatting and
+writing overlap with the query itself. The `write_to_many` function does the
+same for several files at once, so a single query can be saved in several
+formats. The `write_parallel` function instead formats contiguous chunks of
+the results in a pool of worker processes, and either stitches them together
+in order into each file or writes each chunk to its own numbered shard.
+
+The `json_objects` function formats each close approach as the JSON object
+that these writers write, for callers (such as the `watch` module) that embed
+approaches in their own output.
 
 You'll edit this file in Part 4.
 """
-import csv
+import bz2
+import collections
+import concurrent.futures
+import contextlib
+import gzip
+import itertools
 import json
-from helpers import datetime_to_str
+import lzma
+import os
+import pathlib
+import queue
+import sys
+import threading
+
+from helpers import minutes_to_str
+
+
+# The filename that refers to standard output.
+STDOUT = '-'
+
+# Map extensions of compressed files onto the stdlib module that handles them.
+COMPRESSORS = {
+    '.gz': gzip,
+    '.bz2': bz2,
+    '.xz': lzma,
+}
+
+# Map (uncompressed) extensions onto output formats.
+FORMATS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+
+def output_format(filename):
+    """Infer the output format of a file from its extensions.
+
+    Any compression extension (`.gz`, `.bz2` or `.xz`) is ignored, so both
+    `results.csv` and `results.csv.gz` are in the 'csv' format.
+
+    :param filename: A Path-like object pointing to where the data will be
+    saved.
+    :return: One of 'csv', 'json' or 'ndjson', or None if unknown.
+    """
+    suffixes = [suffix.lower()
+                for suffix in pathlib.Path(filename).suffixes]
+    if suffixes and suffixes[-1] in COMPRESSORS:
+        suffixes.pop()
+    if not suffixes:
+        return None
+    return FORMATS.get(suffixes[-1])
+
+
+class _CompressedWriter:
+    """A text file-like object that compresses its output on another thread.
+
+    Written text is buffered and handed over in chunks, through a bounded
+    queue, to a background thread that encodes, compresses and writes it. The
+    bounded queue applies backpressure to the producer if compression can't
+    keep up.
+    """
+
+    def __init__(self, filename, module, chunk_size=1 << 16, depth=8):
+        """Create a new `_CompressedWriter` and start its compression thread.
+
+        :param filename: A Path-like object pointing to the compressed file.
+        :param module: A stdlib compression module, such as `gzip`.
+        :param chunk_size: The number of characters to buffer before handing
+        them over to the compression thread.
+        :param depth: The maximum number of chunks waiting to be compressed.
+        """
+        self._file = module.open(filename, 'wb')
+        self._chunk_size = chunk_size
+        self._pending = []
+        self._pending_size = 0
+        self._queue = queue.Queue(maxsize=depth)
+        self._error = None
+        self._thread = threading.Thread(target=self._compress, daemon=True)
+        self._thread.start()
+
+    def _compress(self):
+        """Compress and write chunks until the `None` sentinel is received."""
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            if self._error is None:
+                try:
+                    self._file.write(chunk.encode('utf-8'))
+                except Exception as err:
+                    # Surface the error on the producer's side.
+                    self._error = err
+
+    def _check(self):
+        """Re-raise any error encountered by the compression thread."""
+        if self._error is not None:
+            raise self._error
+
+    def write(self, text):
+        """Buffer `text` and hand a chunk over once enough is buffered."""
+        self._check()
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= self._chunk_size:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        """Hand all buffered text over to the compression thread.
+
+        This doesn't flush the compressor itself, which would hurt the
+        compression ratio - compressed data is only complete once closed.
+        """
+        self._check()
+        if self._pending:
+            self._queue.put(''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def close(self):
+        """Compress the remaining text, stop the thread and close the file."""
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            self._file.close()
+        self._check()
+
+    def __enter__(self):
+        """Enter the runtime context of this writer."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close this writer when leaving the runtime context."""
+        self.close()
+
+
+@contextlib.contextmanager
+def _open_output(filename):
+    """Open an output file for writing text.
+
+    The filename `-` refers to standard output, which is flushed but not
+    closed. Files ending in `.gz`, `.bz2` or `.xz` are compressed.
+
+    :param filename: A Path-like object pointing to where the data should be
+    saved.
+    :return: A context manager that produces a writable text file-like object.
+    """
+    if filename is not None and str(filename) == STDOUT:
+        yield sys.stdout
+        sys.stdout.flush()
+        return
+
+    suffix = '' if filename is None else pathlib.Path(filename).suffix.lower()
+    if suffix in COMPRESSORS:
+        with _CompressedWriter(filename, COMPRESSORS[suffix]) as outfile:
+            yield outfile
+    else:
+        with open(filename, 'w') as outfile:
+            yield outfile
+
+
+# The number of formatted rows to join together before each write.
+_WRITE_BATCH = 256
+
+# The header of the CSV output.
+_CSV_FIELDNAMES = (
+    'datetime_utc', 'distance_au', 'velocity_km_s',
+    'designation', 'name', 'diameter_km', 'potentially_hazardous'
+)
+
+# The line terminator used by `csv.writer` with the default dialect.
+_CSV_NEWLINE = '\r\n'
+
+# Characters that force a CSV field to be quoted (with the default dialect).
+_CSV_SPECIAL = frozenset(',"\r\n')
+
+# Escape a string as `json.dumps` does, with the same C encoder.
+_json_string = json.encoder.encode_basestring_ascii
+
+# The JSON representations of the floats that `repr` doesn't format as JSON.
+_JSON_FLOATS = {'nan': 'NaN', 'inf': 'Infinity', '-inf': '-Infinity'}
+
+
+def _csv_field(value):
+    """Format a string (or None) as a field of a row written by `csv.writer`.
+
+    :param value: A string or None.
+    :return: The field, quoted if it contains any special characters.
+    """
+    if value is None:
+        return ''
+    value = str(value)
+    if _CSV_SPECIAL.isdisjoint(value):
+        return value
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _json_float(value):
+    """Format a float exactly as `json.dumps` does.
+
+    :param value: A float.
+    :return: The JSON representation of that float.
+    """
+    text = repr(value)
+    return _JSON_FLOATS.get(text, text)
+
+
+def _csv_lines(results):
+    """Generate the rows of the CSV output, one line per close approach.
+
+    The columns describing the NEO come last, so they are formatted once per
+    NEO and cached as a suffix fragment. Each line is then built by a single
+    f-string, from the approach's cached `formatted` strings.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :yield: Each formatted line, including its line terminator.
+    """
+    suffixes = {}
+    for result in results:
+        neo = result.neo
+        suffix = suffixes.get(neo)
+        if suffix is None:
+            suffix = suffixes[neo] = (
+                f"{_csv_field(neo.designation)},{_csv_field(neo.name)},"
+                f"{neo.diameter!r},{neo.hazardous}{_CSV_NEWLINE}")
+        time_str, distance, velocity = result.formatted
+        yield f"{time_str},{distance},{velocity},{suffix}"
+
+
+def _json_lines(results, end=''):
+    """Generate the JSON object describing each close approach, as a string.
+
+    The approach's own values come from its cached `formatted` strings, and
+    the nested 'neo' object is formatted once per NEO and cached as a suffix
+    fragment, together with `end`. Strings are escaped by the C encoder that
+    `json.dumps` itself uses.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :param end: A string with which to end each object.
+    :yield: Each formatted JSON object, followed by `end`.
+    """
+    suffixes = {}
+    json_float = _JSON_FLOATS.get
+    for result in results:
+        neo = result.neo
+        suffix = suffixes.get(neo)
+        if suffix is None:
+            name = 'null' if neo.name is None else _json_string(neo.name)
+            suffix = suffixes[neo] = (
+                f'"neo": {{"designation": {_json_string(str(neo.designation))}'
+                f', "name": {name}'
+                f', "diameter_km": {_json_float(neo.diameter)}'
+                f', "potentially_hazardous": '
+                f'{"true" if neo.hazardous else "false"}}}}}{end}')
+        time_str, distance, velocity = result.formatted
+        yield (f'{{"datetime_utc": "{time_str}", '
+               f'"distance_au": {json_float(distance, distance)}, '
+               f'"velocity_km_s": {json_float(velocity, velocity)}, {suffix}')
+
+
+def json_objects(results):
+    """Generate the JSON object describing each close approach, as a string.
+
+    The output is identical to `json.dumps` applied to a dictionary of the
+    approach's attributes with a nested 'neo' dictionary.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :yield: Each formatted JSON object.
+    """
+    return _json_lines(results)
 
 
-def write_to_csv(results, filename):
+def _write_lines(outfile, lines, flush_every, separator=''):
+    """Write a stream of formatted strings to a file, in batches.
+
+    :param outfile: A writable text file-like object.
+    :param lines: An iterable of formatted strings.
+    :param flush_every: The number of strings between flushes of `outfile`. If
+    0 or None, never flush explicitly.
+    :param separator: A string to write between consecutive strings.
+    """
+    lines = iter(lines)
+    count = 0
+    while True:
+        size = _WRITE_BATCH
+        if flush_every:
+            size = min(size, flush_every - count % flush_every)
+        batch = list(itertools.islice(lines, size))
+        if not batch:
+            return
+        if count and separator:
+            outfile.write(separator)
+        outfile.write(separator.join(batch))
+        count += len(batch)
+        if flush_every and count % flush_every == 0:
+            outfile.flush()
+
+
+def write_to_csv(results, filename, flush_every=1000):
     """Write an iterable of `CloseApproach` objects to a CSV file.
 
     The precise output specification is in `README.md`. Roughly, each output
     row corresponds to the information in a single close approach from the
     `results` stream and its associated near-Earth object.
 
+    Rows are streamed to the file as the `results` stream produces them, so
+    memory use doesn't grow with the size of the result set. The file is
+    flushed every `flush_every` rows so that downstream readers (such as
+    `tail -f`) see data while a long query is still running.
+
+    The schema is fixed, so rows are formatted directly to strings, in the
+    same format as `csv.writer`.
+
     :param results: An iterable of `CloseApproach` objects.
     :param filename: A Path-like object pointing to where the data should be
     saved.
+    :param flush_every: The number of rows between flushes of the output
+    buffer. If 0 or None, only flush when the file is closed.
     """
-    fieldnames = (
-        'datetime_utc', 'distance_au', 'velocity_km_s',
-        'designation', 'name', 'diameter_km', 'potentially_hazardous'
-    )
     # Write the results to a CSV file, following the specification in the
     # instructions.
-    rows = []
-    for result in results:
-        row = []
-        row.append(datetime_to_str(result.time))
-        row.append(str(result.distance))
-        row.append(result.velocity)
-        row.append(result.neo.designation)
-        row.append(result.neo.name)
-        row.append(result.neo.diameter)
-        row.append(result.neo.hazardous)
-        rows.append(row)
-
-    with open(filename, 'w') as csv_file:
-        writer = csv.writer(csv_file)
-        writer.writerow(fieldnames)
-        writer.writerows(rows)
-
-
-def write_to_json(results, filename):
+    with _open_output(filename) as csv_file:
+        csv_file.write(','.join(_CSV_FIELDNAMES) + _CSV_NEWLINE)
+        _write_lines(csv_file, _csv_lines(results), flush_every)
+
+
+def write_to_json(results, filename, flush_every=1000):
     """Write an iterable of `CloseApproach` objects to a JSON file.
 
     The precise output specification is in `README.md`. Roughly, the output is
@@ -58,31 +364,311 @@ def write_to_json(results, filename):
     their values and the 'neo' key mapping to a dictionary of the associated
     NEO's attributes.
 
+    Like `write_to_csv`, the list is streamed to the file element by element,
+    and each element is formatted directly to a string, in the same format as
+    `json.dump`.
+
     :param results: An iterable of `CloseApproach` objects.
     :param filename: A Path-like object pointing to where the data should be
     saved.
+    :param flush_every: The number of elements between flushes of the output
+    buffer. If 0 or None, only flush when the file is closed.
     """
     # Write the results to a JSON file, following the specification in the
     # instructions.
-    ca_list = []
+    with _open_output(filename) as json_file:
+        json_file.write('[')
+        _write_lines(json_file, json_objects(results), flush_every,
+                     separator=', ')
+        json_file.write(']')
+
+
+def write_to_ndjson(results, filename, flush_every=1000):
+    """Write an iterable of `CloseApproach` objects to an NDJSON file.
+
+    Each line of the output is a single JSON object, in the same format as the
+    elements of the list written by `write_to_json`. Unlike a JSON list, the
+    output can be consumed line by line while it is still being written.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :param filename: A Path-like object pointing to where the data should be
+    saved.
+    :param flush_every: The number of lines between flushes of the output
+    buffer. If 0 or None, only flush when the file is closed.
+    """
+    with _open_output(filename) as ndjson_file:
+        _write_lines(ndjson_file, _json_lines(results, end='\n'),
+                     flush_every)
+
+
+# Map output formats onto the functions that write them.
+WRITERS = {
+    'csv': write_to_csv,
+    'json': write_to_json,
+    'ndjson': write_to_ndjson,
+}
+
+
+def write_pipelined(writer, results, filename, batch_size=1024, depth=8,
+                    **kwargs):
+    """Write a stream of close approaches with a writer on a separate thread.
+
+    The calling thread consumes the `results` stream (typically, evaluating
+    the filters of `NEODatabase.query`) and hands batches of results over to a
+    writer thread through a bounded queue. The writer thread formats and
+    writes them with `writer`, so that formatting and system calls overlap
+    with the query. If the writer falls behind, the bounded queue blocks the
+    query, which keeps memory use bounded.
+
+    :param writer: One of the `write_to_*` functions.
+    :param results: An iterable of `CloseApproach` objects.
+    :param filename: A Path-like object pointing to where the data should be
+    saved.
+    :param batch_size: The number of results in each batch.
+    :param depth: The maximum number of batches waiting to be written.
+    :param kwargs: Additional keyword arguments passed to `writer`.
+    """
+    write_to_many(((writer, filename),), results,
+                  batch_size=batch_size, depth=depth, **kwargs)
+
+
+def write_to_many(targets, results, batch_size=1024, depth=8, **kwargs):
+    """Write a single stream of close approaches to several files at once.
+
+    The `results` stream is consumed only once, on the calling thread, and
+    each batch of results is handed over to every target. Each target has its
+    own writer thread and bounded queue, so the targets format and write their
+    output independently of each other, as in `write_pipelined`.
+
+    If any writer fails, the query stops, the remaining writers finish with
+    the results they've already received, and the first error is re-raised.
+
+    :param targets: An iterable of `(writer, filename)` pairs, where `writer`
+    is one of the `write_to_*` functions.
+    :param results: An iterable of `CloseApproach` objects.
+    :param batch_size: The number of results in each batch.
+    :param depth: The maximum number of batches waiting to be written, for
+    each target.
+    :param kwargs: Additional keyword arguments passed to every writer.
+    """
+    errors = []
+
+    def drain(batches, finished):
+        """Generate results from the batches until the `None` sentinel.
+
+        The sentinel is recorded in `finished` once it's taken.
+        """
+        while True:
+            batch = batches.get()
+            if batch is None:
+                finished.append(True)
+                return
+            yield from batch
+
+    def consume(writer, filename, batches):
+        """Write the drained results, recording any error for the caller."""
+        finished = []
+        try:
+            writer(drain(batches, finished), filename, **kwargs)
+        except Exception as err:
+            errors.append(err)
+            # Keep draining so that the producer never blocks on a full queue
+            # - unless the writer failed after the end of the results.
+            if not finished:
+                while batches.get() is not None:
+                    pass
+
+    queues = []
+    threads = []
+    for writer, filename in targets:
+        batches = queue.Queue(maxsize=depth)
+        thread = threading.Thread(target=consume,
+                                  args=(writer, filename, batches),
+                                  daemon=True)
+        thread.start()
+        queues.append(batches)
+        threads.append(thread)
+
+    try:
+        batch = []
+        for result in results:
+            batch.append(result)
+            if len(batch) >= batch_size:
+                for batches in queues:
+                    batches.put(batch)
+                batch = []
+                if errors:
+                    # Stop querying as soon as any writer has given up.
+                    break
+        else:
+            if batch:
+                for batches in queues:
+                    batches.put(batch)
+    finally:
+        for batches in queues:
+            batches.put(None)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+
+# Lightweight stand-ins for linked `CloseApproach`es and `NearEarthObject`s,
+# rebuilt in worker processes from the rows handed over by `write_parallel`.
+_Approach = collections.namedtuple('_Approach', 'formatted neo')
+_NEO = collections.namedtuple('_NEO', 'designation name diameter hazardous')
+
+
+def _chunk_rows(results, chunk_size):
+    """Split a stream of close approaches into chunks of picklable rows.
+
+    Each row is a flat tuple of the fields that are written, with the time as
+    its compact timestamp, so that formatting it is left to the workers. Rows
+    of the same NEO share the same string objects, which pickle compactly.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :param chunk_size: The number of rows in each chunk.
+    :yield: Lists of at most `chunk_size` rows, in order.
+    """
+    chunk = []
     for result in results:
-        diameter = result.neo.diameter
-        if diameter == float('NaN'):
-            diameter = 'NaN'
-        ca = {}
-        name = result.neo.name
-        if name is None:
-            name == ''
-        ca['datetime_utc'] = datetime_to_str(result.time)
-        ca['distance_au'] = float(result.distance)
-        ca['velocity_km_s'] = float(result.velocity)
-        ca['neo'] = {
-            'designation': str(result.neo.designation),
-            'name': name,
-            'diameter_km': diameter,
-            'potentially_hazardous': result.neo.hazardous
-        }
-        ca_list.append(ca)
-        print(ca_list)
-    with open(filename, 'w') as json_file:
-        json.dump(ca_list, json_file)
+        neo = result.neo
+        chunk.append((result.minutes, result.distance, result.velocity,
+                      neo.designation, neo.name, neo.diameter, neo.hazardous))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _format_chunk(formats, rows, shards=None):
+    """Format a chunk of rows for every target, in a `write_parallel` worker.
+
+    The approaches are rebuilt from the rows once, and then formatted in each
+    of the formats, so each chunk is handed over to a worker only once.
+
+    :param formats: A sequence of formats, each 'csv', 'json' or 'ndjson'.
+    :param rows: A list of rows produced by `_chunk_rows`.
+    :param shards: If given, a sequence of Path-like objects, one for each
+    format, to which to write the chunk as complete files.
+    :return: A list with, for each format, the chunk formatted as a fragment
+    of the body of a file in that format - or None, if written to a shard.
+    """
+    neos = {}
+    approaches = []
+    for minutes, distance, velocity, designation, *info in rows:
+        neo = neos.get(designation)
+        if neo is None:
+            neo = neos[designation] = _NEO(designation, *info)
+        approaches.append(_Approach(
+            (minutes_to_str(minutes), repr(distance), repr(velocity)), neo))
+
+    bodies = []
+    for index, fmt in enumerate(formats):
+        if shards is not None:
+            WRITERS[fmt](approaches, shards[index], flush_every=0)
+            bodies.append(None)
+        elif fmt == 'csv':
+            bodies.append(''.join(_csv_lines(approaches)))
+        elif fmt == 'json':
+            bodies.append(', '.join(json_objects(approaches)))
+        else:
+            bodies.append(''.join(_json_lines(approaches, end='\n')))
+    return bodies
+
+
+def shard_name(filename, index):
+    """Return the name of a numbered shard of an output file.
+
+    The shard number is inserted before the format and compression extensions,
+    so the shards of `results.csv.gz` are `results.00000.csv.gz`, and so on.
+
+    :param filename: A Path-like object pointing to the output file.
+    :param index: The zero-based index of the shard.
+    :return: A Path-like object pointing to the shard.
+    """
+    filename = pathlib.Path(filename)
+    suffixes = filename.suffixes[-1:]
+    if suffixes and suffixes[0].lower() in COMPRESSORS:
+        suffixes = filename.suffixes[-2:]
+    extension = ''.join(suffixes)
+    stem = filename.name[:len(filename.name) - len(extension)]
+    return filename.with_name(f"{stem}.{index:05d}{extension}")
+
+
+def write_parallel(targets, results, processes=None, chunk_size=50000,
+                   shards=False):
+    """Format a stream of close approaches in a pool of worker processes.
+
+    The `results` stream is consumed once, on the calling thread, and split
+    into contiguous chunks. Each chunk is handed over to a worker process
+    once, and formatted there for every target (including the formatting of
+    its times), so formatting scales with the number of cores. Output
+    order is deterministic: chunks are either written to each file in their
+    original order, or each one is written by its worker to a numbered shard
+    (see `shard_name`) that is a complete file on its own.
+
+    At most two chunks per process are in flight at any time, which keeps
+    memory use bounded.
+
+    :param targets: An iterable of `(fmt, filename)` pairs, where `fmt` is one
+    of 'csv', 'json' or 'ndjson'.
+    :param results: An iterable of `CloseApproach` objects.
+    :param processes: The number of worker processes. If None, use one per
+    CPU.
+    :param chunk_size: The number of results in each chunk.
+    :param shards: Whether to write each chunk to its own numbered shard.
+    :return: The number of chunks that were written.
+    """
+    targets = tuple(targets)
+    workers = processes or os.cpu_count() or 1
+    if shards and any(str(filename) == STDOUT for _, filename in targets):
+        raise ValueError("Standard output can't be split into shards.")
+
+    with contextlib.ExitStack() as stack:
+        pool = stack.enter_context(
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers))
+        outfiles = []
+        if not shards:
+            for fmt, filename in targets:
+                outfile = stack.enter_context(_open_output(filename))
+                if fmt == 'csv':
+                    outfile.write(','.join(_CSV_FIELDNAMES) + _CSV_NEWLINE)
+                elif fmt == 'json':
+                    outfile.write('[')
+                outfiles.append(outfile)
+
+        written = 0
+        pending = collections.deque()
+        window = 2 * workers
+
+        def write_next():
+            """Wait for the oldest chunk and write it to every file."""
+            nonlocal written
+            bodies = pending.popleft().result()
+            for index, (fmt, _) in enumerate(targets):
+                body = bodies[index]
+                if body:
+                    outfile = outfiles[index]
+                    if fmt == 'json' and written:
+                        outfile.write(', ')
+                    outfile.write(body)
+                    outfile.flush()
+            written += 1
+
+        formats = [fmt for fmt, _ in targets]
+        for index, rows in enumerate(_chunk_rows(results, chunk_size)):
+            pending.append(pool.submit(
+                _format_chunk, formats, rows,
+                [shard_name(filename, index) for _, filename in targets]
+                if shards else None))
+            if len(pending) >= window:
+                write_next()
+        while pending:
+            write_next()
+
+        for (fmt, _), outfile in zip(targets, outfiles):
+            if fmt == 'json':
+                outfile.write(']')
+    return written